@@ -0,0 +1,51 @@
+"""
+Бенчмарк кодеков файлов данных: размер, запись и чтение сегментов таблицы.
+
+Запуск: python -m benchmarks.bench_codecs [количество_записей]
+"""
+import json
+import sys
+import time
+
+from src.primitive_db.utils import available_codecs, decode_data, encode_data
+
+
+def measure(encode, decode, records, repeats):
+    """Возвращает размер, среднее время кодирования и декодирования."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        raw = encode(records)
+    encode_time = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        decoded = decode(raw)
+    decode_time = (time.perf_counter() - start) / repeats
+
+    assert decoded == records, "Данные после декодирования отличаются"
+    return len(raw), encode_time, decode_time
+
+
+def run(rows_count: int = 200000, repeats: int = 3) -> None:
+    """Сравнивает прежний формат (JSON с отступами) с доступными кодеками."""
+    records = [{"ID": i, "name": f"name{i}", "age": i % 100, "active": i % 2 == 0}
+               for i in range(1, rows_count + 1)]
+
+    variants = [(
+        "json indent=2 (прежний)",
+        lambda data: json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"),
+        json.loads,
+    )]
+    for codec in available_codecs():
+        variants.append((codec, lambda data, codec=codec: encode_data(data, codec),
+                         lambda raw: decode_data(raw)[0]))
+
+    print(f"Записей: {rows_count}")
+    print(f"{'Кодек':<24}{'Размер, КБ':>12}{'Запись, с':>12}{'Чтение, с':>12}")
+    for name, encode, decode in variants:
+        size, encode_time, decode_time = measure(encode, decode, records, repeats)
+        print(f"{name:<24}{size / 1024:>12.0f}{encode_time:>12.3f}{decode_time:>12.3f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
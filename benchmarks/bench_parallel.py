@@ -0,0 +1,85 @@
+"""
+Бенчмарк параллельного перебора колоночной таблицы на 1..N процессах.
+
+Таблица пишется сразу колоночным снимком, без журнала и вставок
+(для 10 млн строк нужно около 3 ГБ памяти на время подготовки).
+NumPy-путь отключается, чтобы замерять перебор записей.
+
+Запуск: python -m benchmarks.bench_parallel [количество_записей] [процессов]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from src.primitive_db.columnar import encode_columnar
+from src.primitive_db.core import aggregate, create_table, get_column_types, select
+from src.primitive_db.parallel import set_scan_workers
+from src.primitive_db.parser import parse_where_condition
+from src.primitive_db.utils import (
+    atomic_write,
+    get_table_columnar_path,
+    invalidate_table_cache,
+)
+from src.primitive_db.vectorized import set_vectorized_enabled
+
+QUERIES = [
+    ("select where age = 42 and active = true",
+     lambda metadata: select(metadata, "bench",
+                             parse_where_condition("age = 42 and active = true"),
+                             columns=["ID"])),
+    ("sum(score) group by age",
+     lambda metadata: aggregate(metadata, "bench",
+                                ["age", {"func": "sum", "column": "score"}],
+                                None, ["age"])),
+]
+
+
+def build_table(metadata, rows_count: int) -> None:
+    """Создает колоночную таблицу bench с синтетическими данными."""
+    create_table(metadata, "bench", ["age:int", "score:int", "active:bool"],
+                 "columnar")
+    records = [{"ID": i + 1, "age": i % 100, "score": i * 7919 % 1000,
+                "active": i % 2 == 0} for i in range(rows_count)]
+    snapshot = encode_columnar(get_column_types(metadata, "bench"), records)
+    del records
+    atomic_write(get_table_columnar_path("bench"),
+                 lambda file: file.write(snapshot), binary=True)
+    invalidate_table_cache("bench")
+
+
+def run(rows_count: int = 10_000_000, max_workers: int = 0, repeats: int = 3) -> None:
+    """Замеряет запросы при росте числа процессов от 1 до max_workers."""
+    max_workers = max_workers or os.cpu_count() or 1
+    workers_list = sorted({1, max_workers} | {2 ** i for i in range(1, 8)
+                                              if 2 ** i < max_workers})
+    set_vectorized_enabled(False)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        metadata = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_table(metadata, rows_count)
+
+        for name, query in QUERIES:
+            baseline = None
+            for workers in workers_list:
+                set_scan_workers(workers)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    # Прогрев: запуск процессов и отображение снимка в них
+                    query(metadata)
+                    start = time.perf_counter()
+                    for _ in range(repeats):
+                        query(metadata)
+                elapsed = (time.perf_counter() - start) / repeats
+                baseline = baseline or elapsed
+                print(f"{name}: процессов {workers}, {elapsed * 1000:.0f} мс, "
+                      f"ускорение x{baseline / elapsed:.2f}")
+        set_scan_workers(1)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 0)
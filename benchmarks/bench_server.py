@@ -0,0 +1,84 @@
+"""
+Бенчмарк запросов к серверу (database serve) против запуска процесса на команду.
+
+Запуск: python -m benchmarks.bench_server [количество_запросов] [потоков]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from src.primitive_db.client import close_pool, connect_pool, execute, execute_many
+
+QUERY = "select from bench where ID = 7"
+PROCESS_QUERIES = 20
+
+
+def wait_for_socket(path: str, timeout: float = 10.0) -> None:
+    """Ждет, пока сервер создаст сокет."""
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise RuntimeError("Сервер не запустился")
+        time.sleep(0.05)
+
+
+def run(queries: int = 5000, threads: int = 4) -> None:
+    """Запускает сервер во временном каталоге и сравнивает оба способа."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    command = [sys.executable, "-m", "src.primitive_db.main"]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        socket_path = os.path.join(workdir, "db.sock")
+        server = subprocess.Popen(command + ["serve", "--socket", socket_path],
+                                  cwd=workdir, env=env,
+                                  stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL)
+        pool = connect_pool(socket_path, size=threads)
+        try:
+            wait_for_socket(socket_path)
+            execute(pool, "create_table bench name:str age:int")
+            rows = ", ".join(f'("name{i}", {i % 100})' for i in range(10000))
+            execute(pool, f"insert into bench values {rows}")
+
+            start = time.perf_counter()
+            for _ in range(PROCESS_QUERIES):
+                subprocess.run(command + ["-c", QUERY], cwd=workdir, env=env,
+                               stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, check=False)
+            process_rate = PROCESS_QUERIES / (time.perf_counter() - start)
+
+            def worker(count: int) -> None:
+                for _ in range(count):
+                    execute(pool, QUERY)
+
+            start = time.perf_counter()
+            workers = [threading.Thread(target=worker, args=(queries // threads,))
+                       for _ in range(threads)]
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            pool_rate = queries // threads * threads / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            execute_many(pool, [QUERY] * queries)
+            pipeline_rate = queries / (time.perf_counter() - start)
+        finally:
+            close_pool(pool)
+            server.terminate()
+            server.wait()
+
+    print(f"Процесс на команду:      {process_rate:10.1f} запросов/с")
+    print(f"Пул, {threads} потока:           {pool_rate:10.1f} запросов/с "
+          f"(x{pool_rate / process_rate:.0f})")
+    print(f"Конвейер execute_many:   {pipeline_rate:10.1f} запросов/с "
+          f"(x{pipeline_rate / process_rate:.0f})")
+
+
+if __name__ == "__main__":
+    arguments = [int(value) for value in sys.argv[1:3]]
+    run(*arguments)
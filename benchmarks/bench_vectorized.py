@@ -0,0 +1,72 @@
+"""
+Бенчмарк фильтрации и агрегатов колоночной таблицы с NumPy и без него.
+
+Запуск: python -m benchmarks.bench_vectorized [количество_записей]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from src.primitive_db.core import aggregate, create_table, insert_many, select
+from src.primitive_db.parser import parse_where_condition
+from src.primitive_db.vectorized import np, set_vectorized_enabled
+
+QUERIES = [
+    ("select where age > 50", "age > 50", None),
+    ("select where age <= 20 and active = true", "age <= 20 and active = true", None),
+    ("sum(age), avg(age) where age > 10", "age > 10",
+     [{"func": "sum", "column": "age"}, {"func": "avg", "column": "age"}]),
+    ("count(*) group by age", None,
+     ["age", {"func": "count", "column": "*"}]),
+]
+
+
+def measure(metadata, where_clause, items, repeats):
+    """Возвращает среднее время запроса и его результат."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeats):
+            if items is None:
+                result = select(metadata, "bench", where_clause, columns=["ID"])
+            else:
+                group_by = ["age"] if "age" in items else None
+                result = aggregate(metadata, "bench", items, where_clause, group_by)
+    return (time.perf_counter() - start) / repeats, result
+
+
+def run(rows_count: int = 200000, repeats: int = 5) -> None:
+    """Создает временную колоночную таблицу и сравнивает оба пути."""
+    if np is None:
+        print("NumPy не установлен - сравнивать не с чем")
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        metadata = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_table(metadata, "bench",
+                         ["age:int", "city:str", "active:bool"], "columnar")
+            rows = [[i % 100, f"city{i % 10}", i % 2 == 0]
+                    for i in range(rows_count)]
+            insert_many(metadata, "bench", rows)
+
+        for name, condition, items in QUERIES:
+            where_clause = parse_where_condition(condition) if condition else None
+            timings = []
+            results = []
+            for enabled in (False, True):
+                set_vectorized_enabled(enabled)
+                elapsed, result = measure(metadata, where_clause, items, repeats)
+                timings.append(elapsed)
+                results.append(result)
+            same = "совпадают" if results[0] == results[1] else "РАЗЛИЧАЮТСЯ"
+            print(f"{name}: python {timings[0] * 1000:.1f} мс, "
+                  f"numpy {timings[1] * 1000:.1f} мс, "
+                  f"ускорение x{timings[0] / timings[1]:.1f}, результаты {same}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,48 @@
+"""
+Бенчмарк фильтрации WHERE при полном переборе таблицы.
+
+Запуск: python -m benchmarks.bench_where [количество_записей]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from src.primitive_db.core import create_table, insert_many, select
+
+CONDITIONS = [
+    {"age": {"operator": ">", "value": 50}},
+    {"city": "city7"},
+    {"age": {"operator": "<=", "value": 20}, "active": True},
+]
+
+
+def run(rows_count: int = 200000, repeats: int = 5) -> None:
+    """Создает временную таблицу и замеряет время выборок."""
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        metadata = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_table(metadata, "bench",
+                         ["age:int", "city:str", "active:bool"])
+            rows = [[i % 100, f"city{i % 10}", i % 2 == 0]
+                    for i in range(rows_count)]
+            insert_many(metadata, "bench", rows)
+            # Прогрев буферного пула
+            select(metadata, "bench", None)
+
+        for where_clause in CONDITIONS:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(repeats):
+                    result = select(metadata, "bench", where_clause)
+            elapsed = (time.perf_counter() - start) / repeats
+            per_row = elapsed / rows_count * 1e9
+            print(f"{where_clause}: {elapsed * 1000:.1f} мс, "
+                  f"{per_row:.0f} нс/строка, найдено {len(result)}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
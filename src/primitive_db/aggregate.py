@@ -0,0 +1,216 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def aggregate_label(item: Any) -> str:
+    """
+    Get output column name of select list item.
+
+    Args:
+        item: Column name or aggregate {"func", "column"}
+
+    Returns:
+        Column name or label like "sum(age)"
+    """
+    if isinstance(item, dict):
+        return f"{item['func']}({item['column']})"
+    return item
+
+def validate_aggregates(
+    column_types: Dict[str, str],
+    items: List[Any],
+    group_by: Optional[List[str]]
+) -> None:
+    """
+    Check aggregate query against table columns.
+
+    Args:
+        column_types: Mapping of column names to types
+        items: Select list with columns and aggregates
+        group_by: Grouping columns or None
+
+    Raises:
+        ValueError: If a column does not exist, SUM/AVG is applied to
+            a non-numeric column or a plain column is not grouped
+    """
+    group_by = group_by or []
+    for column in group_by:
+        if column not in column_types:
+            raise ValueError(f'Column "{column}" does not exist.')
+
+    for item in items:
+        if not isinstance(item, dict):
+            if item not in column_types:
+                raise ValueError(f'Column "{item}" does not exist.')
+            if item not in group_by:
+                raise ValueError(f'Column "{item}" must be in GROUP BY.')
+            continue
+
+        column = item["column"]
+        if column == "*":
+            continue
+        if column not in column_types:
+            raise ValueError(f'Column "{column}" does not exist.')
+        if item["func"] in ("sum", "avg") and column_types[column] != "int":
+            raise ValueError(f"{item['func'].upper()} requires an int column.")
+
+def _new_state(func: str) -> List[Any]:
+    """Create accumulator for aggregate function."""
+    if func == "count":
+        return [0]
+    if func == "avg":
+        return [0, 0]
+    if func == "sum":
+        return [0, False]
+    return [None]
+
+def _final_value(func: str, state: List[Any]) -> Any:
+    """Get aggregate result from accumulator."""
+    if func == "avg":
+        return state[0] / state[1] if state[1] else None
+    if func == "sum":
+        return state[0] if state[1] else None
+    return state[0]
+
+def partial_aggregates(
+    records: Iterable[Dict[str, Any]],
+    items: List[Any],
+    group_by: Optional[List[str]] = None
+) -> Dict[Tuple[Any, ...], List[List[Any]]]:
+    """
+    Accumulate aggregate states per group in one pass.
+
+    States of different record chunks can be combined with
+    merge_aggregates, which lets chunks be aggregated in parallel.
+
+    Args:
+        records: Records to aggregate (may be a lazy iterator)
+        items: Select list with grouped columns and aggregates
+        group_by: Grouping columns or None for a single group
+
+    Returns:
+        Mapping of group key to accumulators in order of first appearance
+    """
+    group_by = group_by or []
+    aggregates = [(item["func"], item["column"])
+                  for item in items if isinstance(item, dict)]
+    groups: Dict[Tuple[Any, ...], List[List[Any]]] = {}
+
+    for record in records:
+        key = tuple(record[column] for column in group_by)
+        states = groups.get(key)
+        if states is None:
+            states = [_new_state(func) for func, _ in aggregates]
+            groups[key] = states
+
+        for state, (func, column) in zip(states, aggregates):
+            if func == "count":
+                if column == "*" or record.get(column) is not None:
+                    state[0] += 1
+                continue
+
+            value = record[column]
+            if func == "sum":
+                state[0] += value
+                state[1] = True
+            elif func == "avg":
+                state[0] += value
+                state[1] += 1
+            elif func == "min":
+                if state[0] is None or value < state[0]:
+                    state[0] = value
+            elif state[0] is None or value > state[0]:
+                state[0] = value
+    return groups
+
+def merge_aggregates(
+    groups: Dict[Tuple[Any, ...], List[List[Any]]],
+    other: Dict[Tuple[Any, ...], List[List[Any]]],
+    items: List[Any]
+) -> None:
+    """
+    Merge aggregate states of a later chunk into earlier ones.
+
+    Args:
+        groups: States of earlier records, modified in place
+        other: States of later records
+        items: Select list the states were computed for
+    """
+    funcs = [item["func"] for item in items if isinstance(item, dict)]
+    for key, states in other.items():
+        target = groups.get(key)
+        if target is None:
+            groups[key] = states
+            continue
+        for func, state, value in zip(funcs, target, states):
+            if func in ("count", "avg"):
+                state[0] += value[0]
+                if func == "avg":
+                    state[1] += value[1]
+            elif func == "sum":
+                state[0] += value[0]
+                state[1] = state[1] or value[1]
+            elif value[0] is None:
+                continue
+            elif state[0] is None:
+                state[0] = value[0]
+            elif func == "min" and value[0] < state[0]:
+                state[0] = value[0]
+            elif func == "max" and value[0] > state[0]:
+                state[0] = value[0]
+
+def final_aggregates(
+    groups: Dict[Tuple[Any, ...], List[List[Any]]],
+    items: List[Any],
+    group_by: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Turn aggregate states into result rows.
+
+    Args:
+        groups: States from partial_aggregates/merge_aggregates
+        items: Select list with grouped columns and aggregates
+        group_by: Grouping columns or None for a single group
+
+    Returns:
+        One row per group, keyed by labels
+    """
+    group_by = group_by or []
+    aggregates = [(i, item["func"])
+                  for i, item in enumerate(items) if isinstance(item, dict)]
+
+    # Без GROUP BY агрегаты пустой выборки дают одну строку
+    if not groups and not group_by:
+        groups = {(): [_new_state(func) for _, func in aggregates]}
+
+    rows = []
+    for key, states in groups.items():
+        group_values = dict(zip(group_by, key))
+        finals = {i: _final_value(func, state)
+                  for state, (i, func) in zip(states, aggregates)}
+        rows.append({
+            aggregate_label(item): finals[i] if i in finals else group_values[item]
+            for i, item in enumerate(items)
+        })
+    return rows
+
+def aggregate_records(
+    records: Iterable[Dict[str, Any]],
+    items: List[Any],
+    group_by: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Compute aggregates in one pass with hash aggregation.
+
+    Only one accumulator per aggregate and group is kept in memory,
+    records themselves are not stored.
+
+    Args:
+        records: Records to aggregate (may be a lazy iterator)
+        items: Select list with grouped columns and aggregates
+        group_by: Grouping columns or None for a single group
+
+    Returns:
+        One row per group in order of first appearance, keyed by labels
+    """
+    groups = partial_aggregates(records, items, group_by)
+    return final_aggregates(groups, items, group_by)
@@ -0,0 +1,183 @@
+import json
+import socket
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from src.primitive_db.constants import CLIENT_POOL_SIZE, SERVER_SOCKET
+
+# Адрес сервера: путь Unix-сокета или пара (хост, порт)
+Address = Union[str, Tuple[str, int]]
+
+
+def connect_pool(
+    address: Address = SERVER_SOCKET,
+    size: int = CLIENT_POOL_SIZE,
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Create a pool of connections to a `database serve` server.
+
+    Connections are opened on demand and reused; at most size of them
+    are open at once, other callers wait for a free one. The pool is
+    safe to share between threads.
+
+    Args:
+        address: Unix socket path or (host, port) of a TCP server
+        size: Maximum number of open connections
+        timeout: Socket timeout in seconds, None to wait forever
+
+    Returns:
+        Pool structure for execute, execute_many and close_pool
+    """
+    return {
+        "address": address,
+        "timeout": timeout,
+        "idle": [],
+        "slots": threading.BoundedSemaphore(size),
+        "lock": threading.Lock(),
+        "closed": False,
+    }
+
+def _open_connection(pool: Dict[str, Any]) -> Dict[str, Any]:
+    """Connect to the server of the pool."""
+    address = pool["address"]
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(pool["timeout"])
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+    else:
+        sock = socket.create_connection(address, timeout=pool["timeout"])
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return {"socket": sock, "file": sock.makefile("rwb")}
+
+def _close_connection(connection: Dict[str, Any]) -> None:
+    """Close connection, ignoring errors of a broken socket."""
+    try:
+        connection["file"].close()
+    except OSError:
+        pass
+    connection["socket"].close()
+
+def _acquire(pool: Dict[str, Any]) -> Dict[str, Any]:
+    """Take idle connection or open a new one, waiting for a free slot."""
+    if pool["closed"]:
+        raise ValueError("Пул соединений закрыт")
+    pool["slots"].acquire()
+    with pool["lock"]:
+        if pool["idle"]:
+            return pool["idle"].pop()
+    try:
+        return _open_connection(pool)
+    except BaseException:
+        pool["slots"].release()
+        raise
+
+def _release(pool: Dict[str, Any], connection: Dict[str, Any], reuse: bool) -> None:
+    """Return connection to the pool, closing it if it cannot be reused."""
+    with pool["lock"]:
+        if reuse and not pool["closed"]:
+            pool["idle"].append(connection)
+            connection = None
+    if connection is not None:
+        _close_connection(connection)
+    pool["slots"].release()
+
+def _encode_command(command: str) -> bytes:
+    """Encode command as one request line."""
+    if "\n" in command or "\r" in command:
+        raise ValueError("Команда не может содержать перевод строки")
+    return command.encode("utf-8") + b"\n"
+
+def _is_exit(command: str) -> bool:
+    """Check whether the server closes the connection after command."""
+    words = command.strip().rstrip(";").split()
+    return bool(words) and words[0].lower() == "exit"
+
+def _read_response(connection: Dict[str, Any]) -> Dict[str, Any]:
+    """Read one response line of the server."""
+    line = connection["file"].readline()
+    if not line:
+        raise ConnectionError("Сервер закрыл соединение")
+    return json.loads(line)
+
+def execute_many(pool: Dict[str, Any], commands: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Execute commands on one connection without waiting between them.
+
+    All commands are sent before the responses are read, so a batch
+    costs about one round trip. A transaction left open by the commands
+    is rolled back before the connection goes back to the pool, so it
+    never leaks to the next caller. exit closes the connection: later
+    commands are not executed and get no response.
+
+    Args:
+        pool: Connection pool
+        commands: Commands in the grammar of engine.run (one line each)
+
+    Returns:
+        Responses in command order: {"ok": bool, "output": str,
+        "transaction": bool}, where ok is False if the command stopped
+        with an unhandled error and transaction is True while a
+        transaction is open
+
+    Raises:
+        ConnectionError: If the connection to the server was lost
+    """
+    commands = list(commands)
+    request = b"".join(_encode_command(command) for command in commands)
+    count = next((number for number, command in enumerate(commands, 1)
+                  if _is_exit(command)), None)
+    closing = count is not None
+    connection = _acquire(pool)
+    reuse = False
+    try:
+        connection["file"].write(request)
+        connection["file"].flush()
+        responses = [_read_response(connection)
+                     for _ in range(count if closing else len(commands))]
+        if responses and responses[-1]["transaction"] and not closing:
+            connection["file"].write(_encode_command("rollback"))
+            connection["file"].flush()
+            _read_response(connection)
+        reuse = not closing
+    finally:
+        _release(pool, connection, reuse)
+    return responses
+
+def execute(pool: Dict[str, Any], command: str) -> str:
+    """
+    Execute one command and return its output.
+
+    Args:
+        pool: Connection pool
+        command: Command in the grammar of engine.run
+
+    Returns:
+        Text the command printed
+
+    Raises:
+        ValueError: If the command stopped with an unhandled error
+        ConnectionError: If the connection to the server was lost
+    """
+    response = execute_many(pool, [command])[0]
+    if not response["ok"]:
+        raise ValueError(response["output"].strip())
+    return response["output"]
+
+def close_pool(pool: Dict[str, Any]) -> None:
+    """
+    Close idle connections; busy ones are closed when they are returned.
+
+    Args:
+        pool: Connection pool
+    """
+    with pool["lock"]:
+        pool["closed"] = True
+        idle = pool["idle"]
+        pool["idle"] = []
+    for connection in idle:
+        _close_connection(connection)
@@ -0,0 +1,365 @@
+import json
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.primitive_db.constants import (
+    COLUMNAR_INT_MAX,
+    COLUMNAR_INT_MIN,
+    COLUMNAR_MAGIC,
+)
+
+# Допустимые Python-типы значений для каждого типа столбца
+_PYTHON_TYPES = {"int": int, "bool": bool, "str": str}
+
+# Заголовок файла: магическая строка + длина JSON-описания столбцов
+_HEADER = struct.Struct("<4sI")
+
+
+def _check_values(name: str, col_type: str, values: List[Any]) -> None:
+    """Ensure all values of column have its exact type and fit its storage."""
+    expected = _PYTHON_TYPES[col_type]
+    for value in values:
+        # bool - подкласс int, поэтому сравниваем тип точно
+        if type(value) is not expected or not fits_columnar(value):
+            raise ValueError(
+                f'Invalid value {value!r} for column "{name}" of type {col_type}')
+
+def fits_columnar(value: Any) -> bool:
+    """
+    Check that value can be stored in a columnar snapshot.
+
+    Args:
+        value: Column value of its exact type
+
+    Returns:
+        False for int values outside the 64-bit range, True otherwise
+    """
+    if type(value) is int:
+        return COLUMNAR_INT_MIN <= value <= COLUMNAR_INT_MAX
+    return True
+
+def encode_columnar(
+    column_types: Dict[str, str],
+    records: List[Dict[str, Any]]
+) -> bytes:
+    """
+    Encode records into columnar binary snapshot.
+
+    Layout: magic, header length, JSON header, then one block per column.
+    int columns are stored as array('q'), bool columns as bitmaps and str
+    columns as an offsets array('q') followed by a UTF-8 data buffer.
+
+    Args:
+        column_types: Mapping of column names to types (including ID)
+        records: Records in table order
+
+    Returns:
+        Encoded snapshot bytes
+
+    Raises:
+        ValueError: If a value is missing or does not match its column type
+    """
+    count = len(records)
+    blocks = []
+    columns = []
+
+    for name, col_type in column_types.items():
+        values = [record.get(name) for record in records]
+        _check_values(name, col_type, values)
+        if col_type == "int":
+            block = array('q', values).tobytes()
+            columns.append({"name": name, "type": col_type,
+                            "length": len(block)})
+            blocks.append(block)
+        elif col_type == "bool":
+            bitmap = bytearray((count + 7) // 8)
+            for i, value in enumerate(values):
+                if value:
+                    bitmap[i >> 3] |= 1 << (i & 7)
+            columns.append({"name": name, "type": col_type,
+                            "length": len(bitmap)})
+            blocks.append(bytes(bitmap))
+        else:
+            encoded = [value.encode('utf-8') for value in values]
+            offsets = array('q', [0])
+            for item in encoded:
+                offsets.append(offsets[-1] + len(item))
+            offsets_block = offsets.tobytes()
+            data_block = b"".join(encoded)
+            columns.append({"name": name, "type": col_type,
+                            "length": len(offsets_block),
+                            "data_length": len(data_block)})
+            blocks.append(offsets_block)
+            blocks.append(data_block)
+
+    ids = [record["ID"] for record in records]
+    header = {
+        "count": count,
+        "byteorder": sys.byteorder,
+        "sorted_ids": all(a < b for a, b in zip(ids, ids[1:])),
+        "columns": columns,
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    return (_HEADER.pack(COLUMNAR_MAGIC, len(header_bytes)) + header_bytes
+            + b"".join(blocks))
+
+def _read_array(buffer: Any, start: int, length: int, swap: bool) -> Any:
+    """
+    Get int64 column from buffer slice.
+
+    With native byte order this is a zero-copy memoryview over the buffer
+    (which may be a memory-mapped file); otherwise a swapped copy.
+    """
+    if not swap:
+        return memoryview(buffer)[start:start + length].cast('q')
+    values = array('q')
+    values.frombytes(buffer[start:start + length])
+    values.byteswap()
+    return values
+
+def decode_columnar(buffer: Any) -> Dict[str, Any]:
+    """
+    Decode columnar snapshot header and map column blocks.
+
+    Column blocks are not copied: they are views over the buffer, so with
+    a memory-mapped file only the pages a query touches are read.
+
+    Args:
+        buffer: Snapshot contents (bytes or mmap)
+
+    Returns:
+        Columnar table structure
+
+    Raises:
+        ValueError: If buffer is not a columnar snapshot
+    """
+    magic, header_length = _HEADER.unpack_from(buffer, 0)
+    if magic != COLUMNAR_MAGIC:
+        raise ValueError("Файл не является колоночным снимком таблицы")
+
+    position = _HEADER.size
+    header = json.loads(buffer[position:position + header_length])
+    position += header_length
+    swap = header["byteorder"] != sys.byteorder
+
+    columns: Dict[str, Any] = {}
+    types: Dict[str, str] = {}
+    for column in header["columns"]:
+        name, col_type = column["name"], column["type"]
+        types[name] = col_type
+        if col_type == "int":
+            columns[name] = _read_array(buffer, position, column["length"], swap)
+            position += column["length"]
+        elif col_type == "bool":
+            end = position + column["length"]
+            columns[name] = memoryview(buffer)[position:end]
+            position = end
+        else:
+            offsets = _read_array(buffer, position, column["length"], swap)
+            position += column["length"]
+            end = position + column["data_length"]
+            columns[name] = (offsets, memoryview(buffer)[position:end])
+            position = end
+
+    return new_columnar_table(header["count"], types, columns,
+                              header["sorted_ids"])
+
+def new_columnar_table(
+    count: int,
+    types: Dict[str, str],
+    columns: Dict[str, Any],
+    sorted_ids: bool = True
+) -> Dict[str, Any]:
+    """
+    Build columnar table structure.
+
+    Mutations from the table log are kept in an overlay (changed and
+    inserted records) and a set of deleted IDs until compaction.
+
+    Args:
+        count: Number of records in column arrays
+        types: Mapping of column names to types
+        columns: Decoded column data
+        sorted_ids: Whether the ID column is ascending
+
+    Returns:
+        Columnar table structure
+    """
+    return {
+        "format": "columnar",
+        "count": count,
+        "types": types,
+        "columns": columns,
+        "sorted_ids": sorted_ids,
+        "overlay": {},
+        "deleted": set(),
+    }
+
+def decode_value(table: Dict[str, Any], column: str, position: int) -> Any:
+    """
+    Decode one column value of the record at given position.
+
+    Args:
+        table: Columnar table structure
+        column: Column name
+        position: Record position in column arrays
+
+    Returns:
+        Column value
+    """
+    col_type = table["types"][column]
+    data = table["columns"][column]
+    if col_type == "int":
+        return data[position]
+    if col_type == "bool":
+        return bool((data[position >> 3] >> (position & 7)) & 1)
+    offsets, buffer = data
+    return str(buffer[offsets[position]:offsets[position + 1]], 'utf-8')
+
+def decode_record(
+    table: Dict[str, Any],
+    position: int,
+    columns: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Materialize record at given position.
+
+    Args:
+        table: Columnar table structure
+        position: Record position in column arrays
+        columns: Columns to decode (all by default)
+
+    Returns:
+        Record dictionary
+    """
+    names = columns if columns is not None else table["types"]
+    return {name: decode_value(table, name, position) for name in names}
+
+def find_position(table: Dict[str, Any], record_id: Any) -> Optional[int]:
+    """
+    Find position of record ID in column arrays.
+
+    Args:
+        table: Columnar table structure
+        record_id: Record ID
+
+    Returns:
+        Position or None if ID is not stored in column arrays
+    """
+    ids = table["columns"]["ID"]
+    if table["sorted_ids"]:
+        position = bisect_left(ids, record_id)
+        if position < table["count"] and ids[position] == record_id:
+            return position
+        return None
+    for position in range(table["count"]):
+        if ids[position] == record_id:
+            return position
+    return None
+
+def apply_columnar_entries(
+    table: Dict[str, Any],
+    entries: List[Dict[str, Any]]
+) -> None:
+    """
+    Apply table log entries to the overlay of a columnar table.
+
+    Args:
+        table: Columnar table structure, modified in place
+        entries: Log entries to apply
+    """
+    overlay = table["overlay"]
+    deleted = table["deleted"]
+    for entry in entries:
+        op = entry.get("op")
+        if op == "insert":
+            overlay[entry["row"]["ID"]] = entry["row"]
+            deleted.discard(entry["row"]["ID"])
+        elif op == "update":
+            record_id = entry["row"]["ID"]
+            if record_id in deleted:
+                continue
+            if record_id in overlay or find_position(table, record_id) is not None:
+                overlay[record_id] = entry["row"]
+        elif op == "delete":
+            overlay.pop(entry["id"], None)
+            deleted.add(entry["id"])
+
+def iter_columnar_records(
+    table: Dict[str, Any],
+    columns: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield records of a columnar table in table order.
+
+    Args:
+        table: Columnar table structure
+        columns: Columns to decode (all by default)
+
+    Yields:
+        Record dictionaries
+    """
+    ids = table["columns"]["ID"]
+    overlay = table["overlay"]
+    deleted = table["deleted"]
+
+    for position in range(table["count"]):
+        record_id = ids[position]
+        if record_id in deleted:
+            continue
+        if record_id in overlay:
+            yield overlay[record_id]
+        else:
+            yield decode_record(table, position, columns)
+
+    # Вставленные после снимка записи идут в конце
+    for record_id, record in overlay.items():
+        if find_position(table, record_id) is None:
+            yield record
+
+def get_columnar_record(
+    table: Dict[str, Any],
+    record_id: Any,
+    columns: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Get one record of a columnar table by ID.
+
+    Args:
+        table: Columnar table structure
+        record_id: Record ID
+        columns: Columns to decode (all by default)
+
+    Returns:
+        Record dictionary or None if not found
+    """
+    if record_id in table["deleted"]:
+        return None
+    if record_id in table["overlay"]:
+        return table["overlay"][record_id]
+    position = find_position(table, record_id)
+    if position is None:
+        return None
+    return decode_record(table, position, columns)
+
+def count_columnar_records(table: Dict[str, Any]) -> int:
+    """
+    Count live records of a columnar table.
+
+    Args:
+        table: Columnar table structure
+
+    Returns:
+        Number of records
+    """
+    count = table["count"]
+    for record_id in table["deleted"]:
+        if find_position(table, record_id) is not None:
+            count -= 1
+    for record_id in table["overlay"]:
+        if find_position(table, record_id) is None:
+            count += 1
+    return count
@@ -7,7 +7,111 @@ DATA_DIR = "data"
 # Поддерживаемые типы данных
 SUPPORTED_TYPES = {"int", "str", "bool"}
 
+# Форматы хранения таблиц: построчный JSON или колоночный бинарный снимок
+STORAGE_FORMATS = {"row", "columnar"}
+COLUMNAR_SUFFIX = ".col"
+COLUMNAR_MAGIC = b"PDBC"
+# int-столбцы колоночных таблиц хранятся 64-битными целыми
+COLUMNAR_INT_MIN = -2 ** 63
+COLUMNAR_INT_MAX = 2 ** 63 - 1
+# Читать колоночные снимки через mmap (без копирования в память)
+USE_MMAP = True
+
+# Построчные таблицы хранятся сегментами по SEGMENT_ROWS записей
+# (data/<table>.<n>.seg) с каталогом диапазонов ID и зон min/max
+SEGMENT_SUFFIX = ".seg"
+SEGMENTS_SUFFIX = ".segments"
+SEGMENT_ROWS = 10000
+
+# Кодек файлов данных построчных таблиц и метаданных по умолчанию:
+# json - компактный JSON (через orjson, если он установлен), msgpack - если
+# установлен. Файлы не-JSON кодеков начинаются с CODEC_MAGIC, имени кодека и "\n"
+DEFAULT_CODEC = "json"
+CODEC_MAGIC = b"\x00PDB"
+
+# Файлы блокировок таблиц (data/<table>.lock) и метаданных (db_meta.json.lock)
+LOCK_SUFFIX = ".lock"
+# Сколько раз запись пересчитывается, если таблицу изменил другой процесс
+WRITE_CONFLICT_RETRIES = 3
+
+# Журнал изменений таблиц (append-only log)
+LOG_SUFFIX = ".log"
+# Минимальный размер журнала (в байтах), после которого возможна компакция
+LOG_COMPACT_MIN_BYTES = 1024 * 1024
+
+# Запись фиксации транзакции (data/<id>.redo): все ее изменения до записи
+# в журналы таблиц; после сбоя применяется заново целиком
+REDO_SUFFIX = ".redo"
+
+# Group commit: запись журнала возвращается только после fsync; писатели,
+# пришедшие во время fsync, разделяют следующий. Задержка - сколько первый
+# из них ждет остальных перед fsync (0 - не ждать)
+WAL_GROUP_COMMIT_DELAY = 0
+
+# Файлы индексов: data/<table>.<column>.idx
+INDEX_SUFFIX = ".idx"
+# Суффикс файла статистики таблицы (число записей, min/max столбцов)
+STATS_SUFFIX = ".stats"
+# Операторы сравнения WHERE (длинные раньше коротких)
+WHERE_OPERATORS = [">=", "<=", "!=", ">", "<", "="]
+
+# Операторы сравнения WHERE и их запись в Python
+COMPARISON_OPERATORS = {
+    "=": "==",
+    "!=": "!=",
+    ">": ">",
+    "<": "<",
+    ">=": ">=",
+    "<=": "<=",
+}
+# Операторы, которые обслуживаются упорядоченным индексом
+RANGE_OPERATORS = {">", "<", ">=", "<="}
+
+# Планировщик: во сколько раз выборка записи по ID дороже проверки при переборе.
+# Замер на 100 000 записей: поиск в индексе и выборка одной записи стоят
+# 2.5-4 проверки при переборе (таблица читается один раз на весь запрос)
+PLANNER_INDEX_FETCH_COST = 4
+# Оценки доли подходящих записей для условий без индекса
+PLANNER_SELECTIVITY = {"=": 0.1, "!=": 0.9, "range": 1 / 3}
+
+# Бюджет буферного пула таблиц (по размеру файлов на диске)
+TABLE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Количество строк, записываемых за один раз при загрузке из файла
+LOAD_BATCH_SIZE = 10000
+
+# Агрегатные функции select
+AGGREGATE_FUNCTIONS = {"count", "sum", "min", "max", "avg"}
+
+# Сколько записей ORDER BY сортирует в памяти, прежде чем сбрасывать на диск
+SORT_BUFFER_ROWS = 200000
+
+# Кэш результатов запросов: максимум записей и время жизни в секундах
+QUERY_CACHE_MAX_ENTRIES = 128
+QUERY_CACHE_TTL = 300
+
+# Количество строк на одной странице вывода select
+SELECT_PAGE_SIZE = 100
+
+# Фильтровать и агрегировать колоночные таблицы через NumPy, если он установлен
+USE_NUMPY = True
+
+# Параллельный перебор колоночных таблиц: число процессов (1 - без пула),
+# минимальный размер таблицы и число частей на один процесс
+SCAN_WORKERS = 1
+PARALLEL_SCAN_MIN_ROWS = 100000
+PARALLEL_CHUNKS_PER_WORKER = 4
+
+# Сервер (database serve): Unix-сокет по умолчанию или TCP на localhost,
+# максимальная длина строки команды в байтах
+SERVER_SOCKET = "db.sock"
+SERVER_HOST = "127.0.0.1"
+SERVER_MAX_LINE_BYTES = 16 * 1024 * 1024
+# Клиент: максимум одновременно открытых соединений пула
+CLIENT_POOL_SIZE = 4
+
 # Сообщения
 ERROR_TABLE_NOT_FOUND = 'Таблица "{}" не существует.'
+ERROR_CONCURRENT_WRITE = "{} изменены другим процессом. Повторите команду."
 ERROR_COLUMN_DEFINITION = "Неверное определение столбца: {}"
-ERROR_UNSUPPORTED_TYPE = "Неподдерживаемый тип: {}. Поддерживаемые типы: {}"
\ No newline at end of file
+ERROR_UNSUPPORTED_TYPE = "Неподдерживаемый тип: {}. Поддерживаемые типы: {}"
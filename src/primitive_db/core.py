@@ -1,15 +1,110 @@
-from typing import Any, Dict, List, Optional, Tuple
+import os
+from contextlib import ExitStack
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 from prettytable import PrettyTable
 
+from src.primitive_db.aggregate import (
+    aggregate_label,
+    aggregate_records,
+    validate_aggregates,
+)
+from src.primitive_db.columnar import fits_columnar
 from src.primitive_db.constants import (
+    COMPARISON_OPERATORS,
     ERROR_COLUMN_DEFINITION,
+    ERROR_CONCURRENT_WRITE,
     ERROR_TABLE_NOT_FOUND,
     ERROR_UNSUPPORTED_TYPE,
+    PLANNER_INDEX_FETCH_COST,
+    SELECT_PAGE_SIZE,
+    STORAGE_FORMATS,
     SUPPORTED_TYPES,
+    WRITE_CONFLICT_RETRIES,
 )
 from src.primitive_db.decorators import confirm_action, handle_db_errors, log_time
-from src.primitive_db.utils import load_table_data, save_metadata, save_table_data
+from src.primitive_db.index import (
+    build_index,
+    compute_index_entries,
+    drop_table_indexes,
+    get_query_indexes,
+    get_table_indexes,
+    iter_index_ids,
+    load_index,
+    lookup_index,
+    update_table_indexes,
+)
+from src.primitive_db.join import (
+    hash_join,
+    index_join,
+    qualify_records,
+    qualify_where,
+    split_join_where,
+)
+from src.primitive_db.locks import metadata_lock, table_lock
+from src.primitive_db.parallel import (
+    can_scan_parallel,
+    parallel_aggregate,
+    parallel_select,
+)
+from src.primitive_db.planner import plan_query, where_columns
+from src.primitive_db.sort import sort_records
+from src.primitive_db.stats import (
+    apply_stats_changes,
+    compute_table_stats,
+    drop_table_stats,
+    get_table_stats,
+    is_table_stats_current,
+    save_table_stats,
+)
+from src.primitive_db.utils import (
+    append_table_log,
+    apply_table_entries,
+    copy_table,
+    count_table_records,
+    create_table_storage,
+    ensure_data_dir,
+    expand_log_entries,
+    get_redo_paths,
+    get_table_codec,
+    get_table_record,
+    get_table_records,
+    get_table_stamp,
+    invalidate_table_cache,
+    iter_records,
+    iter_table_records,
+    iter_zone_records,
+    load_metadata,
+    load_table_data,
+    new_redo_path,
+    read_data_file,
+    read_table,
+    save_metadata,
+    set_table_views,
+    sync_wal,
+    write_data_file,
+)
+from src.primitive_db.vectorized import (
+    can_vectorize,
+    iter_vectorized_records,
+    vectorized_aggregate,
+)
+
+# Открытая транзакция: {"tables": имя -> {"version", "entries", "changes"},
+# "views": имя -> копия таблицы с незафиксированными изменениями} или None
+_transaction: Optional[Dict[str, Any]] = None
 
 
 @handle_db_errors
@@ -46,7 +141,8 @@ def validate_column_definition(column_def: str) -> Tuple[str, str]:
 def create_table(
     metadata: Dict[str, Any],
     table_name: str,
-    columns: List[str]
+    columns: List[str],
+    storage: str = "row"
 ) -> bool:
     """
     Create new table in metadata.
@@ -55,6 +151,7 @@ def create_table(
         metadata: Current database metadata
         table_name: Table name
         columns: List of column definitions
+        storage: Storage format, "row" (JSON) or "columnar"
 
     Returns:
         True if successful, False otherwise
@@ -62,6 +159,10 @@ def create_table(
     if table_name in metadata:
         raise ValueError(f'Table "{table_name}" already exists.')
 
+    if storage not in STORAGE_FORMATS:
+        supported = ", ".join(sorted(STORAGE_FORMATS))
+        raise ValueError(f"Unsupported storage: {storage}. Supported: {supported}")
+
     # Добавляем столбец ID
     table_columns = ["ID:int"]
 
@@ -70,11 +171,22 @@ def create_table(
         name, col_type = validate_column_definition(column_def)
         table_columns.append(f"{name}:{col_type}")
 
+    # Готовим файлы данных в выбранном формате
+    column_types = dict(col_def.split(":") for col_def in table_columns)
+    if not create_table_storage(table_name, column_types, storage):
+        return False
+
     # Сохраняем струкутуру таблицы
     metadata[table_name] = {
         "columns": table_columns,
+        "indexes": ["ID"],
+        "next_id": 1,
+        "storage": storage,
     }
 
+    save_table_stats(table_name, {"count": 0, "min": {}, "max": {},
+                                  "complete": True})
+
     # Сохраняем метаданные и возвращаем результат
     result = save_metadata(metadata)
     print(f"DEBUG create_table: save_metadata returned {result}, type: {type(result)}")
@@ -98,24 +210,115 @@ def drop_table(metadata: dict, table_name: str) -> bool:
         return False
     
     try:
-        # Удаляем из метаданных
-        del metadata[table_name]
-        
-        # Удаляем файл данных
+        # Удаляем индексы и метаданные
         import os
 
-        from src.primitive_db.utils import get_table_data_path
-        
-        data_file = get_table_data_path(table_name)
-        if os.path.exists(data_file):
-            os.remove(data_file)
-            print(f"Файл данных {data_file} удален")
+        from src.primitive_db.utils import (
+            drop_table_segments,
+            get_table_columnar_path,
+            get_table_data_path,
+            get_table_log_path,
+        )
+
+        # Файлы удаляются под блокировкой записи: читатели других
+        # процессов видят таблицу целиком или не видят ее
+        with table_lock(table_name, exclusive=True):
+            drop_table_indexes(metadata, table_name)
+            drop_table_stats(table_name)
+            invalidate_table_cache(table_name)
+            del metadata[table_name]
+
+            # Удаляем файл данных
+            data_file = get_table_data_path(table_name)
+            if os.path.exists(data_file):
+                os.remove(data_file)
+                print(f"Файл данных {data_file} удален")
+
+            for extra_file in (get_table_columnar_path(table_name),
+                               get_table_log_path(table_name)):
+                if os.path.exists(extra_file):
+                    os.remove(extra_file)
+            drop_table_segments(table_name)
         
         return True
     except Exception as e:
         print(f"Ошибка при удалении таблицы: {e}")
         return False
 
+@handle_db_errors
+def create_index(
+    metadata: Dict[str, Any],
+    table_name: str,
+    column: str
+) -> bool:
+    """
+    Create persistent index on table column.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        column: Column to index
+
+    Returns:
+        True if successful, False otherwise
+    """
+    if table_name not in metadata:
+        raise ValueError(ERROR_TABLE_NOT_FOUND.format(table_name))
+
+    if column not in get_column_types(metadata, table_name):
+        raise ValueError(f'Column "{column}" does not exist.')
+
+    indexes = get_table_indexes(metadata, table_name)
+    if column in indexes:
+        raise ValueError(f'Index on "{column}" already exists.')
+
+    # Метаданные сохраняются уже без блокировки таблицы: блокировки
+    # таблиц и метаданных никогда не удерживаются вместе
+    with table_lock(table_name, exclusive=True):
+        if not build_index(table_name, column, load_table_data(table_name)):
+            return False
+
+    metadata[table_name]["indexes"] = indexes + [column]
+    return save_metadata(metadata)
+
+def fetch_records(
+    table_name: str,
+    candidate_ids: Optional[Set[Any]] = None,
+    columns: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Get lazy iterator over table records, optionally only given IDs.
+
+    Args:
+        table_name: Table name
+        candidate_ids: IDs found by index lookup, None for all records
+        columns: Columns to decode for columnar tables (all by default)
+
+    Returns:
+        Iterator over records in table order (in ID order for candidates)
+    """
+    if candidate_ids is None:
+        return iter_table_records(table_name, columns)
+    return fetch_records_by_ids(table_name, sorted(candidate_ids), columns)
+
+def fetch_records_by_ids(
+    table_name: str,
+    record_ids: Iterable[Any],
+    columns: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield table records with given IDs in the order of the IDs.
+
+    Args:
+        table_name: Table name
+        record_ids: Record IDs
+        columns: Columns to decode for columnar tables (all by default)
+
+    Returns:
+        Iterator over found records
+    """
+    return get_table_records(table_name, record_ids, columns)
+
 @handle_db_errors
 def list_tables(metadata: Dict[str, Any]) -> List[str]:
     """
@@ -165,10 +368,9 @@ def get_column_types(metadata: Dict[str, Any], table_name: str) -> Dict[str, str
         types[name] = col_type
     return types
 
-@handle_db_errors
-def validate_value_type(value: Any, expected_type: str) -> Any:
+def convert_value(value: Any, expected_type: str) -> Any:
     """
-    Validate and convert value to expected type.
+    Convert value to expected type.
 
     Args:
         value: Input value
@@ -188,6 +390,8 @@ def validate_value_type(value: Any, expected_type: str) -> Any:
     elif expected_type == "bool":
         if isinstance(value, bool):
             return value
+        if isinstance(value, int) and value in (0, 1):
+            return bool(value)
         if isinstance(value, str):
             if value.lower() in ["true", "1", "yes"]:
                 return True
@@ -199,13 +403,817 @@ def validate_value_type(value: Any, expected_type: str) -> Any:
     else:
         raise ValueError(f"Unsupported type: {expected_type}")
 
+@handle_db_errors
+def validate_value_type(value: Any, expected_type: str) -> Any:
+    """
+    Validate and convert value to expected type.
+
+    Args:
+        value: Input value
+        expected_type: Expected type name
+
+    Returns:
+        Converted value
+
+    Raises:
+        ValueError: If value cannot be converted to expected type
+    """
+    return convert_value(value, expected_type)
+
+def normalize_where(where_clause: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert WHERE conditions into a condition tree.
+
+    Trees from parse_where_condition are returned as is. Flat dictionaries
+    ({column: value} or {column: {"operator", "value"}}) become an AND
+    of comparisons.
+
+    Args:
+        where_clause: Condition tree or flat filter conditions
+
+    Returns:
+        Condition tree
+    """
+    if where_clause.get("op") in ("and", "or", "not", "cmp", "in") and (
+            "args" in where_clause or "column" in where_clause):
+        return where_clause
+
+    args = []
+    for column, condition in where_clause.items():
+        if isinstance(condition, dict) and "operator" in condition:
+            args.append({"op": "cmp", "column": column,
+                         "operator": condition["operator"],
+                         "value": condition["value"]})
+        else:
+            args.append({"op": "cmp", "column": column, "operator": "=",
+                         "value": condition})
+    return args[0] if len(args) == 1 else {"op": "and", "args": args}
+
+def coerce_where(
+    column_types: Dict[str, str],
+    tree: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Convert values in condition tree to the types of their columns.
+
+    Args:
+        column_types: Mapping of column names to types
+        tree: Condition tree
+
+    Returns:
+        Condition tree with converted values
+
+    Raises:
+        ValueError: If a column does not exist, a value cannot be
+            converted to its column type or an operator is not supported
+    """
+    op = tree["op"]
+    if op in ("and", "or", "not"):
+        return {"op": op,
+                "args": [coerce_where(column_types, arg) for arg in tree["args"]]}
+
+    col_type = column_types.get(tree["column"])
+    if col_type is None:
+        # Опечатка в имени столбца не должна превращаться в константу:
+        # под NOT такое условие выполнялось бы для всех записей
+        raise ValueError(f'Column "{tree["column"]}" does not exist.')
+    if op == "in":
+        values = [convert_value(value, col_type) for value in tree["values"]]
+        return {"op": "in", "column": tree["column"], "values": values}
+
+    if tree["operator"] not in COMPARISON_OPERATORS:
+        raise ValueError(f"Unsupported operator: {tree['operator']}")
+    value = convert_value(tree["value"], col_type)
+    return {"op": "cmp", "column": tree["column"],
+            "operator": tree["operator"], "value": value}
+
+def _where_source(
+    column_types: Dict[str, str],
+    tree: Dict[str, Any],
+    namespace: Dict[str, Any]
+) -> str:
+    """Generate Python expression for condition tree, binding values."""
+    op = tree["op"]
+    if op in ("and", "or"):
+        parts = [_where_source(column_types, arg, namespace) for arg in tree["args"]]
+        return "(" + f" {op} ".join(parts) + ")"
+    if op == "not":
+        return f"(not {_where_source(column_types, tree['args'][0], namespace)})"
+
+    column = tree["column"]
+    if column not in column_types:
+        raise ValueError(f'Column "{column}" does not exist.')
+
+    name = f"v{len(namespace) - 1}"
+    if op == "in":
+        namespace[name] = frozenset(tree["values"])
+        return f"r[{column!r}] in {name}"
+
+    namespace[name] = tree["value"]
+    return f"r[{column!r}] {COMPARISON_OPERATORS[tree['operator']]} {name}"
+
+def compile_where(
+    column_types: Dict[str, str],
+    tree: Optional[Dict[str, Any]]
+) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Compile condition tree into a single predicate function.
+
+    The tree is turned into one Python expression once per query,
+    so rows are checked without per-row dispatch on operator strings,
+    and "and"/"or" short-circuit in the order of the tree arguments.
+    Column names are embedded as literals and values are bound as
+    variables, never as source text.
+
+    Args:
+        column_types: Mapping of column names to types
+        tree: Condition tree with values already coerced
+
+    Returns:
+        Function returning True for matching records
+    """
+    if not tree:
+        return lambda record: True
+
+    namespace: Dict[str, Any] = {"__builtins__": {}}
+    source = f"lambda r: {_where_source(column_types, tree, namespace)}"
+    return eval(source, namespace)
+
+def project_records(
+    records: Iterable[Dict[str, Any]],
+    columns: List[str]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily keep only given columns of records.
+
+    Args:
+        records: Records to project
+        columns: Columns to keep, in output order
+
+    Yields:
+        New record dictionaries with given columns
+    """
+    for record in records:
+        yield {column: record[column] for column in columns}
+
+def plan_where(
+    metadata: Dict[str, Any],
+    table_name: str,
+    where_clause: Dict[str, Any]
+) -> Tuple[Callable[[Dict[str, Any]], bool], Optional[Set[Any]]]:
+    """
+    Prepare filtered query: coerce values, plan access and compile predicate.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        where_clause: Condition tree or flat filter conditions
+
+    Returns:
+        Tuple of (predicate, candidate IDs or None for full scan)
+    """
+    column_types = get_column_types(metadata, table_name)
+    tree = coerce_where(column_types, normalize_where(where_clause))
+    plan = plan_query(metadata, table_name, column_types, tree)
+    return compile_where(column_types, plan["tree"]), plan["candidate_ids"]
+
+def scan_records(
+    table_name: str,
+    column_types: Dict[str, str],
+    where_clause: Optional[Dict[str, Any]],
+    predicate: Optional[Callable[[Dict[str, Any]], bool]],
+    columns: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Get lazy iterator over matching records of a full table scan.
+
+    Conditions are evaluated on NumPy column arrays when possible, large
+    columnar tables are split between worker processes, everything else
+    is filtered record by record in this process, skipping segments of
+    row tables whose zone maps rule the condition out.
+
+    Args:
+        table_name: Table name
+        column_types: Mapping of column names to types
+        where_clause: Optional filter conditions
+        predicate: Compiled where_clause or None
+        columns: Columns to decode for columnar tables (all by default)
+
+    Returns:
+        Iterator over matching records in table order
+    """
+    tree = None
+    if where_clause is not None:
+        tree = coerce_where(column_types, normalize_where(where_clause))
+    table = read_table(table_name)
+
+    if can_vectorize(table, column_types, tree):
+        # Условие проверяется сразу для всего столбца, декодируются
+        # только подходящие записи
+        return iter_vectorized_records(table, column_types, tree, columns)
+    if can_scan_parallel(table):
+        return parallel_select(table_name, table, column_types, tree,
+                               compile_where, columns)
+
+    if tree is not None and table.get("segments") is not None:
+        # Сегменты, зоны min/max которых исключают условие, пропускаются
+        records = iter_zone_records(table, tree)
+    else:
+        records = iter_records(table, columns)
+    if predicate is not None:
+        records = filter(predicate, records)
+    return records
+
+def matching_records(
+    metadata: Dict[str, Any],
+    table_name: str,
+    where_clause: Dict[str, Any],
+    predicate: Callable[[Dict[str, Any]], bool],
+    candidate_ids: Optional[Set[Any]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Get records matching a planned condition.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        where_clause: Filter conditions
+        predicate: Compiled condition from plan_where
+        candidate_ids: Candidate IDs from plan_where, None for full scan
+
+    Returns:
+        Iterator over all columns of matching records
+    """
+    if candidate_ids is None:
+        column_types = get_column_types(metadata, table_name)
+        return scan_records(table_name, column_types, where_clause, predicate)
+    return filter(predicate, fetch_records(table_name, candidate_ids))
+
+def scan_aggregate(
+    metadata: Dict[str, Any],
+    table_name: str,
+    items: List[Any],
+    where_clause: Optional[Dict[str, Any]],
+    group_by: Optional[List[str]],
+    columns: List[str]
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Compute aggregates on NumPy column arrays or in worker processes.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        items: Validated select list with grouped columns and aggregates
+        where_clause: Optional filter conditions
+        group_by: Grouping columns or None
+        columns: Columns aggregation and condition need
+
+    Returns:
+        Result rows or None if the query must use the streaming path
+    """
+    column_types = get_column_types(metadata, table_name)
+    tree = None
+    if where_clause is not None:
+        tree = coerce_where(column_types, normalize_where(where_clause))
+    table = read_table(table_name)
+
+    if ((not group_by or len(group_by) == 1)
+            and can_vectorize(table, column_types, tree, columns)):
+        rows = vectorized_aggregate(table, column_types, tree, items, group_by)
+        if rows is not None:
+            return rows
+
+    if can_scan_parallel(table) and (
+            where_clause is None
+            or plan_where(metadata, table_name, where_clause)[1] is None):
+        # Декодируем также столбцы, которые проверяет условие
+        needed = where_columns(tree) if tree is not None else set()
+        read_columns = list(columns) + [column for column in column_types
+                                        if column in needed
+                                        and column not in columns]
+        return parallel_aggregate(table_name, table, column_types, tree,
+                                  compile_where, items, group_by,
+                                  read_columns or ["ID"])
+    return None
+
+def allocate_ids(
+    metadata: Dict[str, Any],
+    table_name: str,
+    count: int = 1
+) -> int:
+    """
+    Allocate consecutive record IDs from the table sequence counter.
+
+    The counter is kept in table metadata as "next_id"; tables created
+    before it existed are seeded once from the ID index. The counter is
+    advanced in the metadata file under the exclusive metadata lock, so
+    concurrent processes never get the same IDs.
+
+    Args:
+        metadata: Database metadata, its counter is updated too
+        table_name: Table name
+        count: Number of IDs to allocate
+
+    Returns:
+        First allocated ID
+
+    Raises:
+        ValueError: If the table was dropped or metadata cannot be saved
+    """
+    seed = None
+    if "next_id" not in metadata[table_name]:
+        # Индекс читается до блокировки метаданных, чтобы не держать
+        # блокировки таблицы и метаданных одновременно
+        known_ids = load_index(table_name, "ID")["sorted"]
+        seed = known_ids[-1] + 1 if known_ids else 1
+
+    with metadata_lock(exclusive=True):
+        # Счетчик берется из файла: его могли продвинуть другие процессы
+        current = load_metadata()
+        table_meta = current.get(table_name) if current else None
+        if table_meta is None:
+            raise ValueError(ERROR_TABLE_NOT_FOUND.format(table_name))
+        if "next_id" not in table_meta:
+            table_meta["next_id"] = seed
+
+        first_id = table_meta["next_id"]
+        table_meta["next_id"] = first_id + count
+        if not save_metadata(current):
+            raise ValueError(ERROR_CONCURRENT_WRITE.format("Метаданные"))
+
+    metadata[table_name]["next_id"] = first_id + count
+    return first_id
+
+def prepare_record(
+    column_types: Dict[str, str],
+    values: List[Any]
+) -> Dict[str, Any]:
+    """
+    Validate row values against column types.
+
+    Args:
+        column_types: Mapping of column names to types (including ID)
+        values: List of values for columns (excluding ID)
+
+    Returns:
+        Record without ID
+
+    Raises:
+        ValueError: If number of values does not match columns
+    """
+    user_columns = [col for col in column_types.keys() if col != "ID"]
+
+    if len(values) != len(user_columns):
+        expected = len(user_columns)
+        raise ValueError(f"Expected {expected} values, got {len(values)}")
+
+    record = {}
+    for i, column in enumerate(user_columns):
+        expected_type = column_types[column]
+        try:
+            record[column] = convert_value(values[i], expected_type)
+        except ValueError as e:
+            raise ValueError(f"Column '{column}': {e}")
+    return record
+
+def table_version(table_name: str) -> Tuple[Any, ...]:
+    """
+    Get table stamp once no write of the table is in progress.
+
+    The stamp serves as table version: changes computed from records
+    read after it are written with it as expected_stamp.
+
+    Args:
+        table_name: Table name
+
+    Returns:
+        Combined stamp of table files
+    """
+    with table_lock(table_name):
+        return get_table_stamp(table_name)
+
+def check_changes(
+    column_types: Dict[str, str],
+    changes: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+    columnar: bool = False
+) -> None:
+    """
+    Check that new records only have table columns of their declared types.
+
+    Args:
+        column_types: Mapping of column names to types (including ID)
+        changes: Pairs of (old_record, new_record)
+        columnar: Also check that values fit a columnar snapshot
+
+    Raises:
+        ValueError: If a record has an unknown column or a value of
+            another type
+    """
+    for _, new_record in changes:
+        if new_record is None:
+            continue
+        for column, value in new_record.items():
+            if column not in column_types:
+                raise ValueError(f'Column "{column}" does not exist.')
+            # bool - подкласс int, поэтому тип сравнивается точно.
+            # Значение, не влезающее в колоночный снимок, сорвало бы компакцию
+            if (type(value).__name__ != column_types[column]
+                    or columnar and not fits_columnar(value)):
+                raise ValueError(f'Invalid value {value!r} for column '
+                                 f'"{column}" of type {column_types[column]}')
+
+def write_changes(
+    metadata: Dict[str, Any],
+    table_name: str,
+    log_entries: List[Dict[str, Any]],
+    changes: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+    expected_stamp: Optional[Tuple[Any, ...]] = None
+) -> Optional[bool]:
+    """
+    Append entries to the table log and keep indexes and statistics in step.
+
+    The table is locked for writing for the whole update of its log,
+    indexes and statistics. When expected_stamp is given and table files
+    no longer match it, another process changed the table after the
+    changes were computed, and nothing is written. Inside a transaction
+    the changes are only buffered until commit_transaction.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        log_entries: Table log entries to append
+        changes: Pairs of (old_record, new_record) for indexes and statistics
+        expected_stamp: Table version the changes were computed from
+
+    Returns:
+        True if successful, None on a concurrent change, False otherwise
+    """
+    check_changes(get_column_types(metadata, table_name), changes,
+                  metadata[table_name].get("storage") == "columnar")
+    if _transaction is not None:
+        buffer_changes(table_name, log_entries, changes, expected_stamp)
+        return True
+
+    with table_lock(table_name, exclusive=True):
+        if (expected_stamp is not None
+                and get_table_stamp(table_name) != expected_stamp):
+            return None
+
+        # Статистика берется до записи, пока она соответствует файлам таблицы.
+        # Изменения индексов и статистики вычисляются до добавления в журнал:
+        # ошибка в них не должна оставлять журнал впереди индексов
+        stats = apply_stats_changes(
+            get_table_stats(table_name, bounds=False), changes)
+        index_entries = compute_index_entries(metadata, table_name, changes)
+
+        if not append_table_log(table_name, log_entries):
+            return False
+        if not update_table_indexes(metadata, table_name, changes,
+                                    index_entries):
+            return False
+        save_table_stats(table_name, stats)
+    return True
+
+def change_matching_records(
+    metadata: Dict[str, Any],
+    table_name: str,
+    where_clause: Dict[str, Any],
+    change: Callable[[Dict[str, Any]], Tuple[Dict[str, Any],
+                                             Optional[Dict[str, Any]]]]
+) -> bool:
+    """
+    Read matching records, compute their changes and write them.
+
+    Records are read without blocking writers; if the table changes
+    before the write, the changes are recomputed from fresh records
+    instead of overwriting the concurrent update.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        where_clause: Filter conditions
+        change: Function record -> (log entry, new record or None)
+
+    Returns:
+        True if successful, False otherwise
+
+    Raises:
+        ValueError: If no records match or the table keeps changing
+    """
+    for _ in range(WRITE_CONFLICT_RETRIES):
+        version = table_version(table_name)
+        predicate, candidate_ids = plan_where(metadata, table_name, where_clause)
+        if candidate_ids is not None and not candidate_ids:
+            raise ValueError("No records match the WHERE condition")
+
+        log_entries = []
+        changes = []
+        for record in matching_records(metadata, table_name, where_clause,
+                                       predicate, candidate_ids):
+            entry, new_record = change(record)
+            log_entries.append(entry)
+            changes.append((record, new_record))
+
+        if not log_entries:
+            raise ValueError("No records match the WHERE condition")
+
+        result = write_changes(metadata, table_name, log_entries, changes,
+                               expected_stamp=version)
+        if result is not None:
+            return result
+
+    raise ValueError(ERROR_CONCURRENT_WRITE.format(f'Данные таблицы "{table_name}"'))
+
+def get_transaction() -> Optional[Dict[str, Any]]:
+    """
+    Get state of the open transaction.
+
+    Returns:
+        Transaction state or None outside a transaction
+    """
+    return _transaction
+
+def set_transaction(transaction: Optional[Dict[str, Any]]) -> None:
+    """
+    Make given transaction state current (None closes it without writing).
+
+    Lets a server keep a separate transaction per client connection.
+
+    Args:
+        transaction: State from get_transaction or None
+    """
+    global _transaction
+    _transaction = transaction
+    set_table_views(transaction["views"] if transaction is not None else {})
+
+def begin_transaction() -> None:
+    """
+    Start buffering table changes until commit or rollback.
+
+    Raises:
+        ValueError: If a transaction is already open
+    """
+    if _transaction is not None:
+        raise ValueError("Транзакция уже начата")
+    set_transaction({"tables": {}, "views": {}})
+
+def buffer_changes(
+    table_name: str,
+    log_entries: List[Dict[str, Any]],
+    changes: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+    expected_stamp: Optional[Tuple[Any, ...]] = None
+) -> None:
+    """
+    Add changes to the open transaction.
+
+    The first change of a table records the table version and copies the
+    table; the copy gets every change, so later statements of the
+    transaction read their own writes.
+
+    Args:
+        table_name: Table name
+        log_entries: Table log entries
+        changes: Pairs of (old_record, new_record) for indexes and statistics
+        expected_stamp: Table version the changes were computed from
+    """
+    pending = _transaction["tables"].get(table_name)
+    if pending is None:
+        version = expected_stamp
+        if version is None:
+            version = table_version(table_name)
+        pending = {"version": version, "entries": [], "changes": []}
+        _transaction["tables"][table_name] = pending
+        _transaction["views"][table_name] = copy_table(read_table(table_name))
+
+    apply_table_entries(_transaction["views"][table_name], log_entries)
+    pending["entries"].extend(log_entries)
+    pending["changes"].extend(changes)
+
+def commit_transaction() -> int:
+    """
+    Write changes of the open transaction and close it.
+
+    All changed tables are locked for writing (in name order, so
+    concurrent commits cannot deadlock) and checked against the versions
+    the transaction read. All changes are first saved in one commit
+    record; each table then gets one batch log entry, and the record is
+    removed once the logs are on disk. A crash in between leaves the
+    record, and recover_commits applies the whole transaction again.
+
+    Returns:
+        Number of written log entries
+
+    Raises:
+        ValueError: If there is no transaction or another process
+            changed its tables; the transaction is rolled back then
+    """
+    transaction = _transaction
+    if transaction is None:
+        raise ValueError("Нет открытой транзакции")
+    # Копии таблиц больше не нужны: дальше читаются и пишутся файлы
+    set_transaction(None)
+
+    tables = transaction["tables"]
+    names = sorted(tables)
+    if not names:
+        return 0
+
+    metadata = load_metadata()
+    with ExitStack() as locks:
+        for table_name in names:
+            locks.enter_context(table_lock(table_name, exclusive=True))
+
+        for table_name in names:
+            if get_table_stamp(table_name) != tables[table_name]["version"]:
+                raise ValueError(f'Данные таблицы "{table_name}" изменены '
+                                 "другим процессом. Транзакция отменена.")
+
+        # Пока запись фиксации существует, транзакция считается незавершенной
+        ensure_data_dir()
+        redo_path = new_redo_path()
+        write_data_file(redo_path, {"tables": {
+            table_name: tables[table_name]["entries"] for table_name in names}})
+
+        for table_name in names:
+            pending = tables[table_name]
+            batch = {"op": "batch", "entries": pending["entries"]}
+            if not write_changes(metadata, table_name, [batch],
+                                 pending["changes"]):
+                raise ValueError(
+                    f'Не удалось записать изменения таблицы "{table_name}"; '
+                    "они будут применены при следующем запуске")
+        sync_wal()
+        os.remove(redo_path)
+
+    return sum(len(pending["entries"]) for pending in tables.values())
+
+def redo_table_entries(
+    metadata: Dict[str, Any],
+    table_name: str,
+    entries: List[Dict[str, Any]]
+) -> int:
+    """
+    Apply committed log entries again, skipping what the table already has.
+
+    Changes are computed against the current records, so entries that
+    reached the table before a crash do not change its indexes and
+    statistics twice.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        entries: Log entries of the commit record for the table
+
+    Returns:
+        Number of records changed by the replay
+
+    Raises:
+        ValueError: If the entries cannot be written
+    """
+    before: Dict[Any, Optional[Dict[str, Any]]] = {}
+    after: Dict[Any, Optional[Dict[str, Any]]] = {}
+    for entry in expand_log_entries(entries):
+        if entry["op"] == "delete":
+            record_id, new_record = entry["id"], None
+        else:
+            record_id, new_record = entry["row"]["ID"], entry["row"]
+        if record_id not in after:
+            before[record_id] = get_table_record(table_name, record_id)
+            after[record_id] = before[record_id]
+        if entry["op"] == "update" and after[record_id] is None:
+            # Обновление удаленной записи журнал тоже пропускает
+            continue
+        after[record_id] = new_record
+
+    # Таблица, до которой записи дошли до сбоя, не меняется
+    changes = [(before[record_id], new_record)
+               for record_id, new_record in after.items()
+               if before[record_id] != new_record]
+    if changes and not write_changes(metadata, table_name,
+                                     [{"op": "batch", "entries": entries}],
+                                     changes):
+        raise ValueError(f'Не удалось записать изменения таблицы "{table_name}"')
+    return len(changes)
+
+def recover_commits() -> int:
+    """
+    Finish transaction commits interrupted by a crash.
+
+    Each commit record left in the data directory is applied to all of
+    its tables again under their write locks and then removed, so a
+    transaction ends up either fully written or, without a record, not
+    written at all. Must be called outside of a transaction.
+
+    Returns:
+        Number of recovered commits
+    """
+    recovered = 0
+    for redo_path in get_redo_paths():
+        try:
+            record, _ = read_data_file(redo_path)
+        except FileNotFoundError:
+            continue
+
+        names = sorted(record["tables"])
+        with ExitStack() as locks:
+            for table_name in names:
+                locks.enter_context(table_lock(table_name, exclusive=True))
+            if not os.path.exists(redo_path):
+                # Фиксацию завершил процесс, который ее начал
+                continue
+
+            metadata = load_metadata()
+            for table_name in names:
+                if table_name in metadata:
+                    redo_table_entries(metadata, table_name,
+                                       record["tables"][table_name])
+            sync_wal()
+            os.remove(redo_path)
+        recovered += 1
+    return recovered
+
+def recover_indexes(metadata: Dict[str, Any]) -> List[str]:
+    """
+    Rebuild indexes that may lag behind their table log after a crash.
+
+    A write appends to the table log first, then to the indexes, and
+    saves statistics last. Statistics stamped with other table files
+    mean the write may have stopped before the indexes were updated,
+    so such tables get their indexes and statistics rebuilt.
+
+    Args:
+        metadata: Database metadata
+
+    Returns:
+        Names of tables whose indexes were rebuilt
+    """
+    rebuilt = []
+    for table_name in metadata:
+        with table_lock(table_name, exclusive=True):
+            if is_table_stats_current(table_name):
+                continue
+            table_data = load_table_data(table_name)
+            for column in get_table_indexes(metadata, table_name):
+                build_index(table_name, column, table_data)
+            save_table_stats(table_name, compute_table_stats(table_name))
+        rebuilt.append(table_name)
+    return rebuilt
+
+def rollback_transaction() -> int:
+    """
+    Discard changes of the open transaction and close it.
+
+    Returns:
+        Number of discarded log entries
+
+    Raises:
+        ValueError: If there is no open transaction
+    """
+    transaction = _transaction
+    if transaction is None:
+        raise ValueError("Нет открытой транзакции")
+    set_transaction(None)
+    return sum(len(pending["entries"])
+               for pending in transaction["tables"].values())
+
+def store_records(
+    metadata: Dict[str, Any],
+    table_name: str,
+    records: List[Dict[str, Any]]
+) -> Union[List[int], bool]:
+    """
+    Assign IDs to validated records and persist them in one write.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        records: Records without ID
+
+    Returns:
+        List of allocated IDs if successful, False otherwise
+    """
+    # Выделяем ID из счетчика таблицы; счетчик сохраняется до записи,
+    # чтобы после сбоя ID не выдавался повторно
+    first_id = allocate_ids(metadata, table_name, len(records))
+
+    new_records = [
+        {"ID": first_id + i, **record} for i, record in enumerate(records)
+    ]
+
+    # Дописываем записи в журнал таблицы и обновляем индексы
+    entries = [{"op": "insert", "row": record} for record in new_records]
+    changes = [(None, record) for record in new_records]
+    if not write_changes(metadata, table_name, entries, changes):
+        return False
+    return [record["ID"] for record in new_records]
+
 @handle_db_errors
 @log_time
 def insert(
     metadata: Dict[str, Any],
     table_name: str,
     values: List[Any]
-) -> bool:
+) -> Union[int, bool]:
     """
     Insert new record into table.
 
@@ -215,48 +1223,160 @@ def insert(
         values: List of values for columns (excluding ID)
 
     Returns:
-        True if successful, False otherwise
+        ID of the inserted record if successful, False otherwise
     """
     if table_name not in metadata:
         raise ValueError(ERROR_TABLE_NOT_FOUND.format(table_name))
 
     column_types = get_column_types(metadata, table_name)
-    user_columns = [col for col in column_types.keys() if col != "ID"]
+    record = prepare_record(column_types, values)
 
-    if len(values) != len(user_columns):
-        expected = len(user_columns)
-        raise ValueError(f"Expected {expected} values, got {len(values)}")
+    new_ids = store_records(metadata, table_name, [record])
+    return new_ids[0] if new_ids else False
 
-    # Загружаем данные
-    table_data = load_table_data(table_name)
+@handle_db_errors
+@log_time
+def insert_many(
+    metadata: Dict[str, Any],
+    table_name: str,
+    rows: List[List[Any]]
+) -> Union[List[int], bool]:
+    """
+    Insert batch of records with a single write per batch.
 
-    # Генерируем новый ID
-    new_id = 1
-    if table_data:
-        new_id = max(record.get("ID", 0) for record in table_data) + 1
+    Every row is validated before anything is written, so an invalid
+    row rejects the whole batch.
 
-    # Создаем новую запись
-    new_record = {"ID": new_id}
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        rows: Lists of values for columns (excluding ID)
 
-    # Проверяем и добавляем значения для user
-    for i, column in enumerate(user_columns):
-        expected_type = column_types[column]
+    Returns:
+        List of inserted IDs if successful, False otherwise
+    """
+    if table_name not in metadata:
+        raise ValueError(ERROR_TABLE_NOT_FOUND.format(table_name))
+
+    if not rows:
+        return []
+
+    column_types = get_column_types(metadata, table_name)
+    records = []
+    for row_number, values in enumerate(rows, start=1):
         try:
-            validated_value = validate_value_type(values[i], expected_type)
-            new_record[column] = validated_value
+            records.append(prepare_record(column_types, values))
         except ValueError as e:
-            raise ValueError(f"Column '{column}': {e}")
+            raise ValueError(f"Row {row_number}: {e}")
+
+    return store_records(metadata, table_name, records)
+
+def iter_select(
+    metadata: Dict[str, Any],
+    table_name: str,
+    where_clause: Optional[Dict[str, Any]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columns: Optional[List[str]] = None,
+    order_by: Optional[Tuple[str, bool]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Get lazy iterator over selected records.
+
+    Planning happens immediately, records are read while iterating,
+    so reading stops as soon as the limit is satisfied. With a column
+    list only those columns (and the ones WHERE and ORDER BY need) are
+    decoded. With a small LIMIT, ordering follows the column index when
+    there is one, otherwise records are sorted (see sort.sort_records).
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        where_clause: Optional filter conditions
+        limit: Maximum number of records, None for all
+        offset: Number of matching records to skip
+        columns: Columns to return, None for all
+        order_by: Optional (column, descending) pair
+
+    Returns:
+        Iterator over matching records
+
+    Raises:
+        ValueError: If table or column does not exist or limit/offset
+            is negative
+    """
+    if table_name not in metadata:
+        raise ValueError(ERROR_TABLE_NOT_FOUND.format(table_name))
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("LIMIT and OFFSET must be non-negative")
 
-    # Добавляем запись и сохраняем
-    table_data.append(new_record)
-    return save_table_data(table_name, table_data)
+    column_types = get_column_types(metadata, table_name)
+    read_columns = None
+    if columns is not None:
+        for column in columns:
+            if column not in column_types:
+                raise ValueError(f'Column "{column}" does not exist.')
+        read_columns = list(columns)
+
+    if order_by is not None:
+        order_column, descending = order_by
+        if order_column not in column_types:
+            raise ValueError(f'Column "{order_column}" does not exist.')
+        if read_columns is not None and order_column not in read_columns:
+            read_columns.append(order_column)
+
+    predicate = None
+    candidate_ids = None
+    if where_clause is not None:
+        # Планировщик выбирает между полным перебором и индексами
+        predicate, candidate_ids = plan_where(metadata, table_name, where_clause)
+        if candidate_ids is not None and not candidate_ids:
+            return iter(())
+        if read_columns is not None:
+            # Декодируем также столбцы, которые проверяет условие
+            needed = where_columns(normalize_where(where_clause))
+            read_columns += [column for column in column_types
+                             if column in needed and column not in read_columns]
+
+    if (order_by is not None and candidate_ids is None and limit is not None
+            and order_column in get_query_indexes(metadata, table_name)
+            and ((offset + limit) * PLANNER_INDEX_FETCH_COST
+                 < count_table_records(table_name))):
+        # Индекс хранит значения упорядоченно - при небольшом LIMIT читаем
+        # первые записи в его порядке вместо сортировки всей таблицы
+        ordered_ids = iter_index_ids(table_name, order_column, descending)
+        records = fetch_records_by_ids(table_name, ordered_ids, read_columns)
+        if predicate is not None:
+            records = filter(predicate, records)
+    else:
+        if candidate_ids is None:
+            records = scan_records(table_name, column_types, where_clause,
+                                   predicate, read_columns)
+        else:
+            records = fetch_records(table_name, candidate_ids, read_columns)
+            if predicate is not None:
+                records = filter(predicate, records)
+        if order_by is not None:
+            keep = None if limit is None else offset + limit
+            records = sort_records(records, order_column, descending, keep)
+
+    if offset or limit is not None:
+        stop = None if limit is None else offset + limit
+        records = islice(records, offset, stop)
+    if columns is not None:
+        records = project_records(records, columns)
+    return records
 
 @handle_db_errors
 @log_time
 def select(
     metadata: Dict[str, Any],
     table_name: str,
-    where_clause: Optional[Dict[str, Any]] = None
+    where_clause: Optional[Dict[str, Any]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columns: Optional[List[str]] = None,
+    order_by: Optional[Tuple[str, bool]] = None
 ) -> List[Dict[str, Any]]:
     """
     Select records from table.
@@ -265,63 +1385,281 @@ def select(
         metadata: Database metadata
         table_name: Table name
         where_clause: Optional filter conditions
+        limit: Maximum number of records, None for all
+        offset: Number of matching records to skip
+        columns: Columns to return, None for all
+        order_by: Optional (column, descending) pair
 
     Returns:
         Filtered records
     """
+    return list(iter_select(metadata, table_name, where_clause, limit, offset,
+                            columns, order_by))
+
+def iter_join(
+    metadata: Dict[str, Any],
+    left_table: str,
+    right_table: str,
+    left_column: str,
+    right_column: str,
+    where_clause: Optional[Dict[str, Any]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columns: Optional[List[str]] = None,
+    order_by: Optional[Tuple[str, bool]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Get lazy iterator over equi-joined records of two tables.
+
+    Joined records have qualified column names ("orders.ID"). WHERE
+    conditions on one table are pushed down to its scan. The smaller
+    table (by record count) is read into memory; when the larger one has
+    an index on its join column and few lookups are needed, matches are
+    fetched through the index, otherwise the larger table is streamed
+    against a hash table.
+
+    Args:
+        metadata: Database metadata
+        left_table: Left table name
+        right_table: Right table name
+        left_column: Join column of the left table
+        right_column: Join column of the right table
+        where_clause: Optional filter on qualified column names
+        limit: Maximum number of records, None for all
+        offset: Number of matching records to skip
+        columns: Qualified columns to return, None for all
+        order_by: Optional (qualified column, descending) pair
+
+    Returns:
+        Iterator over joined records
+
+    Raises:
+        ValueError: If a table or column does not exist or join columns
+            have different types
+    """
+    for table_name in (left_table, right_table):
+        if table_name not in metadata:
+            raise ValueError(ERROR_TABLE_NOT_FOUND.format(table_name))
+    if left_table == right_table:
+        raise ValueError("Joining a table with itself is not supported.")
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("LIMIT and OFFSET must be non-negative")
+
+    left_types = get_column_types(metadata, left_table)
+    right_types = get_column_types(metadata, right_table)
+    for table_name, column, types in ((left_table, left_column, left_types),
+                                      (right_table, right_column, right_types)):
+        if column not in types:
+            raise ValueError(f'Column "{table_name}.{column}" does not exist.')
+    if left_types[left_column] != right_types[right_column]:
+        raise ValueError(
+            f"Cannot join {left_table}.{left_column} ({left_types[left_column]}) "
+            f"with {right_table}.{right_column} ({right_types[right_column]})."
+        )
+
+    joined_types = {f"{left_table}.{name}": col_type
+                    for name, col_type in left_types.items()}
+    joined_types.update({f"{right_table}.{name}": col_type
+                         for name, col_type in right_types.items()})
+    for column in (columns or []) + ([order_by[0]] if order_by else []):
+        if column not in joined_types:
+            raise ValueError(f'Column "{column}" does not exist.')
+
+    left_where = right_where = rest = None
+    if where_clause is not None:
+        # Неуточненные имена столбцов относятся к таблице, где они есть
+        tree = qualify_where(normalize_where(where_clause),
+                             {left_table: left_types, right_table: right_types})
+        left_where, right_where, rest = split_join_where(
+            tree, left_table, right_table)
+
+    # Столбцы, которые нужно прочитать из каждой таблицы
+    read_columns: Dict[str, Optional[List[str]]] = {left_table: None,
+                                                    right_table: None}
+    if columns is not None:
+        needed = set(columns) | {f"{left_table}.{left_column}",
+                                 f"{right_table}.{right_column}"}
+        if order_by is not None:
+            needed.add(order_by[0])
+        if rest is not None:
+            needed |= where_columns(rest)
+        for table_name in read_columns:
+            prefix = f"{table_name}."
+            read_columns[table_name] = [
+                column[len(prefix):] for column in joined_types
+                if column in needed and column.startswith(prefix)
+            ]
+
+    # Строящая сторона - таблица с меньшим числом записей
+    sides = [(left_table, left_column, left_where, left_types),
+             (right_table, right_column, right_where, right_types)]
+    counts = [get_table_stats(side[0], bounds=False)["count"] for side in sides]
+    build_first = counts[0] <= counts[1]
+    build, probe = sides if build_first else sides[::-1]
+
+    build_records = list(qualify_records(build[0], iter_select(
+        metadata, build[0], build[2], columns=read_columns[build[0]])))
+    build_key = f"{build[0]}.{build[1]}"
+    probe_key = f"{probe[0]}.{probe[1]}"
+    probe_count = counts[1] if build_first else counts[0]
+
+    if (probe[1] in get_query_indexes(metadata, probe[0])
+            and len(build_records) * PLANNER_INDEX_FETCH_COST < probe_count):
+        # Мало ключей и есть индекс - ищем пары через индекс большей таблицы
+        probe_table, probe_column, probe_where, probe_types = probe
+        probe_predicate = None
+        if probe_where is not None:
+            probe_predicate = compile_where(
+                probe_types, coerce_where(probe_types, probe_where))
+        prefix = f"{probe_table}."
+
+        def fetch_matches(value: Any) -> Iterator[Dict[str, Any]]:
+            if probe_column == "ID":
+                ids = [value]
+            else:
+                ids = sorted(lookup_index(probe_table, probe_column, value))
+            for record in fetch_records_by_ids(probe_table, ids):
+                if probe_predicate is None or probe_predicate(record):
+                    yield {prefix + column: record[column]
+                           for column in read_columns[probe_table] or record}
+
+        records = index_join(build_records, build_key, fetch_matches, build_first)
+    else:
+        probe_records = qualify_records(probe[0], iter_select(
+            metadata, probe[0], probe[2], columns=read_columns[probe[0]]))
+        records = hash_join(build_records, probe_records, build_key, probe_key,
+                            build_first)
+
+    if rest is not None:
+        predicate = compile_where(joined_types, coerce_where(joined_types, rest))
+        records = filter(predicate, records)
+
+    if order_by is not None:
+        keep = None if limit is None else offset + limit
+        records = sort_records(records, order_by[0], order_by[1], keep)
+
+    if offset or limit is not None:
+        stop = None if limit is None else offset + limit
+        records = islice(records, offset, stop)
+    if columns is not None:
+        records = project_records(records, columns)
+    return records
+
+@handle_db_errors
+@log_time
+def join(
+    metadata: Dict[str, Any],
+    left_table: str,
+    right_table: str,
+    left_column: str,
+    right_column: str,
+    where_clause: Optional[Dict[str, Any]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columns: Optional[List[str]] = None,
+    order_by: Optional[Tuple[str, bool]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Select equi-joined records of two tables.
+
+    Args:
+        metadata: Database metadata
+        left_table: Left table name
+        right_table: Right table name
+        left_column: Join column of the left table
+        right_column: Join column of the right table
+        where_clause: Optional filter on qualified column names
+        limit: Maximum number of records, None for all
+        offset: Number of matching records to skip
+        columns: Qualified columns to return, None for all
+        order_by: Optional (qualified column, descending) pair
+
+    Returns:
+        Joined records
+    """
+    return list(iter_join(metadata, left_table, right_table, left_column,
+                          right_column, where_clause, limit, offset, columns,
+                          order_by))
+
+@handle_db_errors
+@log_time
+def aggregate(
+    metadata: Dict[str, Any],
+    table_name: str,
+    items: List[Any],
+    where_clause: Optional[Dict[str, Any]] = None,
+    group_by: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    order_by: Optional[Tuple[str, bool]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run aggregate query over table records.
+
+    count(*)/count(col), min and max over the whole table are answered
+    from table statistics; full scans of columnar tables go through
+    scan_aggregate; everything else is one streaming pass that decodes
+    only the aggregated and grouped columns.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        items: Select list with grouped columns and aggregates
+        where_clause: Optional filter conditions
+        group_by: Grouping columns or None
+        limit: Maximum number of result rows, None for all
+        offset: Number of result rows to skip
+        order_by: Optional (result column or label, descending) pair
+
+    Returns:
+        Result rows keyed by column names and aggregate labels
+    """
     if table_name not in metadata:
         raise ValueError(ERROR_TABLE_NOT_FOUND.format(table_name))
 
-    table_data = load_table_data(table_name)
-
-    if where_clause is None:
-        return table_data
-
-    filtered_data = []
-    for record in table_data:
-        match = True
-        for column, condition in where_clause.items():
-            if column not in record:
-                match = False
-                break
-                
-            # Проверяем, является ли условие простым сравнением или сложным с оператором
-            if isinstance(condition, dict) and "operator" in condition:
-                # Обрабатываем операторы сравнения
-                operator = condition["operator"]
-                expected_value = condition["value"]
-                actual_value = record[column]
-                
-                if operator == ">":
-                    if not (actual_value > expected_value):
-                        match = False
-                        break
-                elif operator == "<":
-                    if not (actual_value < expected_value):
-                        match = False
-                        break
-                elif operator == ">=":
-                    if not (actual_value >= expected_value):
-                        match = False
-                        break
-                elif operator == "<=":
-                    if not (actual_value <= expected_value):
-                        match = False
-                        break
-                elif operator == "!=":
-                    if not (actual_value != expected_value):
-                        match = False
-                        break
+    column_types = get_column_types(metadata, table_name)
+    validate_aggregates(column_types, items, group_by)
+
+    if where_clause is None and not group_by and all(
+            isinstance(item, dict) and item["func"] in ("count", "min", "max")
+            for item in items):
+        # Ответ по статистике таблицы без чтения записей
+        needs_bounds = any(item["func"] != "count" for item in items)
+        stats = get_table_stats(table_name, bounds=needs_bounds)
+        row = {}
+        for item in items:
+            if item["func"] == "count":
+                value = stats["count"]
             else:
-                # Простое сравнение на равенство
-                if record[column] != condition:
-                    match = False
-                    break
-                    
-        if match:
-            filtered_data.append(record)
-
-    return filtered_data
+                value = stats[item["func"]].get(item["column"])
+            row[aggregate_label(item)] = value
+        rows = [row]
+    else:
+        read_columns = list(group_by or [])
+        for item in items:
+            if isinstance(item, dict) and item["column"] != "*":
+                if item["column"] not in read_columns:
+                    read_columns.append(item["column"])
+        rows = scan_aggregate(metadata, table_name, items, where_clause, group_by,
+                              read_columns)
+        if rows is None:
+            records = iter_select(metadata, table_name, where_clause,
+                                  columns=read_columns or ["ID"])
+            rows = aggregate_records(records, items, group_by)
+
+    if order_by is not None:
+        order_column, descending = order_by
+        if order_column not in map(aggregate_label, items):
+            raise ValueError(f'Column "{order_column}" is not in the result.')
+        # Пустые агрегаты (None) идут первыми при сортировке по возрастанию
+        rows.sort(key=lambda row: (row[order_column] is not None,
+                                   row[order_column]),
+                  reverse=descending)
+
+    if offset or limit is not None:
+        stop = None if limit is None else offset + limit
+        rows = rows[offset:stop]
+    return rows
 
 @handle_db_errors
 def update(
@@ -345,25 +1683,23 @@ def update(
     if table_name not in metadata:
         raise ValueError(ERROR_TABLE_NOT_FOUND.format(table_name))
 
-    table_data = load_table_data(table_name)
-    updated = False
-
-    for record in table_data:
-        match = True
-        for column, expected_value in where_clause.items():
-            if column not in record or record[column] != expected_value:
-                match = False
-                break
-        if match:
-            for column, new_value in set_clause.items():
-                if column in record and column != "ID":  # Don't allow updating ID
-                    record[column] = new_value
-            updated = True
+    # Проверяем и приводим значения до записи: иначе в журнал попадут
+    # строки вместо чисел, а опечатка в столбце молча проигнорируется
+    column_types = get_column_types(metadata, table_name)
+    new_values = {}
+    for column, new_value in set_clause.items():
+        if column not in column_types:
+            raise ValueError(f'Column "{column}" does not exist.')
+        if column != "ID":  # Don't allow updating ID
+            new_values[column] = convert_value(new_value, column_types[column])
 
-    if not updated:
-        raise ValueError("No records match the WHERE condition")
+    def change(record: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        # Записи разделяются с буферным пулом - изменяем копию
+        new_record = dict(record)
+        new_record.update(new_values)
+        return {"op": "update", "row": new_record}, new_record
 
-    return save_table_data(table_name, table_data)
+    return change_matching_records(metadata, table_name, where_clause, change)
 
 @handle_db_errors
 @confirm_action("удаление записей")
@@ -386,25 +1722,10 @@ def delete(
     if table_name not in metadata:
         raise ValueError(ERROR_TABLE_NOT_FOUND.format(table_name))
 
-    table_data = load_table_data(table_name)
-    new_data = []
-    deleted_count = 0
-
-    for record in table_data:
-        match = True
-        for column, expected_value in where_clause.items():
-            if column not in record or record[column] != expected_value:
-                match = False
-                break
-        if not match:
-            new_data.append(record)
-        else:
-            deleted_count += 1
-
-    if deleted_count == 0:
-        raise ValueError("No records match the WHERE condition")
-
-    return save_table_data(table_name, new_data)
+    return change_matching_records(
+        metadata, table_name, where_clause,
+        lambda record: ({"op": "delete", "id": record["ID"]}, None),
+    )
 
 @handle_db_errors
 def format_table_output(columns: List[str], data: List[Dict[str, Any]]) -> str:
@@ -432,6 +1753,31 @@ def format_table_output(columns: List[str], data: List[Dict[str, Any]]) -> str:
 
     return str(table)
 
+def iter_table_pages(
+    columns: List[str],
+    records: Iterable[Dict[str, Any]],
+    page_size: int = SELECT_PAGE_SIZE
+) -> Iterator[str]:
+    """
+    Lazily format records as pretty tables of at most page_size rows.
+
+    Only one page of records is held in memory at a time.
+
+    Args:
+        columns: List of column names
+        records: Records to format (may be a lazy iterator)
+        page_size: Rows per page
+
+    Yields:
+        Formatted table strings
+    """
+    records = iter(records)
+    while True:
+        page = list(islice(records, page_size))
+        if not page:
+            return
+        yield format_table_output(columns, page)
+
 @handle_db_errors
 def get_table_info(
     metadata: Dict[str, Any],
@@ -450,13 +1796,18 @@ def get_table_info(
     if table_name not in metadata:
         raise ValueError(ERROR_TABLE_NOT_FOUND.format(table_name))
 
-    table_data = load_table_data(table_name)
     columns = get_table_columns(metadata, table_name)
     columns_str = ", ".join(columns)
-    record_count = len(table_data)
+    indexes_str = ", ".join(get_table_indexes(metadata, table_name))
+    storage = metadata[table_name].get("storage", "row")
+    record_count = get_table_stats(table_name, bounds=False)["count"]
 
     info = f"Таблица: {table_name}\n"
     info += f"Столбцы: {columns_str}\n"
+    info += f"Индексы: {indexes_str}\n"
+    info += f"Формат хранения: {storage}\n"
+    if storage == "row":
+        info += f"Кодек файлов: {get_table_codec(table_name)}\n"
     info += f"Количество записей: {record_count}"
 
     return info
\ No newline at end of file
@@ -1,6 +1,27 @@
 import time
-from typing import Any, Callable, Dict
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
 
+from src.primitive_db.constants import QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_TTL
+
+# Пакетный режим (скрипт, stdin, -c): без подтверждений и замеров времени
+_batch_mode = False
+
+def set_batch_mode(enabled: bool) -> None:
+    """Включает или выключает пакетный режим выполнения команд."""
+    global _batch_mode
+    _batch_mode = enabled
+
+# Функции загрузки при ошибке возвращают пустую структуру вместо False
+EMPTY_RESULTS = {
+    'load_metadata': dict,
+    'load_table_data': list,
+}
+
+def empty_result(func: Callable) -> Any:
+    """Возвращает пустой результат для функций загрузки, иначе False."""
+    factory = EMPTY_RESULTS.get(func.__name__)
+    return factory() if factory is not None else False
 
 def handle_db_errors(func: Callable) -> Callable:
     """Декоратор для обработки ошибок базы данных."""
@@ -12,37 +33,25 @@ def handle_db_errors(func: Callable) -> Callable:
             msg += "Возможно, база данных не инициализирована."
             print(msg)
             # Для функций загрузки возвращаем пустые структуры
-            if func.__name__ in ['load_metadata', 'load_table_data']:
-                if func.__name__ == 'load_metadata':
-                    return {}
-                else:
-                    return []
-            return False
+            return empty_result(func)
         except KeyError as e:
             print(f"Ошибка: Таблица или столбец {e} не найден.")
-            if func.__name__ in ['load_metadata', 'load_table_data']:
-                if func.__name__ == 'load_metadata':
-                    return {}
-                else:
-                    return []
-            return False
+            return empty_result(func)
         except ValueError as e:
             print(f"Ошибка валидации: {e}")
             return False
         except Exception as e:
             print(f"Произошла непредвиденная ошибка: {e}")
-            if func.__name__ in ['load_metadata', 'load_table_data']:
-                if func.__name__ == 'load_metadata':
-                    return {}
-                else:
-                    return []
-            return False
+            return empty_result(func)
     return wrapper
 
 def confirm_action(action_name: str) -> Callable:
     """Фабрика декораторов для подтверждения действий."""
     def decorator(func: Callable) -> Callable:
         def wrapper(*args, **kwargs) -> Any:
+            if _batch_mode:
+                # Скрипт не может ответить на вопрос - команда уже подтверждена
+                return func(*args, **kwargs)
             question = f'Вы уверены, что хотите выполнить "{action_name}"? [y/n]: '
             response = input(question).strip().lower()
             if response != 'y':
@@ -55,6 +64,8 @@ def confirm_action(action_name: str) -> Callable:
 def log_time(func: Callable) -> Callable:
     """Декоратор для замера времени выполнения функции."""
     def wrapper(*args, **kwargs) -> Any:
+        if _batch_mode:
+            return func(*args, **kwargs)
         start_time = time.monotonic()
         result = func(*args, **kwargs)
         end_time = time.monotonic()
@@ -63,15 +74,56 @@ def log_time(func: Callable) -> Callable:
         return result
     return wrapper
 
-def create_cacher() -> Callable:
-    """Фабрика для создания кэшера с замыканием."""
-    cache: Dict[str, Any] = {}
-    
-    def cache_result(key: str, value_func: Callable) -> Any:
-        if key in cache:
-            return cache[key]
+def create_cacher(
+    max_entries: int = QUERY_CACHE_MAX_ENTRIES,
+    ttl: float = QUERY_CACHE_TTL
+) -> Callable:
+    """
+    Фабрика для создания LRU-кэшера с ограничением размера и времени жизни.
+
+    Каждая запись помечается таблицами, от которых зависит результат, что
+    позволяет сбрасывать записи одной таблицы. У возвращаемой функции есть
+    атрибуты invalidate(table_name=None) и stats().
+    """
+    cache: OrderedDict = OrderedDict()
+    counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def cache_result(key: Any, value_func: Callable, tables: Tuple = ()) -> Any:
+        entry = cache.get(key)
+        if entry is not None:
+            expires_at, _, value = entry
+            if time.monotonic() < expires_at:
+                counters["hits"] += 1
+                cache.move_to_end(key)
+                return value
+            # Запись устарела по времени
+            del cache[key]
+            counters["evictions"] += 1
+
+        counters["misses"] += 1
         result = value_func()
-        cache[key] = result
+        if result is False or max_entries <= 0:
+            # Ошибки не кэшируем
+            return result
+
+        cache[key] = (time.monotonic() + ttl, tuple(tables), result)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+            counters["evictions"] += 1
         return result
-    
-    return cache_result
\ No newline at end of file
+
+    def invalidate(table_name: Optional[str] = None) -> None:
+        """Сбрасывает записи, зависящие от таблицы (или все записи)."""
+        stale = [key for key, (_, tables, _) in cache.items()
+                 if table_name is None or table_name in tables]
+        for key in stale:
+            del cache[key]
+        counters["invalidations"] += len(stale)
+
+    def stats() -> Dict[str, Any]:
+        """Возвращает счетчики попаданий, промахов и вытеснений."""
+        return dict(counters, size=len(cache), max_entries=max_entries, ttl=ttl)
+
+    cache_result.invalidate = invalidate
+    cache_result.stats = stats
+    return cache_result
@@ -1,58 +1,145 @@
-import shlex
-from typing import List
+import json
+import sys
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
+from src.primitive_db.aggregate import aggregate_label
+from src.primitive_db.constants import ERROR_TABLE_NOT_FOUND, LOAD_BATCH_SIZE
 from src.primitive_db.core import (
+    aggregate,
+    begin_transaction,
+    commit_transaction,
+    create_index,
     create_table,
     delete,
     drop_table,
-    format_table_output,
     get_column_types,
     get_table_info,
+    get_transaction,
     insert,
+    insert_many,
+    iter_join,
+    iter_select,
+    iter_table_pages,
+    join,
     list_tables,
+    prepare_record,
+    rollback_transaction,
     select,
     update,
 )
-from src.primitive_db.decorators import create_cacher
+from src.primitive_db.decorators import create_cacher, set_batch_mode
 from src.primitive_db.parser import (
-    parse_insert_values,
+    parse_column_list,
+    parse_group_by,
+    parse_insert_rows,
+    parse_join_clause,
+    parse_limit_clause,
+    parse_order_by,
     parse_set_clause,
     parse_where_condition,
+    split_command,
+    strip_quotes,
 )
+from src.primitive_db.stats import get_table_stats, set_stats_deferred
 from src.primitive_db.utils import (
+    available_codecs,
+    compact_table,
+    convert_table_codec,
+    get_table_stamp,
+    has_table_view,
     load_metadata,
-    load_table_data,
+    read_rows_file,
 )
 
 # Добавим глобальную переменную для кэшера
 cacher = create_cacher()
 
 # Добавим функцию для очистки кэша
-def clear_cache():
-    """Очищает кэш запросов."""
-    global cacher
-    cacher = create_cacher()  # Создаем новый кэшер
+def clear_cache(table_name: Optional[str] = None):
+    """Сбрасывает результаты запросов к таблице (или весь кэш)."""
+    cacher.invalidate(table_name)
+
+def cached_query(
+    tables: Tuple[str, ...],
+    query: dict,
+    compute: Callable
+) -> Union[list, bool]:
+    """
+    Возвращает результат запроса из кэша или вычисляет его.
+
+    Ключ - нормализованный запрос и версии (штампы файлов) таблиц, поэтому
+    изменения, сделанные другим процессом, тоже приводят к промаху.
+    Таблицы с незафиксированными изменениями транзакции не кэшируются:
+    их файлы и штампы этих изменений еще не содержат.
+
+    Args:
+        tables: Таблицы, от которых зависит результат
+        query: Разобранный запрос (таблицы, столбцы, условия, limit, ...)
+        compute: Функция, вычисляющая результат
+
+    Returns:
+        Записи результата или False при ошибке (она уже выведена)
+    """
+    if any(has_table_view(name) for name in tables):
+        return compute()
+
+    versions = tuple(json.dumps(get_table_stamp(name)) for name in tables)
+    key = (json.dumps(query, sort_keys=True, default=str, ensure_ascii=False),
+           versions)
+    # При ошибке функция возвращает False - такой результат не кэшируется
+    return cacher(key, compute, tables)
 
 
 def print_help():
     """Выводит справочную информацию для режима работы с таблицами."""
     print("\n***Операции с данными***")
     print("Функции:")
-    print("<command> create_table <имя_таблицы> <столбец1:тип> ..")
-    print(" - создать таблицу")
+    print("<command> create_table <имя_таблицы> <столбец1:тип> .. [using columnar]")
+    print(" - создать таблицу (using columnar - колоночный формат хранения)")
     print("<command> insert into <имя_таблицы> values (<значение1>, ...)")
-    print(" - создать запись")
-    print("<command> select from <имя_таблицы> where <столбец> = <значение>")
-    print(" - прочитать записи по условию")
-    print("<command> select from <имя_таблицы>")
-    print(" - прочитать все записи")
+    print(" - создать запись (несколько групп (...), (...) - пакетная вставка)")
+    print("<command> load <имя_таблицы> from <файл.csv|файл.jsonl>")
+    print(" - загрузить записи из файла")
+    print("<command> select from <имя_таблицы> where <условие>")
+    print(" - прочитать записи по условию: <столбец> <оп> <значение>,")
+    print("   <столбец> [not] in (<значение>, ...), and, or, not и скобки")
+    print("<command> select from <имя_таблицы> [limit N] [offset M]")
+    print(" - прочитать все записи (или N записей, пропустив M)")
+    print("<command> select <столбец1>, ... from <имя_таблицы> [where ...]")
+    print(" - прочитать только указанные столбцы")
+    print("<command> select <столбец>, count(*), sum(<столбец>) from <имя_таблицы>")
+    print("          [where ...] [group by <столбец>, ...]")
+    print(" - агрегаты count, sum, min, max, avg (с группировкой)")
+    print("<command> select from <таблица1> join <таблица2> on <т1>.<ст> = <т2>.<ст>")
+    print(" - соединение таблиц (столбцы в условиях: <таблица>.<столбец>)")
+    print("<command> select ... from <имя_таблицы> ... order by <столбец> [asc|desc]")
+    print(" - сортировка (по индексу, если он есть)")
     print("<command> update <table> set <col>=<val> where <col>=<val>")
     print(" - обновить запись")
     print("<command> delete from <table> where <condition>")
     print(" - удалить запись")
     print("<command> info <имя_таблицы> - вывести информацию о таблице")
+    print("<command> compact <имя_таблицы> - свернуть журнал изменений в снимок")
+    print("<command> convert_table <имя_таблицы> <кодек> - переписать файлы")
+    print("          построчной таблицы другим кодеком (json, msgpack)")
+    print("<command> cache_stats - статистика кэша результатов запросов")
+    print("<command> create_index <имя_таблицы> <столбец> - создать индекс")
     print("<command> list_tables - показать список всех таблиц")
     print("<command> drop_table <имя_таблицы> - удалить таблицу")
+    print("<command> begin - начать транзакцию (изменения копятся в памяти)")
+    print("<command> commit - записать изменения транзакции")
+    print("<command> rollback - отменить изменения транзакции")
     print("<command> exit - выход из программы")
     print("<command> help - справочная информация\n")
 
@@ -61,17 +148,30 @@ def print_welcome():
     """Выводит приветственное сообщение."""
     print("***Операции с данными***")
     print("Функции:")
-    print("<command> insert into <table> values (<value1>, ...)")
-    print(" - создать запись")
-    print("<command> select from <table> where <column> = <value>")
-    print(" - прочитать записи по условию")
-    print("<command> select from <table> - прочитать все записи")
+    print("<command> insert into <table> values (<value1>, ...), ...")
+    print(" - создать одну или несколько записей")
+    print("<command> load <table> from <file.csv|file.jsonl> - загрузить из файла")
+    print("<command> select from <table> where <condition>")
+    print(" - прочитать записи по условию (and, or, not, in, скобки)")
+    print("<command> select from <table> [limit N] [offset M]")
+    print(" - прочитать все записи (или N записей, пропустив M)")
+    print("<command> select <col1>, ... from <table> - только указанные столбцы")
+    print("<command> select count(*), sum(<col>), ... from <table> [group by <col>]")
+    print(" - агрегаты count, sum, min, max, avg")
+    print("<command> select from <t1> join <t2> on <t1>.<col> = <t2>.<col>")
+    print(" - соединение двух таблиц")
+    print("<command> select ... from <table> ... order by <col> [asc|desc]")
+    print(" - сортировка результата")
     print("<command> update <table> set <col>=<val> where <col>=<val>")
     print(" - обновить запись")
     print("<command> delete from <table> where <condition>")
     print(" - удалить запись")
     print("<command> info <table> - вывести информацию о таблице")
-    print("<command> create_table <table> <col1:type> .. - создать таблицу")
+    print("<command> compact <table> - свернуть журнал изменений в снимок")
+    print("<command> cache_stats - статистика кэша запросов")
+    print("<command> create_table <table> <col1:type> .. [using columnar]")
+    print(" - создать таблицу")
+    print("<command> create_index <table> <column> - создать индекс")
     print("<command> list_tables - показать список всех таблиц")
     print("<command> drop_table <table> - удалить таблицу")
     print("<command> exit - выход из программы")
@@ -86,7 +186,7 @@ def handle_create_table(args: List[str]) -> bool:
         args: Аргументы команды
 
     Returns:
-        True если нужно сохранить метаданные, иначе False
+        True, если команда выполнена, иначе False
     """
     if len(args) < 2:
         msg = "Ошибка: Недостаточно аргументов. "
@@ -96,6 +196,12 @@ def handle_create_table(args: List[str]) -> bool:
 
     table_name = args[0]
     columns = args[1:]
+    storage = "row"
+
+    # Необязательный формат хранения: ... using columnar
+    if len(columns) >= 2 and columns[-2].lower() == "using":
+        storage = columns[-1].lower()
+        columns = columns[:-2]
     
     try:
         metadata = load_metadata()
@@ -105,20 +211,19 @@ def handle_create_table(args: List[str]) -> bool:
             print("Ошибка: Неверный формат метаданных. Пересоздаем...")
             metadata = {}  # Создаем новый словарь
         
-        success = create_table(metadata, table_name, columns)
+        success = create_table(metadata, table_name, columns, storage)
         
         if success:
             print(f'Таблица "{table_name}" успешно создана')
             # Показываем созданные столбцы
-            metadata = load_metadata()  # Перезагружаем
-            if isinstance(metadata, dict) and table_name in metadata:
+            if table_name in metadata:
                 table_columns = metadata[table_name]["columns"]
                 columns_str = ", ".join(table_columns)
                 print(f"Столбцы: {columns_str}")
         else:
             print(f'Не удалось создать таблицу "{table_name}"')
         
-        return False
+        return bool(success)
         
     except Exception as e:
         print(f"Ошибка при создании таблицы: {e}")
@@ -146,7 +251,9 @@ def handle_drop_table(args: List[str]) -> bool:
             # ✅ ВАЖНО: Сохраняем обновленные метаданные
             from src.primitive_db.utils import save_metadata
             save_metadata(metadata)
+            clear_cache(table_name)
             print(f'Таблица "{table_name}" успешно удалена.')
+            return True
         else:
             print(f'Не удалось удалить таблицу "{table_name}"')
             return False
@@ -156,6 +263,36 @@ def handle_drop_table(args: List[str]) -> bool:
         return False
 
 
+def handle_create_index(args: List[str]) -> bool:
+    """Обрабатывает команду создания индекса."""
+    if len(args) != 2:
+        msg = "Ошибка: Неверное количество аргументов. "
+        msg += "Используйте: create_index <имя_таблицы> <столбец>"
+        print(msg)
+        return False
+
+    table_name, column = args
+
+    try:
+        metadata = load_metadata()
+        if not isinstance(metadata, dict):
+            print("Ошибка: Метаданные повреждены")
+            return False
+
+        if create_index(metadata, table_name, column):
+            # Результаты выборок не меняются, но планы запросов - да
+            clear_cache(table_name)
+            print(f'Индекс по столбцу "{column}" таблицы "{table_name}" создан.')
+            return True
+        else:
+            print(f'Не удалось создать индекс для таблицы "{table_name}"')
+
+    except Exception as e:
+        print(f"Ошибка при создании индекса: {e}")
+
+    return False
+
+
 def handle_list_tables(args: List[str]) -> bool:
     """
     Обрабатывает команду списка таблиц.
@@ -164,7 +301,7 @@ def handle_list_tables(args: List[str]) -> bool:
         args: Аргументы команды
 
     Returns:
-        False (не требует сохранения метаданных)
+        True, если команда выполнена, иначе False
     """
     if args:
         print("Ошибка: Команда list_tables не принимает аргументов")
@@ -185,7 +322,7 @@ def handle_list_tables(args: List[str]) -> bool:
         for table in tables:
             print(f"- {table}")
     
-    return False
+    return True
 
 
 
@@ -201,86 +338,294 @@ def handle_insert(args: List[str]) -> bool:
     values_str = " ".join(args[3:])
     
     try:
-        values = parse_insert_values(values_str)
+        rows = parse_insert_rows(values_str)
         metadata = load_metadata()
         
         if not isinstance(metadata, dict):
             print("Ошибка: Метаданные повреждены")
             return False
+
+        if len(rows) > 1:
+            # Несколько групп значений - одна запись на весь пакет
+            new_ids = insert_many(metadata, table_name, rows)
+            if new_ids:
+                clear_cache(table_name)
+                msg = f"Добавлено записей: {len(new_ids)} "
+                msg += f'(ID={new_ids[0]}..{new_ids[-1]}) в таблицу "{table_name}".'
+                print(msg)
+            else:
+                print(f'Не удалось добавить записи в таблицу "{table_name}"')
+            return bool(new_ids)
             
-        success = insert(metadata, table_name, values)
+        new_id = insert(metadata, table_name, rows[0])
         
-        if success:
+        if new_id:
             # Очищаем кэш при успешном добавлении
-            clear_cache()
-            # Загружаем данные таблицы чтобы найти новый ID
-            table_data = load_table_data(table_name)
-            if table_data:
-                new_id = max(record["ID"] for record in table_data)
-            else:
-                new_id = 1
+            clear_cache(table_name)
             print(f'Запись с ID={new_id} успешно добавлена в таблицу "{table_name}".')
         else:
             print(f'Не удалось добавить запись в таблицу "{table_name}"')
             
-        return False
+        return bool(new_id)
         
     except Exception as e:
         print(f"Ошибка при добавлении записи: {e}")
         return False
 
 
+def _read_load_rows(
+    filepath: str,
+    column_types: Dict[str, str]
+) -> Iterator[Tuple[int, List[Any]]]:
+    """Читает строки файла загрузки, проверяя значения до записи."""
+    columns = [col for col in column_types if col != "ID"]
+    for number, row in read_rows_file(filepath, columns):
+        try:
+            prepare_record(column_types, row)
+        except ValueError as e:
+            raise ValueError(f"Строка {number}: {e}")
+        yield number, row
+
+
+def handle_load(args: List[str]) -> bool:
+    """
+    Обрабатывает команду LOAD (пакетная загрузка из CSV/JSONL).
+
+    Строки проверяются при чтении и записываются пакетами. На первой
+    ошибочной строке загрузка останавливается: все строки до нее
+    записываются, выводится их количество и номер строки файла, на
+    которой загрузка прервана.
+    """
+    if len(args) != 3 or args[1].lower() != "from":
+        msg = "Ошибка: Неверный формат команды. "
+        msg += "Используйте: load <table> from <file.csv|file.jsonl>"
+        print(msg)
+        return False
+
+    table_name = args[0]
+    filepath = strip_quotes(args[2])
+
+    try:
+        metadata = load_metadata()
+        if not isinstance(metadata, dict):
+            print("Ошибка: Метаданные повреждены")
+            return False
+
+        if table_name not in metadata:
+            print(f'Таблица "{table_name}" не существует.')
+            return False
+
+        column_types = get_column_types(metadata, table_name)
+
+        loaded = 0
+        batch = []
+        batch_line = 0
+        error = None
+        try:
+            for number, row in _read_load_rows(filepath, column_types):
+                if not batch:
+                    batch_line = number
+                batch.append(row)
+                if len(batch) >= LOAD_BATCH_SIZE:
+                    if insert_many(metadata, table_name, batch) is False:
+                        error = f"Строка {batch_line}: пакет не записан"
+                        batch = []
+                        break
+                    loaded += len(batch)
+                    batch = []
+        except ValueError as e:
+            error = str(e)
+
+        # Строки перед ошибочной уже проверены - записываем и их
+        if batch:
+            if insert_many(metadata, table_name, batch) is False:
+                error = f"Строка {batch_line}: пакет не записан"
+            else:
+                loaded += len(batch)
+
+        if loaded:
+            clear_cache(table_name)
+        print(f'Загружено записей: {loaded} в таблицу "{table_name}".')
+        if error is not None:
+            print(f"Загрузка остановлена. {error}")
+        return error is None
+
+    except Exception as e:
+        print(f"Ошибка при загрузке данных: {e}")
+
+    return False
+
+
 def handle_select(args: List[str]) -> bool:
     """Обрабатывает команду SELECT."""
-    if len(args) < 2 or args[0].lower() != "from":
-        msg = "Ошибка: Неверный формат команды. "
-        msg += "Используйте: select from <table> [where ...]"
+    lowered = [arg.lower() for arg in args]
+    from_index = lowered.index("from") if "from" in lowered else -1
+    if from_index < 0 or len(args) < from_index + 2:
+        msg = "Ошибка: Неверный формат команды. Используйте: "
+        msg += "select [<col1>, ...] from <table> [where ...] [limit N] [offset M]"
         print(msg)
         return False
 
-    table_name = args[1]
+    table_name = args[from_index + 1]
     where_clause = None
-    
-    # Парсим условие WHERE, если оно указано
-    if len(args) > 3 and args[2].lower() == "where":
-        where_condition = " ".join(args[3:])
-        where_clause = parse_where_condition(where_condition)
-    
+
     try:
+        # Список столбцов между select и from (пусто или * - все столбцы)
+        columns = parse_column_list(" ".join(args[:from_index]))
+        tail, limit, offset = parse_limit_clause(args[from_index + 2:])
+        tail, order_by = parse_order_by(tail)
+        tail, group_by = parse_group_by(tail)
+        tail, join_spec = parse_join_clause(tail)
+
+        # Парсим условие WHERE, если оно указано
+        if tail:
+            if tail[0].lower() != "where" or len(tail) < 2:
+                print("Ошибка: Неверный формат команды. Ожидалось: where <условие>")
+                return False
+            where_clause = parse_where_condition(" ".join(tail[1:]))
+
         metadata = load_metadata()
         if not isinstance(metadata, dict):
             print("Ошибка: Метаданные повреждены")
             return False
-            
-        # Используем кэширование
-        cache_key = f"{table_name}_{str(where_clause)}"
-        
-        def get_data():
-            return select(metadata, table_name, where_clause)
-        
-        filtered_data = cacher(cache_key, get_data)
-        
-        if not filtered_data:
-            print("Записей не найдено")
+
+        if table_name not in metadata:
+            print(f"Ошибка: {ERROR_TABLE_NOT_FOUND.format(table_name)}")
             return False
-        
-        # Получаем названия столбцов из метаданных
-        column_types = get_column_types(metadata, table_name)
-        columns = list(column_types.keys())
-        
-        # Форматируем и выводим таблицу
-        table_output = format_table_output(columns, filtered_data)
-        print(table_output)
-        
+
+        is_aggregate = group_by is not None or any(
+            isinstance(item, dict) for item in columns or [])
+
+        if join_spec is not None:
+            if is_aggregate:
+                print("Ошибка: Агрегаты с JOIN не поддерживаются")
+                return False
+            records, columns = run_join_select(
+                metadata, table_name, join_spec, columns, where_clause,
+                limit, offset, order_by)
+        elif is_aggregate:
+            # Результат агрегации небольшой - используем кэширование
+            query = {"table": table_name, "columns": columns,
+                     "where": where_clause, "group_by": group_by,
+                     "order_by": order_by, "limit": limit, "offset": offset}
+
+            def get_data():
+                return aggregate(metadata, table_name, columns or [], where_clause,
+                                 group_by, limit, offset, order_by)
+
+            records = cached_query((table_name,), query, get_data)
+            columns = [aggregate_label(item) for item in columns or []]
+        elif limit is not None:
+            # Ограниченный результат небольшой - используем кэширование
+            query = {"table": table_name, "columns": columns,
+                     "where": where_clause, "order_by": order_by,
+                     "limit": limit, "offset": offset}
+
+            def get_data():
+                return select(metadata, table_name, where_clause, limit, offset,
+                              columns, order_by)
+
+            records = cached_query((table_name,), query, get_data)
+        else:
+            # Полная выборка читается и выводится постранично, без кэша
+            records = iter_select(metadata, table_name, where_clause,
+                                  offset=offset, columns=columns,
+                                  order_by=order_by)
+
+        if records is False:
+            # Ошибка уже выведена handle_db_errors
+            return False
+
+        if columns is None:
+            # Получаем названия столбцов из метаданных
+            columns = list(get_column_types(metadata, table_name).keys())
+
+        # Выводим таблицу страницами по мере чтения записей
+        found = False
+        for page in iter_table_pages(columns, records):
+            print(page)
+            found = True
+
+        if not found:
+            print("Записей не найдено")
+        return True
+
     except Exception as e:
         print(f"Ошибка при выборке данных: {e}")
-    
+
     return False
 
 
+def run_join_select(
+    metadata: dict,
+    table_name: str,
+    join_spec: dict,
+    columns: Optional[List[str]],
+    where_clause: Optional[dict],
+    limit: Optional[int],
+    offset: int,
+    order_by: Optional[Tuple[str, bool]]
+) -> Tuple[Iterable[dict], List[str]]:
+    """
+    Выполняет SELECT с JOIN двух таблиц.
+
+    Args:
+        metadata: Метаданные базы
+        table_name: Таблица после FROM
+        join_spec: Описание соединения из parse_join_clause
+        columns: Квалифицированные столбцы результата или None
+        where_clause: Условие на квалифицированные столбцы или None
+        limit: Максимум записей или None
+        offset: Сколько записей пропустить
+        order_by: (столбец, по убыванию) или None
+
+    Returns:
+        Кортеж (записи, названия столбцов для вывода)
+
+    Raises:
+        ValueError: Если условие соединения не относится к этим таблицам
+    """
+    other_table = join_spec["table"]
+    if other_table not in metadata:
+        raise ValueError(ERROR_TABLE_NOT_FOUND.format(other_table))
+
+    # Условие ON может перечислять таблицы в любом порядке
+    sides = {
+        join_spec["left_table"]: join_spec["left_column"],
+        join_spec["right_table"]: join_spec["right_column"],
+    }
+    if set(sides) != {table_name, other_table}:
+        raise ValueError(
+            f"Условие соединения должно связывать {table_name} и {other_table}"
+        )
+
+    if limit is not None:
+        # Ограниченный результат небольшой - используем кэширование
+        query = {"table": table_name, "join": join_spec, "columns": columns,
+                 "where": where_clause, "order_by": order_by,
+                 "limit": limit, "offset": offset}
+
+        def get_data():
+            return join(metadata, table_name, other_table, sides[table_name],
+                        sides[other_table], where_clause, limit, offset,
+                        columns, order_by)
+
+        records = cached_query((table_name, other_table), query, get_data)
+    else:
+        records = iter_join(metadata, table_name, other_table, sides[table_name],
+                            sides[other_table], where_clause, offset=offset,
+                            columns=columns, order_by=order_by)
+
+    if columns is None:
+        columns = [f"{name}.{column}"
+                   for name in (table_name, other_table)
+                   for column in get_column_types(metadata, name)]
+    return records, columns
+
+
 def handle_update(args: List[str]) -> bool:
     """Обрабатывает команду UPDATE."""
-    if (len(args) < 6 or args[1].lower() != "set" or
+    if (len(args) < 4 or args[1].lower() != "set" or
         "where" not in [arg.lower() for arg in args]):
         msg = "Ошибка: Неверный формат команды. "
         msg += "Используйте: update <table> set <col>=<val> where <col>=<val>"
@@ -316,8 +661,9 @@ def handle_update(args: List[str]) -> bool:
         
         if success:
             # Очищаем кэш при успешном обновлении
-            clear_cache()
+            clear_cache(table_name)
             print(f'Записи в таблице "{table_name}" успешно обновлены.')
+            return True
         else:
             print(f'Не удалось обновить записи в таблице "{table_name}"')
             
@@ -350,8 +696,9 @@ def handle_delete(args: List[str]) -> bool:
         
         if success:
             # Очищаем кэш при успешном удалении
-            clear_cache()
+            clear_cache(table_name)
             print(f'Записи из таблицы "{table_name}" успешно удалены.')
+            return True
         else:
             print(f'Не удалось удалить записи из таблицы "{table_name}"')
             
@@ -375,13 +722,193 @@ def handle_info(args: List[str]) -> bool:
             return False
             
         info = get_table_info(metadata, table_name)
+        if info is False:
+            return False
         print(info)
+        return True
         
     except Exception as e:
         print(f"Ошибка при получении информации о таблице: {e}")
     
     return False
 
+def handle_compact(args: List[str]) -> bool:
+    """Обрабатывает команду COMPACT."""
+    if len(args) != 1:
+        print("Ошибка: Используйте: compact <имя_таблицы>")
+        return False
+
+    table_name = args[0]
+
+    try:
+        metadata = load_metadata()
+        if not isinstance(metadata, dict):
+            print("Ошибка: Метаданные повреждены")
+            return False
+
+        if table_name not in metadata:
+            print(f'Таблица "{table_name}" не существует.')
+            return False
+
+        if compact_table(table_name):
+            # Штамп таблицы меняется - старые результаты уже не попадут в кэш.
+            # Статистика пересчитывается с новым штампом, иначе при запуске
+            # индексы таблицы считались бы отставшими от журнала
+            clear_cache(table_name)
+            get_table_stats(table_name, bounds=False)
+            print(f'Журнал таблицы "{table_name}" свернут в снимок.')
+            return True
+        else:
+            print(f'Не удалось выполнить компакцию таблицы "{table_name}"')
+
+    except Exception as e:
+        print(f"Ошибка при компакции таблицы: {e}")
+
+    return False
+
+
+def handle_convert_table(args: List[str]) -> bool:
+    """Обрабатывает команду CONVERT_TABLE."""
+    if len(args) != 2:
+        codecs = ", ".join(available_codecs())
+        print("Ошибка: Используйте: convert_table <имя_таблицы> <кодек> "
+              f"(доступные кодеки: {codecs})")
+        return False
+
+    table_name, codec = args[0], args[1].lower()
+
+    try:
+        metadata = load_metadata()
+        if not isinstance(metadata, dict):
+            print("Ошибка: Метаданные повреждены")
+            return False
+
+        if table_name not in metadata:
+            print(f'Таблица "{table_name}" не существует.')
+            return False
+
+        if convert_table_codec(table_name, codec):
+            clear_cache(table_name)
+            get_table_stats(table_name, bounds=False)
+            print(f'Таблица "{table_name}" переписана кодеком {codec}.')
+            return True
+        else:
+            print(f'Не удалось конвертировать таблицу "{table_name}"')
+
+    except Exception as e:
+        print(f"Ошибка при конвертации таблицы: {e}")
+
+    return False
+
+
+def handle_cache_stats(args: List[str]) -> bool:
+    """Обрабатывает команду CACHE_STATS."""
+    stats = cacher.stats()
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = stats["hits"] / lookups * 100 if lookups else 0.0
+    print(f"Записей в кэше: {stats['size']} из {stats['max_entries']} "
+          f"(время жизни {stats['ttl']} с)")
+    print(f"Попадания: {stats['hits']}, промахи: {stats['misses']} "
+          f"({hit_rate:.1f}% попаданий)")
+    print(f"Вытеснено: {stats['evictions']}, сброшено: {stats['invalidations']}")
+    return True
+
+
+def handle_begin(args: List[str]) -> bool:
+    """Обрабатывает команду BEGIN."""
+    try:
+        begin_transaction()
+        print("Транзакция начата.")
+        return True
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+    return False
+
+
+def handle_commit(args: List[str]) -> bool:
+    """Обрабатывает команду COMMIT."""
+    try:
+        written = commit_transaction()
+        print(f"Транзакция зафиксирована, записано изменений: {written}.")
+        return True
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+    return False
+
+
+def handle_rollback(args: List[str]) -> bool:
+    """Обрабатывает команду ROLLBACK."""
+    try:
+        discarded = rollback_transaction()
+        print(f"Транзакция отменена, отброшено изменений: {discarded}.")
+        return True
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+    return False
+
+
+def close_transaction() -> None:
+    """Отменяет транзакцию, оставшуюся открытой при выходе."""
+    if get_transaction() is not None:
+        discarded = rollback_transaction()
+        print(f"Незафиксированная транзакция отменена, "
+              f"отброшено изменений: {discarded}.")
+
+
+# Обработчики команд: имя команды -> функция от списка аргументов
+COMMAND_HANDLERS = {
+    "create_table": handle_create_table,
+    "drop_table": handle_drop_table,
+    "create_index": handle_create_index,
+    "list_tables": handle_list_tables,
+    "insert": handle_insert,
+    "load": handle_load,
+    "select": handle_select,
+    "update": handle_update,
+    "delete": handle_delete,
+    "info": handle_info,
+    "compact": handle_compact,
+    "convert_table": handle_convert_table,
+    "cache_stats": handle_cache_stats,
+    "begin": handle_begin,
+    "commit": handle_commit,
+    "rollback": handle_rollback,
+}
+
+# Команды, которые меняют структуру таблиц и не откладываются до commit
+NON_TRANSACTIONAL_COMMANDS = {"create_table", "drop_table", "create_index",
+                              "compact", "convert_table"}
+
+
+def execute_command(user_input: str) -> bool:
+    """
+    Выполняет одну команду (кроме exit).
+
+    Args:
+        user_input: Строка команды
+
+    Returns:
+        True, если команда выполнена; False, если она неизвестна или
+        завершилась ошибкой (сообщение об ошибке уже выведено)
+    """
+    # Разбиваем ввод на команду и аргументы
+    parts = split_command(user_input)
+    command = parts[0].lower()
+    args = parts[1:]
+
+    if command == "help":
+        print_help()
+        return True
+    handler = COMMAND_HANDLERS.get(command)
+    if handler is None:
+        print(f"Функции '{command}' нет. Попробуйте снова.")
+        return False
+    if command in NON_TRANSACTIONAL_COMMANDS and get_transaction() is not None:
+        print(f"Ошибка: {command} недоступна внутри транзакции. "
+              "Выполните commit или rollback.")
+        return False
+    return handler(args)
+
 
 def run():
     """Основная функция запуска базы данных."""
@@ -393,34 +920,63 @@ def run():
             if not user_input:
                 continue
             
-            # Разбиваем ввод на команду и аргументы
-            parts = shlex.split(user_input)
-            command = parts[0].lower()
-            args = parts[1:]
-            
-            if command == "exit":
+            if user_input.split()[0].lower() == "exit":
+                close_transaction()
                 print("Выход из программы...")
                 break
-            elif command == "help":
-                print_help()
-            elif command == "create_table":
-                handle_create_table(args)
-            elif command == "drop_table":
-                handle_drop_table(args)
-            elif command == "list_tables":
-                handle_list_tables(args)
-            elif command == "insert":
-                handle_insert(args)
-            elif command == "select":
-                handle_select(args)
-            elif command == "update":
-                handle_update(args)
-            elif command == "delete":
-                handle_delete(args)
-            elif command == "info":
-                handle_info(args)
-            else:
-                print(f"Функции '{command}' нет. Попробуйте снова.")
+            execute_command(user_input)
                 
         except Exception as e:
-            print(f"Ошибка: {e}. Попробуйте снова.")
\ No newline at end of file
+            print(f"Ошибка: {e}. Попробуйте снова.")
+
+
+def run_batch(commands: Iterable[str]) -> bool:
+    """
+    Выполняет команды скрипта без приглашений и подтверждений.
+
+    Пустые строки и комментарии (# или --) пропускаются, завершающая ";"
+    отбрасывается, exit останавливает выполнение. Метаданные и таблицы
+    остаются в памяти на весь пакет. Итог с пропускной способностью
+    выводится в stderr, чтобы не смешиваться с результатами запросов.
+    Файлы статистики таблиц записываются один раз в конце пакета.
+
+    Args:
+        commands: Строки команд (файл, stdin или одна команда -c)
+
+    Returns:
+        True, если ни одна команда не завершилась ошибкой (в том числе
+        выведенной обработчиком команды)
+    """
+    executed = 0
+    failed = 0
+    set_batch_mode(True)
+    # Статистика таблиц записывается один раз в конце пакета
+    set_stats_deferred(True)
+    start_time = time.monotonic()
+    try:
+        for line in commands:
+            line = line.strip()
+            if line.endswith(";"):
+                line = line[:-1].rstrip()
+            if not line or line.startswith(("#", "--")):
+                continue
+            if line.split()[0].lower() == "exit":
+                break
+
+            executed += 1
+            try:
+                if not execute_command(line):
+                    failed += 1
+            except Exception as e:
+                print(f"Ошибка: {e}")
+                failed += 1
+    finally:
+        close_transaction()
+        set_stats_deferred(False)
+        set_batch_mode(False)
+
+    elapsed = time.monotonic() - start_time
+    rate = executed / elapsed if elapsed > 0 else 0.0
+    print(f"Выполнено команд: {executed} за {elapsed:.3f} секунд "
+          f"({rate:.0f} команд/с), с ошибками: {failed}", file=sys.stderr)
+    return failed == 0
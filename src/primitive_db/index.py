@@ -0,0 +1,415 @@
+import json
+import os
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from src.primitive_db.constants import DATA_DIR, INDEX_SUFFIX
+from src.primitive_db.decorators import handle_db_errors
+from src.primitive_db.locks import table_lock
+from src.primitive_db.utils import (
+    append_lines,
+    atomic_write,
+    ensure_data_dir,
+    get_file_stamp,
+    has_table_view,
+    json_loads,
+    load_table_data,
+)
+
+
+def get_index_path(table_name: str, column: str) -> str:
+    """
+    Get path for column index file.
+
+    Args:
+        table_name: Name of the table
+        column: Indexed column name
+
+    Returns:
+        Path to index file
+    """
+    return f"{DATA_DIR}/{table_name}.{column}{INDEX_SUFFIX}"
+
+def encode_index_key(value: Any) -> str:
+    """
+    Encode column value as index key.
+
+    JSON encoding keeps values of different types apart ("1" vs 1).
+
+    Args:
+        value: Column value
+
+    Returns:
+        String key for the index
+    """
+    # Целые числа (чаще всего ID) кодируются как в JSON, но без json.dumps
+    if type(value) is int:
+        return str(value)
+    return json.dumps(value, ensure_ascii=False)
+
+# Загруженные индексы: путь -> {"keys", "sorted", "stamp"}
+_index_cache: Dict[str, Dict[str, Any]] = {}
+
+def _decode_keys(keys: Iterable[str]) -> List[Any]:
+    """Decode index keys back to values with one JSON parse."""
+    return json_loads("[" + ",".join(keys) + "]")
+
+def _apply_index_entry(index: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    """Apply one add/remove entry to loaded index keeping key order."""
+    keys = index["keys"]
+    key = entry["key"]
+
+    if entry["op"] == "add":
+        if key not in keys:
+            keys[key] = set()
+            insort(index["sorted"], json.loads(key))
+        keys[key].update(entry["ids"])
+    elif key in keys:
+        keys[key].difference_update(entry["ids"])
+        if not keys[key]:
+            del keys[key]
+            values = index["sorted"]
+            del values[bisect_left(values, json.loads(key))]
+
+def get_table_indexes(metadata: Dict[str, Any], table_name: str) -> List[str]:
+    """
+    Get indexed columns of the table.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+
+    Returns:
+        List of indexed column names (ID is always indexed)
+    """
+    return metadata.get(table_name, {}).get("indexes", ["ID"])
+
+def get_query_indexes(metadata: Dict[str, Any], table_name: str) -> List[str]:
+    """
+    Get indexed columns that can answer queries to the table.
+
+    Index files do not hold uncommitted transaction changes, so a table
+    changed by the current transaction is queried without indexes.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+
+    Returns:
+        List of usable indexed columns
+    """
+    if has_table_view(table_name):
+        return []
+    return get_table_indexes(metadata, table_name)
+
+def _write_index(
+    table_name: str,
+    column: str,
+    index: Dict[str, Set[Any]]
+) -> None:
+    """Rewrite index file with one line per key."""
+    ensure_data_dir()
+    filepath = get_index_path(table_name, column)
+    _index_cache.pop(filepath, None)
+
+    # Ключи пишутся по возрастанию значений
+    items = list(index.items())
+    values = _decode_keys(key for key, _ in items)
+    ordered = [items[position] for position in
+               sorted(range(len(items)), key=values.__getitem__)]
+
+    def write(file: TextIO) -> None:
+        for key, ids in ordered:
+            entry = {"op": "add", "key": key, "ids": sorted(ids)}
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    atomic_write(filepath, write)
+
+@handle_db_errors
+def build_index(
+    table_name: str,
+    column: str,
+    data: List[Dict[str, Any]]
+) -> bool:
+    """
+    Build column index from table records and save it.
+
+    Args:
+        table_name: Name of the table
+        column: Column to index
+        data: Table records
+
+    Returns:
+        True if successful
+    """
+    index: Dict[str, Set[Any]] = {}
+    for record in data:
+        if column in record:
+            key = encode_index_key(record[column])
+            index.setdefault(key, set()).add(record["ID"])
+
+    _write_index(table_name, column, index)
+    return True
+
+def load_index(table_name: str, column: str) -> Dict[str, Any]:
+    """
+    Load column index, building it from table data if file is missing.
+
+    Loaded indexes stay in memory until the index file changes. The
+    file is read under the shared table lock; building or compacting
+    it takes the exclusive one.
+
+    Args:
+        table_name: Name of the table
+        column: Indexed column name
+
+    Returns:
+        Dictionary with "keys" (encoded value -> set of IDs) and
+        "sorted" (decoded values in ascending order)
+    """
+    filepath = get_index_path(table_name, column)
+    with table_lock(table_name):
+        if not os.path.exists(filepath):
+            with table_lock(table_name, exclusive=True):
+                # Пока ждали блокировку, индекс мог построить другой процесс
+                if not os.path.exists(filepath):
+                    build_index(table_name, column, load_table_data(table_name))
+
+        stamp = get_file_stamp(filepath)
+        cached = _index_cache.get(filepath)
+        if cached is not None and cached["stamp"] == stamp:
+            return cached
+
+        keys: Dict[str, Set[Any]] = {}
+        line_count = 0
+        with open(filepath, 'r', encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json_loads(line)
+                except ValueError:
+                    # Недописанная строка после сбоя - пропускаем
+                    continue
+                line_count += 1
+
+                ids = keys.setdefault(entry["key"], set())
+                if entry["op"] == "add":
+                    ids.update(entry["ids"])
+                else:
+                    ids.difference_update(entry["ids"])
+                    if not ids:
+                        del keys[entry["key"]]
+
+        # Слишком много накопленных изменений - переписываем файл компактно
+        if line_count > 2 * len(keys) + 100:
+            with table_lock(table_name, exclusive=True):
+                # Если файл дописали, пока блокировка повышалась,
+                # компактная запись потеряла бы изменения - откладываем ее
+                if get_file_stamp(filepath) == stamp:
+                    _write_index(table_name, column, keys)
+                    stamp = get_file_stamp(filepath)
+
+    index = {
+        "keys": keys,
+        "sorted": sorted(_decode_keys(keys)),
+        "stamp": stamp,
+    }
+    _index_cache[filepath] = index
+    return index
+
+def lookup_index(table_name: str, column: str, value: Any) -> Set[Any]:
+    """
+    Find IDs of records with given column value.
+
+    Args:
+        table_name: Name of the table
+        column: Indexed column name
+        value: Value to look up
+
+    Returns:
+        Set of matching record IDs
+    """
+    index = load_index(table_name, column)
+    return index["keys"].get(encode_index_key(value), set())
+
+def range_lookup_index(
+    table_name: str,
+    column: str,
+    operator: str,
+    value: Any
+) -> List[Any]:
+    """
+    Find IDs of records matching a range condition.
+
+    Bounds are found by binary search over sorted keys, so the cost is
+    O(log N + k) for k matching keys.
+
+    Args:
+        table_name: Name of the table
+        column: Indexed column name
+        operator: One of ">", "<", ">=", "<="
+        value: Boundary value
+
+    Returns:
+        Matching record IDs ordered by column value
+    """
+    index = load_index(table_name, column)
+    values = index["sorted"]
+
+    start, end = 0, len(values)
+    if operator == ">":
+        start = bisect_right(values, value)
+    elif operator == ">=":
+        start = bisect_left(values, value)
+    elif operator == "<":
+        end = bisect_left(values, value)
+    elif operator == "<=":
+        end = bisect_right(values, value)
+    else:
+        raise ValueError(f"Operator {operator} is not supported by index")
+
+    keys = index["keys"]
+    result = []
+    for key_value in values[start:end]:
+        result.extend(sorted(keys[encode_index_key(key_value)]))
+    return result
+
+def iter_index_ids(
+    table_name: str,
+    column: str,
+    descending: bool = False
+) -> Iterator[Any]:
+    """
+    Lazily yield record IDs ordered by column value.
+
+    Args:
+        table_name: Name of the table
+        column: Indexed column name
+        descending: Yield largest values first
+
+    Yields:
+        Record IDs (ascending IDs within one value)
+    """
+    index = load_index(table_name, column)
+    keys = index["keys"]
+    values = reversed(index["sorted"]) if descending else index["sorted"]
+    for key_value in values:
+        yield from sorted(keys[encode_index_key(key_value)])
+
+def compute_index_entries(
+    metadata: Dict[str, Any],
+    table_name: str,
+    changes: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Compute index log entries for record changes without writing them.
+
+    Indexes whose files do not exist yet are left out; update_table_indexes
+    builds them from the table data instead.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        changes: Pairs of (old_record, new_record); old_record is None
+            for inserts, new_record is None for deletes
+
+    Returns:
+        Mapping of indexed columns to their entries
+
+    Raises:
+        TypeError: If a value cannot be used as an index key
+    """
+    index_entries = {}
+
+    for column in get_table_indexes(metadata, table_name):
+        if not os.path.exists(get_index_path(table_name, column)):
+            continue
+
+        entries = []
+        for old_record, new_record in changes:
+            old_key = None
+            new_key = None
+            if old_record is not None and column in old_record:
+                old_key = encode_index_key(old_record[column])
+            if new_record is not None and column in new_record:
+                new_key = encode_index_key(new_record[column])
+            if old_key == new_key:
+                continue
+
+            record = new_record if new_record is not None else old_record
+            if old_key is not None:
+                entries.append({"op": "remove", "key": old_key,
+                                "ids": [record["ID"]]})
+            if new_key is not None:
+                entries.append({"op": "add", "key": new_key,
+                                "ids": [record["ID"]]})
+        index_entries[column] = entries
+
+    return index_entries
+
+def update_table_indexes(
+    metadata: Dict[str, Any],
+    table_name: str,
+    changes: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+    index_entries: Optional[Dict[str, List[Dict[str, Any]]]] = None
+) -> bool:
+    """
+    Append record changes to every index of the table.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        changes: Pairs of (old_record, new_record); old_record is None
+            for inserts, new_record is None for deletes
+        index_entries: Entries computed beforehand by compute_index_entries
+
+    Returns:
+        True if successful
+    """
+    if index_entries is None:
+        index_entries = compute_index_entries(metadata, table_name, changes)
+    table_data = None
+
+    for column in get_table_indexes(metadata, table_name):
+        filepath = get_index_path(table_name, column)
+        if column not in index_entries:
+            # Индекса еще нет - строим его по уже измененным данным
+            if table_data is None:
+                table_data = load_table_data(table_name)
+            build_index(table_name, column, table_data)
+            continue
+
+        entries = index_entries[column]
+        if entries:
+            cached = _index_cache.get(filepath)
+            is_fresh = (cached is not None
+                        and cached["stamp"] == get_file_stamp(filepath))
+
+            append_lines(
+                filepath,
+                [json.dumps(entry, ensure_ascii=False) for entry in entries],
+            )
+
+            # Применяем изменения к загруженному индексу вместо перечитывания
+            if is_fresh:
+                for entry in entries:
+                    _apply_index_entry(cached, entry)
+                cached["stamp"] = get_file_stamp(filepath)
+
+    return True
+
+def drop_table_indexes(metadata: Dict[str, Any], table_name: str) -> None:
+    """
+    Remove all index files of the table.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+    """
+    for column in get_table_indexes(metadata, table_name):
+        filepath = get_index_path(table_name, column)
+        _index_cache.pop(filepath, None)
+        if os.path.exists(filepath):
+            os.remove(filepath)
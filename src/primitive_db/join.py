@@ -0,0 +1,158 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.primitive_db.planner import where_columns
+
+
+def qualify_records(
+    table_name: str,
+    records: Iterable[Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily prefix record columns with table name ("users.ID").
+
+    Args:
+        table_name: Table name used as prefix
+        records: Records to qualify
+
+    Yields:
+        Records with qualified column names
+    """
+    prefix = f"{table_name}."
+    for record in records:
+        yield {prefix + column: value for column, value in record.items()}
+
+def hash_join(
+    build: Iterable[Dict[str, Any]],
+    probe: Iterable[Dict[str, Any]],
+    build_key: str,
+    probe_key: str,
+    build_first: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """
+    Join records by equal keys with an in-memory hash table.
+
+    The build side is loaded into a dictionary key -> records, the probe
+    side is streamed, so memory is bounded by the build side only.
+
+    Args:
+        build: Records of the smaller side
+        probe: Records of the larger side (may be a lazy iterator)
+        build_key: Join column of build records
+        probe_key: Join column of probe records
+        build_first: Whether build columns go first in joined records
+
+    Yields:
+        Joined records in probe order
+    """
+    table: Dict[Any, List[Dict[str, Any]]] = {}
+    for record in build:
+        table.setdefault(record[build_key], []).append(record)
+
+    for record in probe:
+        for match in table.get(record[probe_key], ()):
+            yield {**match, **record} if build_first else {**record, **match}
+
+def index_join(
+    outer: Iterable[Dict[str, Any]],
+    outer_key: str,
+    fetch_matches: Callable[[Any], Iterable[Dict[str, Any]]],
+    outer_first: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """
+    Join records by looking up every outer key in an index of the inner side.
+
+    Args:
+        outer: Records of the smaller side
+        outer_key: Join column of outer records
+        fetch_matches: Function returning inner records with given key
+        outer_first: Whether outer columns go first in joined records
+
+    Yields:
+        Joined records in outer order
+    """
+    for record in outer:
+        for match in fetch_matches(record[outer_key]):
+            yield {**record, **match} if outer_first else {**match, **record}
+
+def qualify_where(
+    tree: Dict[str, Any],
+    table_types: Dict[str, Dict[str, str]]
+) -> Dict[str, Any]:
+    """
+    Prefix unqualified column names of condition tree with their table.
+
+    Args:
+        tree: Condition tree on joined records
+        table_types: Mapping of joined table names to their column types
+
+    Returns:
+        Condition tree with qualified column names
+
+    Raises:
+        ValueError: If an unqualified column is in both tables or in none
+    """
+    if tree["op"] in ("and", "or", "not"):
+        return {"op": tree["op"],
+                "args": [qualify_where(arg, table_types) for arg in tree["args"]]}
+
+    column = tree["column"]
+    if column.split(".", 1)[0] in table_types:
+        return tree
+    tables = [table_name for table_name, types in table_types.items()
+              if column in types]
+    if not tables:
+        raise ValueError(f'Column "{column}" does not exist.')
+    if len(tables) > 1:
+        names = ", ".join(f"{table_name}.{column}" for table_name in tables)
+        raise ValueError(f'Column "{column}" is ambiguous: use {names}.')
+    return {**tree, "column": f"{tables[0]}.{column}"}
+
+def split_join_where(
+    tree: Dict[str, Any],
+    left_table: str,
+    right_table: str
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]],
+           Optional[Dict[str, Any]]]:
+    """
+    Split condition tree on joined records into per-table parts.
+
+    Top-level AND arguments that reference columns of one table only are
+    pushed down to that table (with unqualified column names); the rest
+    is checked on joined records.
+
+    Args:
+        tree: Condition tree with qualified column names
+        left_table: Left table name
+        right_table: Right table name
+
+    Returns:
+        Tuple of (left condition, right condition, remaining condition);
+        each is None when empty
+    """
+    args = tree["args"] if tree["op"] == "and" else [tree]
+    parts: Dict[str, List[Dict[str, Any]]] = {
+        left_table: [], right_table: [], "": []
+    }
+
+    for arg in args:
+        tables = {column.split(".", 1)[0] for column in where_columns(arg)}
+        if len(tables) == 1 and next(iter(tables)) in (left_table, right_table):
+            table_name = next(iter(tables))
+            parts[table_name].append(_unqualify(arg, table_name))
+        else:
+            parts[""].append(arg)
+
+    def combine(items: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not items:
+            return None
+        return items[0] if len(items) == 1 else {"op": "and", "args": items}
+
+    return combine(parts[left_table]), combine(parts[right_table]), combine(parts[""])
+
+def _unqualify(tree: Dict[str, Any], table_name: str) -> Dict[str, Any]:
+    """Strip table prefix from column names of condition tree."""
+    if tree["op"] in ("and", "or", "not"):
+        return {"op": tree["op"],
+                "args": [_unqualify(arg, table_name) for arg in tree["args"]]}
+    column = tree["column"][len(table_name) + 1:]
+    return {**tree, "column": column}
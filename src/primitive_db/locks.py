@@ -0,0 +1,121 @@
+import contextlib
+import os
+from typing import Any, Dict, Iterator
+
+from src.primitive_db.constants import DATA_DIR, LOCK_SUFFIX, META_FILE
+
+try:
+    import fcntl
+except ImportError:
+    # Без fcntl (Windows) блокировки между процессами не выполняются
+    fcntl = None
+
+# Блокировки, взятые текущим процессом: путь -> {"fd", "exclusive", "depth"}
+_held: Dict[str, Dict[str, Any]] = {}
+
+
+def get_table_lock_path(table_name: str) -> str:
+    """
+    Get path for lock file of a table.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        Path to table lock file
+    """
+    return f"{DATA_DIR}/{table_name}{LOCK_SUFFIX}"
+
+def get_metadata_lock_path(filepath: str = META_FILE) -> str:
+    """
+    Get path for lock file of the metadata file.
+
+    Args:
+        filepath: Path to metadata file
+
+    Returns:
+        Path to metadata lock file
+    """
+    return f"{filepath}{LOCK_SUFFIX}"
+
+@contextlib.contextmanager
+def file_lock(path: str, exclusive: bool = False) -> Iterator[None]:
+    """
+    Hold a reader/writer lock on a lock file across processes.
+
+    Locks are taken with fcntl.flock on a separate lock file, because
+    data files are replaced by rename. Shared locks are held together by
+    any number of readers, an exclusive lock waits for all of them.
+    Nested use in one process is re-entrant; asking for an exclusive
+    lock while holding a shared one upgrades it for the inner block.
+    The upgrade is not atomic, so callers re-check what they read.
+
+    Args:
+        path: Lock file path (created when missing)
+        exclusive: Take writer (exclusive) lock instead of reader lock
+
+    Yields:
+        None while the lock is held
+    """
+    held = _held.get(path)
+    if held is not None:
+        upgrade = exclusive and not held["exclusive"]
+        if upgrade:
+            fcntl.flock(held["fd"], fcntl.LOCK_EX)
+            held["exclusive"] = True
+        held["depth"] += 1
+        try:
+            yield
+        finally:
+            held["depth"] -= 1
+            if upgrade:
+                fcntl.flock(held["fd"], fcntl.LOCK_SH)
+                held["exclusive"] = False
+        return
+
+    if fcntl is None:
+        yield
+        return
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        _held[path] = {"fd": fd, "exclusive": exclusive, "depth": 1}
+        try:
+            yield
+        finally:
+            del _held[path]
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+def table_lock(table_name: str, exclusive: bool = False) -> Any:
+    """
+    Lock a table for reading (shared) or writing (exclusive).
+
+    Writers of different tables do not wait for each other.
+
+    Args:
+        table_name: Name of the table
+        exclusive: Take writer lock
+
+    Returns:
+        Context manager holding the lock
+    """
+    return file_lock(get_table_lock_path(table_name), exclusive)
+
+def metadata_lock(exclusive: bool = False, filepath: str = META_FILE) -> Any:
+    """
+    Lock the metadata file for reading (shared) or writing (exclusive).
+
+    Args:
+        exclusive: Take writer lock
+        filepath: Path to metadata file
+
+    Returns:
+        Context manager holding the lock
+    """
+    return file_lock(get_metadata_lock_path(filepath), exclusive)
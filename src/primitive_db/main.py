@@ -1,10 +1,82 @@
 #!/usr/bin/env python3
 
-from src.primitive_db.engine import run
+import argparse
+import sys
 
+from src.primitive_db.constants import SERVER_HOST, SERVER_SOCKET
+from src.primitive_db.core import recover_commits, recover_indexes
+from src.primitive_db.engine import run, run_batch
+from src.primitive_db.utils import load_metadata
 
-def main():
-    run()
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(
+        prog="database",
+        description="Примитивная база данных. Без аргументов запускается "
+                    "интерактивный режим, если stdin - терминал; иначе "
+                    "команды читаются из stdin.",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("-f", "--file", metavar="SCRIPT",
+                        help="выполнить команды из файла (- для stdin)")
+    source.add_argument("-c", "--command", metavar="COMMAND",
+                        help="выполнить одну команду")
+
+    modes = parser.add_subparsers(dest="mode", metavar="serve")
+    serve_parser = modes.add_parser(
+        "serve", help="запустить сервер, держащий таблицы в памяти",
+        description="Принимает команды по Unix-сокету или TCP на localhost.",
+    )
+    address = serve_parser.add_mutually_exclusive_group()
+    address.add_argument("--socket", metavar="PATH",
+                         help=f"путь Unix-сокета (по умолчанию {SERVER_SOCKET})")
+    address.add_argument("--port", type=int, help="слушать TCP вместо сокета")
+    serve_parser.add_argument("--host", default=SERVER_HOST,
+                              help=f"адрес TCP (по умолчанию {SERVER_HOST})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Дописываем транзакции, фиксация которых прервалась из-за сбоя,
+    # и перестраиваем индексы, отставшие от журналов таблиц
+    try:
+        recovered = recover_commits()
+        metadata = load_metadata()
+        rebuilt = recover_indexes(metadata) if isinstance(metadata, dict) else []
+    except (OSError, ValueError) as e:
+        sys.exit(f"Не удалось восстановить базу после сбоя: {e}")
+    if recovered:
+        print(f"Восстановлено прерванных транзакций: {recovered}", file=sys.stderr)
+    if rebuilt:
+        print(f"Перестроены индексы таблиц: {', '.join(rebuilt)}", file=sys.stderr)
+
+    if args.mode == "serve":
+        from src.primitive_db.server import serve
+        try:
+            serve(args.socket, args.host, args.port)
+        except (OSError, ValueError) as e:
+            sys.exit(f"Не удалось запустить сервер: {e}")
+        return
+
+    if args.command is not None:
+        ok = run_batch([args.command])
+    elif args.file is not None and args.file != "-":
+        try:
+            script = open(args.file, 'r', encoding='utf-8')
+        except OSError as e:
+            sys.exit(f"Не удалось открыть скрипт {args.file}: {e.strerror}")
+        with script:
+            ok = run_batch(script)
+    elif args.file == "-" or not sys.stdin.isatty():
+        ok = run_batch(sys.stdin)
+    else:
+        run()
+        return
+
+    sys.exit(0 if ok else 1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,205 @@
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.primitive_db.aggregate import (
+    final_aggregates,
+    merge_aggregates,
+    partial_aggregates,
+)
+from src.primitive_db.columnar import decode_columnar, decode_record
+from src.primitive_db.constants import (
+    PARALLEL_CHUNKS_PER_WORKER,
+    PARALLEL_SCAN_MIN_ROWS,
+    SCAN_WORKERS,
+)
+from src.primitive_db.utils import (
+    get_file_stamp,
+    get_table_columnar_path,
+    read_binary_file,
+)
+
+# Число процессов параллельного перебора (1 - перебор в текущем процессе)
+_scan_workers = SCAN_WORKERS
+_pool: Optional[ProcessPoolExecutor] = None
+
+# Снимки, открытые в процессе-исполнителе: путь -> (отпечаток файла, таблица)
+_worker_tables: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+
+
+def set_scan_workers(workers: Optional[int]) -> None:
+    """
+    Set number of processes used by full table scans.
+
+    Args:
+        workers: Number of processes, None for all CPU cores, 1 disables
+            parallel scans
+    """
+    global _scan_workers
+    _scan_workers = max(1, workers or os.cpu_count() or 1)
+    shutdown_pool()
+
+def shutdown_pool() -> None:
+    """Stop worker processes; the pool is recreated on the next scan."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+atexit.register(shutdown_pool)
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Get process pool, starting it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=_scan_workers)
+    return _pool
+
+def can_scan_parallel(table: Dict[str, Any]) -> bool:
+    """
+    Check that a full scan of the table should be split between processes.
+
+    Workers map the columnar snapshot file themselves, so only columnar
+    tables qualify; pending inserts/updates in the log overlay keep the
+    scan in the current process, and small tables are not worth the
+    inter-process overhead.
+
+    Args:
+        table: Loaded table structure
+
+    Returns:
+        True if parallel scan is enabled and applicable
+    """
+    return (_scan_workers > 1 and table["format"] == "columnar"
+            and not table["overlay"] and table["count"] >= PARALLEL_SCAN_MIN_ROWS)
+
+def _make_tasks(
+    table_name: str,
+    table: Dict[str, Any],
+    column_types: Dict[str, str],
+    tree: Optional[Dict[str, Any]],
+    compile_predicate: Callable,
+    columns: Optional[List[str]],
+    **extra: Any
+) -> List[Dict[str, Any]]:
+    """Split snapshot positions into consecutive chunks, one task each."""
+    path = get_table_columnar_path(table_name)
+    base = {
+        "path": path,
+        "stamp": get_file_stamp(path),
+        "column_types": column_types,
+        "tree": tree,
+        "compile": compile_predicate,
+        "columns": columns,
+        "deleted": table["deleted"],
+        **extra,
+    }
+    count = table["count"]
+    size = -(-count // (_scan_workers * PARALLEL_CHUNKS_PER_WORKER))
+    return [{**base, "start": start, "end": min(start + size, count)}
+            for start in range(0, count, size)]
+
+def _open_snapshot(path: str, stamp: Any) -> Dict[str, Any]:
+    """Map columnar snapshot in a worker, reusing it while the file is unchanged."""
+    cached = _worker_tables.get(path)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, decode_columnar(read_binary_file(path)))
+        _worker_tables[path] = cached
+    return cached[1]
+
+def _iter_chunk(task: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield matching records of one chunk inside a worker process."""
+    table = _open_snapshot(task["path"], task["stamp"])
+    predicate = task["compile"](task["column_types"], task["tree"])
+    ids = table["columns"]["ID"]
+    deleted = task["deleted"]
+
+    for position in range(task["start"], task["end"]):
+        if deleted and ids[position] in deleted:
+            continue
+        record = decode_record(table, position, task["columns"])
+        if predicate(record):
+            yield record
+
+def _select_chunk(task: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Filter one chunk in a worker process."""
+    return list(_iter_chunk(task))
+
+def _aggregate_chunk(task: Dict[str, Any]) -> Dict[Tuple[Any, ...], List[List[Any]]]:
+    """Aggregate one chunk in a worker process."""
+    return partial_aggregates(_iter_chunk(task), task["items"], task["group_by"])
+
+def parallel_select(
+    table_name: str,
+    table: Dict[str, Any],
+    column_types: Dict[str, str],
+    tree: Optional[Dict[str, Any]],
+    compile_predicate: Callable,
+    columns: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Filter columnar table in worker processes.
+
+    Chunks are filtered concurrently and yielded in table order; chunks
+    not started yet are cancelled when the caller stops early (LIMIT).
+
+    Args:
+        table_name: Table name
+        table: Columnar table structure accepted by can_scan_parallel
+        column_types: Mapping of column names to types
+        tree: Coerced condition tree or None
+        compile_predicate: Module-level function (column_types, tree) ->
+            predicate, called inside workers
+        columns: Columns to decode (all by default)
+
+    Yields:
+        Matching records in table order
+    """
+    pool = _get_pool()
+    tasks = _make_tasks(table_name, table, column_types, tree,
+                        compile_predicate, columns)
+    futures = [pool.submit(_select_chunk, task) for task in tasks]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+def parallel_aggregate(
+    table_name: str,
+    table: Dict[str, Any],
+    column_types: Dict[str, str],
+    tree: Optional[Dict[str, Any]],
+    compile_predicate: Callable,
+    items: List[Any],
+    group_by: Optional[List[str]],
+    columns: List[str]
+) -> List[Dict[str, Any]]:
+    """
+    Aggregate columnar table in worker processes.
+
+    Every worker returns aggregate states of its chunk; states are merged
+    in chunk order, so groups keep the order of first appearance.
+
+    Args:
+        table_name: Table name
+        table: Columnar table structure accepted by can_scan_parallel
+        column_types: Mapping of column names to types
+        tree: Coerced condition tree or None
+        compile_predicate: Module-level function (column_types, tree) ->
+            predicate, called inside workers
+        items: Select list with grouped columns and aggregates
+        group_by: Grouping columns or None
+        columns: Columns aggregation and condition need
+
+    Returns:
+        Result rows keyed by column names and aggregate labels
+    """
+    tasks = _make_tasks(table_name, table, column_types, tree, compile_predicate,
+                        columns, items=items, group_by=group_by)
+    groups: Dict[Tuple[Any, ...], List[List[Any]]] = {}
+    for partial in _get_pool().map(_aggregate_chunk, tasks):
+        merge_aggregates(groups, partial, items)
+    return final_aggregates(groups, items, group_by)
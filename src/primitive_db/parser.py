@@ -1,54 +1,225 @@
 # src/primitive_db/parser.py
 
-from typing import Any, Dict
+import re
+from typing import Any, Dict, List, Optional, Tuple
 
+from src.primitive_db.constants import AGGREGATE_FUNCTIONS, WHERE_OPERATORS
 
-def parse_where_condition(condition: str) -> Dict[str, Any]:
+
+def split_command(text: str) -> List[str]:
     """
-    Парсит условие WHERE в пару столбец-значение.
+    Разбивает строку команды на токены по пробелам вне кавычек.
+
+    В отличие от shlex, кавычки сохраняются внутри токенов, чтобы
+    строковые литералы в WHERE и VALUES отличались от ключевых слов и чисел.
 
     Args:
-        condition: Строка в формате "column = value" или "column > value" и т.д.
+        text: Строка команды
 
     Returns:
-        Словарь с именем столбца и разобранным значением
+        Список токенов
 
     Raises:
-        ValueError: Если формат условия неверный
+        ValueError: Если кавычки не закрыты
+    """
+    tokens = []
+    current = ""
+    quote_char = None
+
+    for char in text:
+        if quote_char is not None:
+            current += char
+            if char == quote_char:
+                quote_char = None
+        elif char in ['"', "'"]:
+            quote_char = char
+            current += char
+        elif char.isspace():
+            if current:
+                tokens.append(current)
+                current = ""
+        else:
+            current += char
+
+    if quote_char is not None:
+        raise ValueError("Незакрытые кавычки в команде")
+    if current:
+        tokens.append(current)
+    return tokens
+
+def strip_quotes(token: str) -> str:
+    """
+    Убирает внешние кавычки у токена (имени файла, таблицы и т.п.).
+
+    Args:
+        token: Токен команды
+
+    Returns:
+        Токен без внешних кавычек
     """
-    # Поддерживаемые операторы сравнения 
-    # (в порядке убывания длины для правильного парсинга)
-    operators = [">=", "<=", "!=", ">", "<", "="]
-    
-    # Находим оператор в условии
-    operator = None
-    for op in operators:
-        if op in condition:
-            operator = op
-            break
-    
-    if operator is None:
+    if len(token) >= 2 and token[0] == token[-1] and token[0] in ['"', "'"]:
+        return token[1:-1]
+    return token
+
+def tokenize_where(condition: str) -> List[str]:
+    """
+    Разбивает условие WHERE на токены.
+
+    Args:
+        condition: Строка условия
+
+    Returns:
+        Список токенов: скобки, запятые, операторы, литералы и слова
+
+    Raises:
+        ValueError: Если кавычки не закрыты
+    """
+    tokens = []
+    i = 0
+    while i < len(condition):
+        char = condition[i]
+        if char.isspace():
+            i += 1
+        elif char in "(),":
+            tokens.append(char)
+            i += 1
+        elif char in ['"', "'"]:
+            end = condition.find(char, i + 1)
+            if end == -1:
+                raise ValueError(f"Незакрытые кавычки в условии WHERE: {condition}")
+            tokens.append(condition[i:end + 1])
+            i = end + 1
+        elif condition[i:i + 2] in (">=", "<=", "!="):
+            tokens.append(condition[i:i + 2])
+            i += 2
+        elif char in "=<>":
+            tokens.append(char)
+            i += 1
+        else:
+            start = i
+            while (i < len(condition) and not condition[i].isspace()
+                   and condition[i] not in "(),=<>!\"'"):
+                i += 1
+            if i == start:
+                raise ValueError(f"Неожиданный символ в условии WHERE: {char}")
+            tokens.append(condition[start:i])
+    return tokens
+
+def _peek_keyword(tokens: List[str], pos: int) -> str:
+    """Возвращает токен в нижнем регистре или пустую строку в конце."""
+    return tokens[pos].lower() if pos < len(tokens) else ""
+
+def _parse_or(tokens: List[str], pos: int) -> Tuple[Dict[str, Any], int]:
+    """or_expr := and_expr (OR and_expr)*"""
+    node, pos = _parse_and(tokens, pos)
+    args = [node]
+    while _peek_keyword(tokens, pos) == "or":
+        node, pos = _parse_and(tokens, pos + 1)
+        args.append(node)
+    return (args[0] if len(args) == 1 else {"op": "or", "args": args}), pos
+
+def _parse_and(tokens: List[str], pos: int) -> Tuple[Dict[str, Any], int]:
+    """and_expr := not_expr (AND not_expr)*"""
+    node, pos = _parse_not(tokens, pos)
+    args = [node]
+    while _peek_keyword(tokens, pos) == "and":
+        node, pos = _parse_not(tokens, pos + 1)
+        args.append(node)
+    return (args[0] if len(args) == 1 else {"op": "and", "args": args}), pos
+
+def _parse_not(tokens: List[str], pos: int) -> Tuple[Dict[str, Any], int]:
+    """not_expr := NOT not_expr | primary"""
+    if _peek_keyword(tokens, pos) == "not":
+        node, pos = _parse_not(tokens, pos + 1)
+        return {"op": "not", "args": [node]}, pos
+    return _parse_primary(tokens, pos)
+
+def _parse_primary(tokens: List[str], pos: int) -> Tuple[Dict[str, Any], int]:
+    """primary := ( expr ) | column op value | column [NOT] IN ( values )"""
+    if pos >= len(tokens):
+        raise ValueError("Неожиданный конец условия WHERE")
+
+    if tokens[pos] == "(":
+        node, pos = _parse_or(tokens, pos + 1)
+        if pos >= len(tokens) or tokens[pos] != ")":
+            raise ValueError("Ожидалась закрывающая скобка в условии WHERE")
+        return node, pos + 1
+
+    column = tokens[pos]
+    if column in WHERE_OPERATORS or column in "(),":
+        raise ValueError(f"Ожидалось имя столбца, получено: {column}")
+    pos += 1
+
+    negate = False
+    if _peek_keyword(tokens, pos) == "not":
+        negate = True
+        pos += 1
+
+    if _peek_keyword(tokens, pos) == "in":
+        pos += 1
+        if pos >= len(tokens) or tokens[pos] != "(":
+            raise ValueError("После IN ожидается список значений в скобках")
+        values = []
+        pos += 1
+        while True:
+            if pos >= len(tokens) or tokens[pos] in "(),":
+                raise ValueError("Неверный список значений IN")
+            values.append(parse_value(tokens[pos]))
+            pos += 1
+            if pos < len(tokens) and tokens[pos] == ",":
+                pos += 1
+                continue
+            if pos < len(tokens) and tokens[pos] == ")":
+                pos += 1
+                break
+            raise ValueError("Ожидалась закрывающая скобка в списке IN")
+        node = {"op": "in", "column": column, "values": values}
+        return ({"op": "not", "args": [node]} if negate else node), pos
+
+    if negate:
+        raise ValueError("После NOT у столбца ожидается IN")
+
+    if pos >= len(tokens) or tokens[pos] not in WHERE_OPERATORS:
         error_msg = (
-            f"Неверный формат условия WHERE: {condition}. "
-            f"Поддерживаемые операторы: {', '.join(operators)}"
+            f"Ожидался оператор после {column}. "
+            f"Поддерживаемые операторы: {', '.join(WHERE_OPERATORS)}, IN"
         )
         raise ValueError(error_msg)
+    operator = tokens[pos]
+    pos += 1
+
+    if pos >= len(tokens) or tokens[pos] in "(),":
+        raise ValueError(f"Ожидалось значение после {column} {operator}")
+    value = parse_value(tokens[pos])
+    return {"op": "cmp", "column": column, "operator": operator,
+            "value": value}, pos + 1
+
+def parse_where_condition(condition: str) -> Dict[str, Any]:
+    """
+    Парсит условие WHERE в дерево выражения.
 
-    parts = condition.split(operator, 1)
-    if len(parts) != 2:
-        raise ValueError(f"Неверный формат условия WHERE: {condition}")
+    Грамматика: сравнения column op value (op: =, !=, >, <, >=, <=),
+    column [NOT] IN (v1, v2, ...), связки AND, OR, NOT и скобки.
+    Приоритет: NOT > AND > OR.
 
-    column = parts[0].strip()
-    value_str = parts[1].strip()
+    Args:
+        condition: Строка вида "age > 18 and (city = 'Moscow' or vip = true)"
 
-    # Парсим значение на основе кавычек и типа
-    value = parse_value(value_str)
+    Returns:
+        Узел дерева: {"op": "cmp", "column", "operator", "value"},
+        {"op": "in", "column", "values"} или {"op": "and"|"or"|"not", "args"}
 
-    # Для операторов сравнения возвращаем специальную структуру
-    if operator != "=":
-        return {column: {"operator": operator, "value": value}}
-    else:
-        return {column: value}
+    Raises:
+        ValueError: Если формат условия неверный
+    """
+    tokens = tokenize_where(condition)
+    if not tokens:
+        raise ValueError("Пустое условие WHERE")
+
+    node, pos = _parse_or(tokens, 0)
+    if pos != len(tokens):
+        raise ValueError(f"Лишние символы в условии WHERE: {' '.join(tokens[pos:])}")
+    return node
 
 def parse_set_clause(clause: str) -> Dict[str, Any]:
     """
@@ -160,4 +331,216 @@ def parse_insert_values(values_str: str) -> list:
         parts.append(current.strip())
 
     # Парсим каждое значение
-    return [parse_value(part) for part in parts]
\ No newline at end of file
+    return [parse_value(part) for part in parts]
+
+def parse_insert_rows(values_str: str) -> list:
+    """
+    Парсит VALUES clause с одной или несколькими группами значений.
+
+    Args:
+        values_str: Строка в формате "(value1, ...), (value1, ...), ..."
+
+    Returns:
+        Список строк, каждая из которых - список разобранных значений
+
+    Raises:
+        ValueError: Если формат неверный
+    """
+    groups = []
+    current = ""
+    depth = 0
+    in_quotes = False
+    quote_char = None
+
+    for char in values_str.strip():
+        if char in ['"', "'"] and not in_quotes:
+            in_quotes = True
+            quote_char = char
+        elif char == quote_char and in_quotes:
+            in_quotes = False
+        elif char == "(" and not in_quotes:
+            depth += 1
+        elif char == ")" and not in_quotes:
+            depth -= 1
+            if depth < 0:
+                raise ValueError("Лишняя закрывающая скобка в VALUES")
+        elif char == "," and not in_quotes and depth == 0:
+            # Запятая между группами значений
+            groups.append(current.strip())
+            current = ""
+            continue
+        current += char
+
+    if in_quotes or depth != 0:
+        raise ValueError("Незакрытые кавычки или скобки в VALUES")
+
+    groups.append(current.strip())
+    return [parse_insert_values(group) for group in groups]
+
+def parse_limit_clause(tokens: List[str]) -> Tuple[List[str], Optional[int], int]:
+    """
+    Отделяет завершающие "limit N" и "offset M" от токенов команды.
+
+    Args:
+        tokens: Токены команды (например, условие WHERE)
+
+    Returns:
+        Кортеж (оставшиеся токены, limit или None, offset)
+
+    Raises:
+        ValueError: Если значение limit/offset не является
+            неотрицательным целым числом
+    """
+    tokens = list(tokens)
+    limit = None
+    offset = 0
+    seen = set()
+
+    while len(tokens) >= 2 and tokens[-2].lower() in ("limit", "offset"):
+        keyword = tokens[-2].lower()
+        if keyword in seen:
+            raise ValueError(f"{keyword.upper()} указан несколько раз")
+        seen.add(keyword)
+
+        value = tokens[-1]
+        if not value.isdigit():
+            raise ValueError(
+                f"{keyword.upper()} должен быть неотрицательным целым числом: {value}"
+            )
+        if keyword == "limit":
+            limit = int(value)
+        else:
+            offset = int(value)
+        tokens = tokens[:-2]
+
+    return tokens, limit, offset
+
+def parse_column_list(columns_str: str) -> Optional[List[Any]]:
+    """
+    Парсит список столбцов SELECT.
+
+    Элементы списка - имена столбцов или агрегатные функции
+    count(*), count(col), sum(col), min(col), max(col), avg(col).
+
+    Args:
+        columns_str: Строка вида "name, age", "city, count(*)" или "*"
+
+    Returns:
+        Список без повторов: имена столбцов (str) и агрегаты
+        ({"func": ..., "column": ...}); None для "*" и пустой строки
+
+    Raises:
+        ValueError: Если в списке есть пустой элемент или неизвестная функция
+    """
+    columns_str = columns_str.strip()
+    if not columns_str or columns_str == "*":
+        return None
+
+    items: List[Any] = []
+    for part in columns_str.split(","):
+        part = part.strip()
+        if not part:
+            raise ValueError(f"Неверный список столбцов: {columns_str}")
+
+        match = re.fullmatch(r"(\w+)\s*\(\s*([^()\s]+)\s*\)", part)
+        if match is None:
+            item: Any = strip_quotes(part)
+        else:
+            func = match.group(1).lower()
+            column = match.group(2)
+            if func not in AGGREGATE_FUNCTIONS:
+                raise ValueError(f"Неизвестная агрегатная функция: {func}")
+            if column == "*" and func != "count":
+                raise ValueError(f"Функция {func} не принимает *")
+            item = {"func": func, "column": column}
+
+        if item not in items:
+            items.append(item)
+    return items
+
+def parse_group_by(tokens: List[str]) -> Tuple[List[str], Optional[List[str]]]:
+    """
+    Отделяет завершающее "group by col1, col2" от токенов команды.
+
+    Args:
+        tokens: Токены команды после имени таблицы (без limit/offset)
+
+    Returns:
+        Кортеж (оставшиеся токены, список столбцов группировки или None)
+
+    Raises:
+        ValueError: Если после GROUP BY нет столбцов
+    """
+    lowered = [token.lower() for token in tokens]
+    for i in range(len(tokens) - 1):
+        if lowered[i] == "group" and lowered[i + 1] == "by":
+            columns = [part.strip() for part in " ".join(tokens[i + 2:]).split(",")]
+            if not all(columns):
+                raise ValueError("После GROUP BY ожидается список столбцов")
+            return tokens[:i], list(dict.fromkeys(columns))
+    return tokens, None
+
+def parse_order_by(tokens: List[str]) -> Tuple[List[str], Optional[Tuple[str, bool]]]:
+    """
+    Отделяет завершающее "order by col [asc|desc]" от токенов команды.
+
+    Args:
+        tokens: Токены команды после имени таблицы (без limit/offset)
+
+    Returns:
+        Кортеж (оставшиеся токены, (столбец, по убыванию) или None)
+
+    Raises:
+        ValueError: Если формат ORDER BY неверный
+    """
+    lowered = [token.lower() for token in tokens]
+    for i in range(len(tokens) - 1):
+        if lowered[i] == "order" and lowered[i + 1] == "by":
+            rest = tokens[i + 2:]
+            if len(rest) == 1:
+                return tokens[:i], (rest[0], False)
+            if len(rest) == 2 and rest[1].lower() in ("asc", "desc"):
+                return tokens[:i], (rest[0], rest[1].lower() == "desc")
+            raise ValueError("Используйте: order by <столбец> [asc|desc]")
+    return tokens, None
+
+def parse_join_clause(tokens: List[str]) -> Tuple[List[str], Optional[Dict[str, str]]]:
+    """
+    Отделяет начальное "join <таблица> on a.x = b.y" от токенов команды.
+
+    Args:
+        tokens: Токены команды после имени первой таблицы
+
+    Returns:
+        Кортеж (оставшиеся токены, описание соединения или None).
+        Описание: {"table", "left_table", "left_column",
+        "right_table", "right_column"}
+
+    Raises:
+        ValueError: Если формат JOIN неверный
+    """
+    if not tokens or tokens[0].lower() != "join":
+        return tokens, None
+
+    if len(tokens) < 4 or tokens[2].lower() != "on":
+        raise ValueError("Используйте: join <таблица> on <t1>.<col> = <t2>.<col>")
+
+    end = 3
+    while end < len(tokens) and tokens[end].lower() not in (
+            "where", "group", "order", "limit", "offset"):
+        end += 1
+
+    condition = " ".join(tokens[3:end])
+    match = re.fullmatch(r"\s*(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)\s*", condition)
+    if match is None:
+        raise ValueError(f"Неверное условие соединения: {condition}")
+
+    join = {
+        "table": tokens[1],
+        "left_table": match.group(1),
+        "left_column": match.group(2),
+        "right_table": match.group(3),
+        "right_column": match.group(4),
+    }
+    return tokens[end:], join
+
@@ -0,0 +1,286 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Set
+
+from src.primitive_db.constants import (
+    PLANNER_INDEX_FETCH_COST,
+    PLANNER_SELECTIVITY,
+    RANGE_OPERATORS,
+)
+from src.primitive_db.index import (
+    encode_index_key,
+    get_query_indexes,
+    load_index,
+    lookup_index,
+    range_lookup_index,
+)
+from src.primitive_db.segments import count_zone_rows
+from src.primitive_db.utils import count_table_records, read_table
+
+
+def _is_id_value(value: Any) -> bool:
+    """Check that value can be fetched from storage directly by ID."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _range_bounds(values: List[Any], operator: str, value: Any) -> range:
+    """Get slice of sorted index keys matching a range condition."""
+    start, end = 0, len(values)
+    if operator == ">":
+        start = bisect_right(values, value)
+    elif operator == ">=":
+        start = bisect_left(values, value)
+    elif operator == "<":
+        end = bisect_left(values, value)
+    else:
+        end = bisect_right(values, value)
+    return range(start, max(start, end))
+
+def where_columns(tree: Dict[str, Any]) -> Set[str]:
+    """
+    Collect column names referenced by condition tree.
+
+    Args:
+        tree: Condition tree
+
+    Returns:
+        Set of column names
+    """
+    if tree["op"] in ("and", "or", "not"):
+        columns: Set[str] = set()
+        for arg in tree["args"]:
+            columns |= where_columns(arg)
+        return columns
+    return {tree["column"]}
+
+def estimate_index_rows(
+    context: Dict[str, Any],
+    node: Dict[str, Any]
+) -> Optional[float]:
+    """
+    Estimate number of candidate IDs an index lookup would return.
+
+    Equality lookups are counted exactly from the index, ranges are
+    estimated from the share of distinct keys inside the bounds.
+
+    Args:
+        context: Planner context from plan_query
+        node: Condition tree node
+
+    Returns:
+        Estimated number of candidates or None if the node cannot be
+        answered by indexes
+    """
+    op = node["op"]
+    table_name = context["table"]
+
+    if op in ("cmp", "in"):
+        column = node["column"]
+        values = node["values"] if op == "in" else [node["value"]]
+        operator = "=" if op == "in" else node["operator"]
+
+        # Записи по ID достаются из хранилища напрямую, файл индекса не нужен
+        # (так ищутся и записи в копиях таблиц открытой транзакции)
+        if column == "ID" and operator == "=" and all(map(_is_id_value, values)):
+            return float(len(values))
+        if column not in context["indexes"]:
+            return None
+
+        if operator == "=":
+            keys = load_index(table_name, column)["keys"]
+            return float(sum(len(keys.get(encode_index_key(value), ()))
+                             for value in values))
+
+        if operator in RANGE_OPERATORS:
+            index = load_index(table_name, column)
+            if not index["sorted"]:
+                return 0.0
+            try:
+                bounds = _range_bounds(index["sorted"], operator, node["value"])
+            except TypeError:
+                # Значение несравнимо с ключами индекса
+                return None
+            return context["rows"] * len(bounds) / len(index["sorted"])
+        return None
+
+    if op == "and":
+        estimates = [estimate_index_rows(context, arg) for arg in node["args"]]
+        estimates = [value for value in estimates if value is not None]
+        return min(estimates) if estimates else None
+
+    if op == "or":
+        total = 0.0
+        for arg in node["args"]:
+            estimate = estimate_index_rows(context, arg)
+            if estimate is None:
+                return None
+            total += estimate
+        return total
+
+    return None
+
+def estimate_selectivity(context: Dict[str, Any], node: Dict[str, Any]) -> float:
+    """
+    Estimate share of records matching condition tree node.
+
+    Args:
+        context: Planner context from plan_query
+        node: Condition tree node
+
+    Returns:
+        Selectivity between 0 and 1
+    """
+    op = node["op"]
+    if op == "and":
+        result = 1.0
+        for arg in node["args"]:
+            result *= estimate_selectivity(context, arg)
+        return result
+    if op == "or":
+        result = 0.0
+        for arg in node["args"]:
+            selectivity = estimate_selectivity(context, arg)
+            result = result + selectivity - result * selectivity
+        return result
+    if op == "not":
+        return 1.0 - estimate_selectivity(context, node["args"][0])
+
+    if node["column"] not in context["column_types"]:
+        return 0.0
+
+    estimate = estimate_index_rows(context, node)
+    if estimate is not None and context["rows"]:
+        return min(1.0, estimate / context["rows"])
+
+    if op == "in":
+        return min(1.0, PLANNER_SELECTIVITY["="] * len(node["values"]))
+    operator = node["operator"]
+    if operator in RANGE_OPERATORS:
+        return PLANNER_SELECTIVITY["range"]
+    return PLANNER_SELECTIVITY[operator]
+
+def reorder_conditions(
+    context: Dict[str, Any],
+    node: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Reorder AND/OR arguments so evaluation short-circuits early.
+
+    AND checks the most selective conditions first (they fail most often),
+    OR checks the least selective first (they succeed most often).
+
+    Args:
+        context: Planner context from plan_query
+        node: Condition tree node
+
+    Returns:
+        New tree with reordered arguments
+    """
+    op = node["op"]
+    if op not in ("and", "or", "not"):
+        return node
+
+    args = [reorder_conditions(context, arg) for arg in node["args"]]
+    if op != "not":
+        args.sort(key=lambda arg: estimate_selectivity(context, arg),
+                  reverse=(op == "or"))
+    return {"op": op, "args": args}
+
+def collect_index_ids(context: Dict[str, Any], node: Dict[str, Any]) -> Set[Any]:
+    """
+    Look up candidate IDs for node answerable by indexes.
+
+    For AND only the most selective indexed argument is used: the
+    compiled predicate checks the rest on fetched records anyway.
+
+    Args:
+        context: Planner context from plan_query
+        node: Condition tree node with a non-None index estimate
+
+    Returns:
+        Set of candidate record IDs
+    """
+    op = node["op"]
+    table_name = context["table"]
+
+    if op == "and":
+        indexed = [(estimate_index_rows(context, arg), arg) for arg in node["args"]]
+        best = min((item for item in indexed if item[0] is not None),
+                   key=lambda item: item[0])
+        return collect_index_ids(context, best[1])
+
+    if op == "or":
+        ids: Set[Any] = set()
+        for arg in node["args"]:
+            ids |= collect_index_ids(context, arg)
+        return ids
+
+    column = node["column"]
+    values = node["values"] if op == "in" else [node["value"]]
+    operator = "=" if op == "in" else node["operator"]
+
+    if operator in RANGE_OPERATORS:
+        return set(range_lookup_index(table_name, column, operator, node["value"]))
+
+    if column == "ID" and all(map(_is_id_value, values)):
+        # Записи по ID достаются из хранилища напрямую, без файла индекса
+        return set(values)
+
+    ids = set()
+    for value in values:
+        ids |= lookup_index(table_name, column, value)
+    return ids
+
+def plan_query(
+    metadata: Dict[str, Any],
+    table_name: str,
+    column_types: Dict[str, str],
+    tree: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Choose access path for a filtered query.
+
+    Index access is chosen when fetching its candidates one by one is
+    estimated to be cheaper than scanning the table. Segments whose zone
+    maps rule the condition out are not scanned, so only the rest of the
+    records count towards the scan cost.
+
+    Args:
+        metadata: Database metadata
+        table_name: Table name
+        column_types: Mapping of column names to types
+        tree: Condition tree with coerced values
+
+    Returns:
+        Plan with "access" ("index" or "scan"), "candidate_ids" (None for
+        scan), "estimated_rows" and reordered "tree"
+    """
+    context = {
+        "table": table_name,
+        "indexes": get_query_indexes(metadata, table_name),
+        "column_types": column_types,
+        "rows": count_table_records(table_name),
+    }
+
+    ordered = reorder_conditions(context, tree)
+    estimated_rows = context["rows"] * estimate_selectivity(context, ordered)
+
+    scan_rows = context["rows"]
+    table = read_table(table_name)
+    if table.get("segments") is not None:
+        scan_rows = count_zone_rows(table, tree)
+
+    index_rows = estimate_index_rows(context, ordered)
+    if (index_rows is not None
+            and index_rows * PLANNER_INDEX_FETCH_COST < max(scan_rows, 1)):
+        return {
+            "access": "index",
+            "candidate_ids": collect_index_ids(context, ordered),
+            "estimated_rows": estimated_rows,
+            "tree": ordered,
+        }
+
+    return {
+        "access": "scan",
+        "candidate_ids": None,
+        "estimated_rows": estimated_rows,
+        "tree": ordered,
+    }
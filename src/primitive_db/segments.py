@@ -0,0 +1,257 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Чтение записей сегмента, еще не загруженного с диска (см. utils.load_segment)
+SegmentLoader = Callable[[Dict[str, Any]], None]
+
+
+def new_segment(records: List[Dict[str, Any]], number: Optional[int] = None
+                ) -> Dict[str, Any]:
+    """
+    Build directory entry of a segment.
+
+    Args:
+        records: Records of the segment in table order
+        number: Segment file number, None while the segment is not written
+
+    Returns:
+        Segment with "number", "min_id", "max_id", "count", "bytes",
+        "zones" (column -> [min, max], None when unbounded), "ids"
+        (ordered dict of record IDs, None until the segment is loaded)
+        and "dirty" flag
+    """
+    segment = {
+        "number": number,
+        "min_id": None,
+        "max_id": None,
+        "count": 0,
+        "bytes": 0,
+        "zones": {},
+        "ids": {},
+        "dirty": number is None,
+    }
+    for record in records:
+        add_to_segment(segment, record)
+    return segment
+
+def add_to_segment(segment: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """
+    Add or replace record in segment, widening its ID range and zone map.
+
+    Zone maps are only widened, never narrowed, so they stay a valid
+    superset of segment values until the segment is rewritten. A column
+    with values that cannot be compared gets an unbounded zone (None).
+
+    Args:
+        segment: Segment entry, modified in place
+        record: Record to add
+    """
+    record_id = record["ID"]
+    if record_id not in segment["ids"]:
+        segment["ids"][record_id] = None
+        segment["count"] += 1
+    if segment["min_id"] is None or record_id < segment["min_id"]:
+        segment["min_id"] = record_id
+    if segment["max_id"] is None or record_id > segment["max_id"]:
+        segment["max_id"] = record_id
+
+    zones = segment["zones"]
+    for column, value in record.items():
+        if value is None:
+            continue
+        if column not in zones:
+            zones[column] = [value, value]
+            continue
+        zone = zones[column]
+        if zone is None:
+            continue
+        try:
+            if value < zone[0]:
+                zone[0] = value
+            elif value > zone[1]:
+                zone[1] = value
+        except TypeError:
+            # Значения разных типов - зона столбца больше не ограничивает
+            # поиск; удалять ее нельзя, иначе следующее значение создаст
+            # новую узкую зону без прежних значений
+            zones[column] = None
+
+def segment_entry(segment: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get part of segment entry stored in the segment directory file.
+
+    Args:
+        segment: Segment entry
+
+    Returns:
+        Entry without in-memory fields
+    """
+    return {key: segment[key] for key in
+            ("number", "min_id", "max_id", "count", "bytes", "zones")}
+
+def find_segment(
+    segments: List[Dict[str, Any]],
+    record_id: Any,
+    load: SegmentLoader
+) -> Optional[int]:
+    """
+    Find segment holding record ID.
+
+    Only segments whose ID range covers the ID are loaded and checked;
+    ranges are never narrowed, so they always cover all segment IDs.
+
+    Args:
+        segments: Segment entries in table order
+        record_id: Record ID
+        load: Function loading records of a segment
+
+    Returns:
+        Segment position or None if no segment holds the ID
+    """
+    for position, segment in enumerate(segments):
+        if (segment["min_id"] is None
+                or not segment["min_id"] <= record_id <= segment["max_id"]):
+            continue
+        load(segment)
+        if record_id in segment["ids"]:
+            return position
+    return None
+
+def apply_segment_entries(
+    table: Dict[str, Any],
+    entries: List[Dict[str, Any]],
+    segment_rows: int,
+    load: SegmentLoader
+) -> None:
+    """
+    Apply table log entries to a segmented row table.
+
+    Changed segments are marked dirty for the next compaction; new
+    records go to the last segment (or a new one when it is full), the
+    same place they take in table order.
+
+    Args:
+        table: Row table with "segments", modified in place
+        entries: Log entries to apply
+        segment_rows: Maximum number of records per segment
+        load: Function loading records of a segment
+    """
+    rows = table["rows"]
+    segments = table["segments"]
+    for entry in entries:
+        op = entry.get("op")
+        if op == "delete":
+            position = find_segment(segments, entry["id"], load)
+            if position is not None:
+                segment = segments[position]
+                del rows[entry["id"]]
+                del segment["ids"][entry["id"]]
+                segment["count"] -= 1
+                segment["dirty"] = True
+            continue
+
+        if op not in ("insert", "update"):
+            continue
+        record = entry["row"]
+        position = find_segment(segments, record["ID"], load)
+        if position is not None:
+            segment = segments[position]
+        elif op == "insert":
+            if not segments or segments[-1]["count"] >= segment_rows:
+                segments.append(new_segment([]))
+            segment = segments[-1]
+            load(segment)
+        else:
+            continue
+        rows[record["ID"]] = record
+        add_to_segment(segment, record)
+        segment["dirty"] = True
+
+def zone_may_match(zones: Dict[str, Optional[List[Any]]],
+                   tree: Dict[str, Any]) -> bool:
+    """
+    Check whether a segment with given zone map can hold matching records.
+
+    The check is conservative: True is returned whenever the zone map
+    cannot rule the condition out.
+
+    Args:
+        zones: Mapping of column to [min, max] of segment values
+            (None for an unbounded zone)
+        tree: Coerced condition tree
+
+    Returns:
+        False if no record of the segment matches the condition
+    """
+    op = tree["op"]
+    if op == "and":
+        return all(zone_may_match(zones, arg) for arg in tree["args"])
+    if op == "or":
+        return any(zone_may_match(zones, arg) for arg in tree["args"])
+    if op == "not":
+        return True
+
+    zone = zones.get(tree["column"])
+    if zone is None:
+        return True
+    low, high = zone
+    try:
+        if op == "in":
+            return any(low <= value <= high for value in tree["values"])
+        value = tree["value"]
+        operator = tree["operator"]
+        if operator == "=":
+            return low <= value <= high
+        if operator == "!=":
+            return not low == high == value
+        if operator == ">":
+            return high > value
+        if operator == ">=":
+            return high >= value
+        if operator == "<":
+            return low < value
+        return low <= value
+    except TypeError:
+        return True
+
+def count_zone_rows(table: Dict[str, Any], tree: Dict[str, Any]) -> int:
+    """
+    Count records in segments whose zone maps allow a match.
+
+    This is the number of records a filtered scan actually checks.
+
+    Args:
+        table: Row table with "segments"
+        tree: Coerced condition tree
+
+    Returns:
+        Number of candidate records
+    """
+    return sum(segment["count"] for segment in table["segments"]
+               if zone_may_match(segment["zones"], tree))
+
+def iter_segment_records(
+    table: Dict[str, Any],
+    tree: Optional[Dict[str, Any]],
+    load: SegmentLoader
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield records of segments whose zone maps allow a match.
+
+    Segments ruled out by their zone maps are not read from disk.
+    Records are yielded in table order; the condition itself still has
+    to be checked on them.
+
+    Args:
+        table: Row table with "segments"
+        tree: Coerced condition tree, None for all records
+        load: Function loading records of a segment
+
+    Yields:
+        Candidate records
+    """
+    rows = table["rows"]
+    for segment in table["segments"]:
+        if tree is None or zone_may_match(segment["zones"], tree):
+            load(segment)
+            for record_id in segment["ids"]:
+                yield rows[record_id]
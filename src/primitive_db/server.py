@@ -0,0 +1,180 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from src.primitive_db.constants import SERVER_HOST, SERVER_MAX_LINE_BYTES, SERVER_SOCKET
+from src.primitive_db.core import get_transaction, set_transaction
+from src.primitive_db.decorators import set_batch_mode
+from src.primitive_db.engine import execute_command
+from src.primitive_db.stats import flush_table_stats, set_stats_deferred
+
+# Команды выполняются по одной в отдельном потоке: движок не рассчитан на
+# параллельное выполнение, а цикл событий тем временем принимает запросы
+_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def run_command(
+    command: str,
+    transaction: Optional[Dict[str, Any]] = None
+) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Выполняет команду и перехватывает ее вывод.
+
+    Транзакция у каждого соединения своя: ее состояние делается текущим
+    только на время команды.
+
+    Args:
+        command: Строка команды в грамматике engine.run
+        transaction: Открытая транзакция соединения или None
+
+    Returns:
+        Признак успеха (нет необработанной ошибки), текст вывода и
+        транзакция соединения после команды
+    """
+    output = io.StringIO()
+    ok = True
+    set_transaction(transaction)
+    with contextlib.redirect_stdout(output):
+        try:
+            execute_command(command)
+        except Exception as e:
+            print(f"Ошибка: {e}")
+            ok = False
+        finally:
+            transaction = get_transaction()
+            set_transaction(None)
+    return ok, output.getvalue(), transaction
+
+
+async def handle_client(reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter) -> None:
+    """
+    Обслуживает одно соединение клиента.
+
+    Запрос - строка команды, ответ на каждый запрос - одна строка JSON
+    {"ok": ..., "output": ..., "transaction": ...}, где transaction -
+    осталась ли открытой транзакция соединения; ответы идут в порядке
+    запросов, поэтому клиент может отправлять команды, не дожидаясь
+    ответов. exit закрывает соединение после ответа; незафиксированная
+    транзакция при этом отбрасывается.
+    """
+    loop = asyncio.get_running_loop()
+    transaction = None
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode("utf-8").strip()
+            if command.endswith(";"):
+                command = command[:-1].rstrip()
+            closing = bool(command.split()) and command.split()[0].lower() == "exit"
+            if closing:
+                command = "rollback" if transaction is not None else ""
+
+            if command:
+                ok, output, transaction = await loop.run_in_executor(
+                    _executor, run_command, command, transaction)
+            else:
+                ok, output = True, ""
+            response = json.dumps({"ok": ok, "output": output,
+                                   "transaction": transaction is not None},
+                                  ensure_ascii=False)
+            writer.write(response.encode("utf-8") + b"\n")
+            await writer.drain()
+            if closing:
+                break
+    except (ConnectionError, ValueError, UnicodeDecodeError):
+        # Разрыв соединения или слишком длинная строка - закрываем соединение
+        pass
+    finally:
+        writer.close()
+        # Отложенная статистика записывается, когда клиент отключился
+        await loop.run_in_executor(_executor, flush_table_stats)
+
+
+def remove_stale_socket(path: str) -> None:
+    """
+    Удаляет файл сокета, оставшийся от остановленного сервера.
+
+    Raises:
+        ValueError: Если файл не сокет или сервер на нем еще работает
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"{path} существует и не является сокетом")
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.remove(path)
+        return
+    finally:
+        probe.close()
+    raise ValueError(f"Сервер уже запущен на {path}")
+
+
+async def start_server(socket_path: Optional[str] = None,
+                       host: str = SERVER_HOST,
+                       port: Optional[int] = None) -> None:
+    """Слушает сокет до SIGTERM (или Ctrl+C)."""
+    if port is None:
+        address = socket_path or SERVER_SOCKET
+        remove_stale_socket(address)
+        server = await asyncio.start_unix_server(
+            handle_client, path=address, limit=SERVER_MAX_LINE_BYTES)
+    else:
+        address = f"{host}:{port}"
+        server = await asyncio.start_server(
+            handle_client, host, port, limit=SERVER_MAX_LINE_BYTES)
+
+    loop = asyncio.get_running_loop()
+    stop = loop.create_future()
+    with contextlib.suppress(NotImplementedError):
+        loop.add_signal_handler(signal.SIGTERM, stop.set_result, None)
+
+    print(f"Сервер слушает {address}. Остановка: Ctrl+C", file=sys.stderr)
+    try:
+        async with server:
+            await stop
+    finally:
+        if port is None and os.path.exists(address):
+            os.remove(address)
+
+
+def serve(socket_path: Optional[str] = None,
+          host: str = SERVER_HOST,
+          port: Optional[int] = None) -> None:
+    """
+    Запускает сервер базы данных (database serve).
+
+    Таблицы, индексы и кэши остаются в памяти между запросами всех
+    клиентов. Команды выполняются как в пакетном режиме: без
+    подтверждений и замеров времени.
+
+    Args:
+        socket_path: Путь Unix-сокета (по умолчанию SERVER_SOCKET)
+        host: Адрес TCP, если задан порт
+        port: Порт TCP вместо Unix-сокета
+    """
+    set_batch_mode(True)
+    set_stats_deferred(True)
+    try:
+        asyncio.run(start_server(socket_path, host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        set_stats_deferred(False)
+        set_batch_mode(False)
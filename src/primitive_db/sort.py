@@ -0,0 +1,104 @@
+import heapq
+import json
+import tempfile
+from itertools import islice
+from operator import itemgetter
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional
+
+from src.primitive_db.constants import DATA_DIR, SORT_BUFFER_ROWS
+from src.primitive_db.utils import ensure_data_dir
+
+# Сколько записей сортируется в памяти до сброса серии на диск
+_sort_buffer_rows = SORT_BUFFER_ROWS
+
+
+def set_sort_buffer_limit(max_rows: int) -> None:
+    """
+    Set memory limit of sorting.
+
+    Args:
+        max_rows: Maximum number of records sorted in memory at once
+    """
+    global _sort_buffer_rows
+    _sort_buffer_rows = max(1, max_rows)
+
+def _spill_run(run: List[Dict[str, Any]]) -> IO[str]:
+    """Write sorted run to a temporary file and rewind it."""
+    ensure_data_dir()
+    file = tempfile.TemporaryFile(mode='w+', encoding='utf-8', dir=DATA_DIR,
+                                  prefix="sort-")
+    for record in run:
+        file.write(json.dumps(record, ensure_ascii=False) + "\n")
+    file.seek(0)
+    return file
+
+def _read_run(file: IO[str]) -> Iterator[Dict[str, Any]]:
+    """Lazily read records of a spilled run, closing the file at the end."""
+    with file:
+        for line in file:
+            yield json.loads(line)
+
+def external_sort(
+    records: Iterable[Dict[str, Any]],
+    column: str,
+    descending: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """
+    Sort records with bounded memory.
+
+    Records are sorted in runs of at most the buffer limit; when the input
+    does not fit into one run, runs are spilled to temporary files in the
+    data directory and merged lazily with a k-way heap merge.
+
+    Args:
+        records: Records to sort (may be a lazy iterator)
+        column: Column to sort by
+        descending: Sort in descending order
+
+    Returns:
+        Iterator over sorted records
+    """
+    key = itemgetter(column)
+    records = iter(records)
+    runs: List[IO[str]] = []
+
+    while True:
+        run = list(islice(records, _sort_buffer_rows))
+        run.sort(key=key, reverse=descending)
+        if not runs and len(run) < _sort_buffer_rows:
+            # Все записи поместились в память - обходимся без диска
+            return iter(run)
+        if run:
+            runs.append(_spill_run(run))
+        if len(run) < _sort_buffer_rows:
+            break
+
+    return heapq.merge(*(_read_run(file) for file in runs), key=key,
+                       reverse=descending)
+
+def sort_records(
+    records: Iterable[Dict[str, Any]],
+    column: str,
+    descending: bool = False,
+    keep: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Sort records by column choosing the cheapest strategy.
+
+    When only the first keep records are needed and they fit into the
+    buffer limit, they are selected with a heap of size keep in one pass;
+    otherwise external_sort is used.
+
+    Args:
+        records: Records to sort (may be a lazy iterator)
+        column: Column to sort by
+        descending: Sort in descending order
+        keep: Number of leading records needed (offset + limit), None for all
+
+    Returns:
+        Iterator over sorted records
+    """
+    if keep is not None and keep <= _sort_buffer_rows:
+        select_top = heapq.nlargest if descending else heapq.nsmallest
+        return iter(select_top(keep, records, key=itemgetter(column)))
+    return external_sort(records, column, descending)
@@ -0,0 +1,232 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.primitive_db.constants import DATA_DIR, STATS_SUFFIX
+from src.primitive_db.utils import (
+    ensure_data_dir,
+    get_table_stamp,
+    has_table_view,
+    iter_table_records,
+)
+
+# Загруженная статистика таблиц: имя таблицы -> статистика
+_stats_cache: Dict[str, Dict[str, Any]] = {}
+
+# Отложенная запись: таблицы, статистика которых еще не записана в файл
+_deferred = False
+_unsaved: Set[str] = set()
+
+
+def get_stats_path(table_name: str) -> str:
+    """
+    Get path for table statistics file.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        Path to statistics file
+    """
+    return f"{DATA_DIR}/{table_name}{STATS_SUFFIX}"
+
+def _current_stamp(table_name: str) -> Any:
+    """Get table stamp in the form it has after a JSON round trip."""
+    return json.loads(json.dumps(get_table_stamp(table_name)))
+
+def compute_table_stats(table_name: str) -> Dict[str, Any]:
+    """
+    Compute record count and per-column min/max with one table scan.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        Statistics with "count", "min" and "max" (column -> value)
+    """
+    count = 0
+    minimums: Dict[str, Any] = {}
+    maximums: Dict[str, Any] = {}
+
+    for record in iter_table_records(table_name):
+        count += 1
+        for column, value in record.items():
+            if column not in minimums or value < minimums[column]:
+                minimums[column] = value
+            if column not in maximums or value > maximums[column]:
+                maximums[column] = value
+
+    return {"count": count, "min": minimums, "max": maximums, "complete": True}
+
+def save_table_stats(table_name: str, stats: Dict[str, Any]) -> None:
+    """
+    Save statistics stamped with the current state of table files.
+
+    Statistics are derived data: the file is replaced without fsync and
+    rebuilt from the table whenever its stamp does not match.
+
+    Args:
+        table_name: Name of the table
+        stats: Statistics to save
+    """
+    stats = dict(stats, stamp=_current_stamp(table_name))
+    _stats_cache[table_name] = stats
+    if _deferred:
+        _unsaved.add(table_name)
+        return
+    _write_stats(table_name, stats)
+
+def _write_stats(table_name: str, stats: Dict[str, Any]) -> None:
+    """Replace statistics file of the table."""
+    ensure_data_dir()
+    filepath = get_stats_path(table_name)
+    temp_path = filepath + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(stats, file, ensure_ascii=False)
+    os.replace(temp_path, filepath)
+
+def set_stats_deferred(deferred: bool) -> None:
+    """
+    Keep saved statistics in memory only until flush_table_stats.
+
+    Used by batch execution: a script of many writes replaces every
+    statistics file once instead of once per statement. Losing deferred
+    statistics is harmless, stale files are recomputed by stamp.
+
+    Args:
+        deferred: Whether to defer writing statistics files
+    """
+    global _deferred
+    _deferred = deferred
+    if not deferred:
+        flush_table_stats()
+
+def flush_table_stats() -> None:
+    """Write statistics files deferred by set_stats_deferred."""
+    for table_name in sorted(_unsaved):
+        stats = _stats_cache.get(table_name)
+        if stats is not None:
+            _write_stats(table_name, stats)
+    _unsaved.clear()
+
+def is_table_stats_current(table_name: str) -> bool:
+    """
+    Check that saved statistics match the current table files.
+
+    write_changes saves statistics after the table log and indexes, so
+    a mismatch means the last write may have stopped half-way.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        True if the statistics file carries the current table stamp
+    """
+    try:
+        with open(get_stats_path(table_name), 'r', encoding='utf-8') as file:
+            stats = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        return False
+    return stats.get("stamp") == _current_stamp(table_name)
+
+def get_table_stats(table_name: str, bounds: bool = True) -> Dict[str, Any]:
+    """
+    Get up-to-date statistics of the table.
+
+    Saved statistics are used while table files are unchanged since they
+    were written; otherwise they are recomputed with one scan. When a
+    delete or update could have removed an extreme value ("complete" is
+    False), min/max are recomputed only if bounds are requested.
+
+    Args:
+        table_name: Name of the table
+        bounds: Whether min/max must be exact (count always is)
+
+    Returns:
+        Statistics with "count", "min", "max" and "complete"
+    """
+    if has_table_view(table_name):
+        # Транзакция видит свои изменения - считаем по ее копии таблицы
+        return compute_table_stats(table_name)
+
+    stamp = _current_stamp(table_name)
+
+    stats = _stats_cache.get(table_name)
+    if stats is None or stats["stamp"] != stamp:
+        stats = None
+        filepath = get_stats_path(table_name)
+        if os.path.exists(filepath):
+            try:
+                with open(filepath, 'r', encoding='utf-8') as file:
+                    stats = json.load(file)
+            except (json.JSONDecodeError, OSError):
+                stats = None
+        if stats is None or stats.get("stamp") != stamp:
+            stats = None
+
+    if stats is None or (bounds and not stats["complete"]):
+        stats = compute_table_stats(table_name)
+        save_table_stats(table_name, stats)
+        stats = _stats_cache[table_name]
+    else:
+        _stats_cache[table_name] = stats
+    return stats
+
+def apply_stats_changes(
+    stats: Dict[str, Any],
+    changes: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]
+) -> Dict[str, Any]:
+    """
+    Apply record changes to statistics.
+
+    Inserted and updated values can only widen min/max. Removing a value
+    equal to the current min or max leaves the bound unknown, so it is
+    marked incomplete and recomputed on next read.
+
+    Args:
+        stats: Statistics before the changes
+        changes: Pairs of (old_record, new_record) as in index updates
+
+    Returns:
+        New statistics
+    """
+    count = stats["count"]
+    minimums = dict(stats["min"])
+    maximums = dict(stats["max"])
+    complete = stats["complete"]
+
+    for old_record, new_record in changes:
+        if old_record is None:
+            count += 1
+        elif new_record is None:
+            count -= 1
+
+        if old_record is not None:
+            for column, value in old_record.items():
+                if new_record is not None and new_record.get(column) == value:
+                    continue
+                if value == minimums.get(column) or value == maximums.get(column):
+                    complete = False
+
+        if new_record is not None:
+            for column, value in new_record.items():
+                if column not in minimums or value < minimums[column]:
+                    minimums[column] = value
+                if column not in maximums or value > maximums[column]:
+                    maximums[column] = value
+
+    return {"count": count, "min": minimums, "max": maximums,
+            "complete": complete}
+
+def drop_table_stats(table_name: str) -> None:
+    """
+    Remove statistics of the table.
+
+    Args:
+        table_name: Name of the table
+    """
+    _stats_cache.pop(table_name, None)
+    _unsaved.discard(table_name)
+    filepath = get_stats_path(table_name)
+    if os.path.exists(filepath):
+        os.remove(filepath)
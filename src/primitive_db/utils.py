@@ -1,32 +1,449 @@
+import copy
+import csv
+import glob
 import json
+import mmap
 import os
-from typing import Any, Dict, List
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import partial
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
-from src.primitive_db.constants import DATA_DIR, META_FILE
+from src.primitive_db.columnar import (
+    apply_columnar_entries,
+    count_columnar_records,
+    decode_columnar,
+    encode_columnar,
+    get_columnar_record,
+    iter_columnar_records,
+)
+from src.primitive_db.constants import (
+    CODEC_MAGIC,
+    COLUMNAR_SUFFIX,
+    DATA_DIR,
+    DEFAULT_CODEC,
+    ERROR_CONCURRENT_WRITE,
+    LOG_COMPACT_MIN_BYTES,
+    LOG_SUFFIX,
+    META_FILE,
+    REDO_SUFFIX,
+    SEGMENT_ROWS,
+    SEGMENT_SUFFIX,
+    SEGMENTS_SUFFIX,
+    TABLE_CACHE_MAX_BYTES,
+    USE_MMAP,
+    WAL_GROUP_COMMIT_DELAY,
+)
 from src.primitive_db.decorators import handle_db_errors
+from src.primitive_db.locks import metadata_lock, table_lock
+from src.primitive_db.segments import (
+    apply_segment_entries,
+    find_segment,
+    iter_segment_records,
+    new_segment,
+    segment_entry,
+)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Кэш метаданных: путь -> {"data", "stamp"}
+_metadata_cache: Dict[str, Dict[str, Any]] = {}
+
+# Буферный пул таблиц: имя -> {"rows", "stamp", "size"}, порядок = LRU
+_table_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_table_cache_limit = TABLE_CACHE_MAX_BYTES
+
+# Таблицы с незафиксированными изменениями транзакции: имя -> копия таблицы
+_table_views: Dict[str, Dict[str, Any]] = {}
+
+# Кодек новых файлов данных (см. set_default_codec)
+_default_codec = DEFAULT_CODEC
+
+# Group commit: файлы журналов, ожидающие fsync, и номера записей -
+# последней выданной, последней попавшей на диск - и идет ли fsync
+_unsynced_paths: Set[str] = set()
+_sync_lock = threading.Condition()
+_sync_state = {"written": 0, "synced": 0, "syncing": False}
+
+
+def get_file_stamp(filepath: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Get (mtime, size, inode) triple used to detect file changes.
+
+    Appends change the size, atomic rewrites replace the inode, so the
+    stamp works as a file version even with coarse mtime resolution.
+
+    Args:
+        filepath: Path to file
+
+    Returns:
+        Stamp tuple or None if file does not exist
+    """
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+def fsync_path(filepath: str) -> None:
+    """
+    Flush file (or directory) contents to disk.
+
+    Args:
+        filepath: Path to file or directory
+    """
+    try:
+        fd = os.open(filepath, os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    except OSError:
+        # Например, каталоги на Windows не открываются - пропускаем
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def atomic_write(
+    filepath: str,
+    write: Callable[[Any], Any],
+    binary: bool = False
+) -> None:
+    """
+    Write file via temporary copy and atomic rename.
+
+    A crash leaves either the old or the new file, never a truncated one.
+
+    Args:
+        filepath: Target file path
+        write: Function writing contents into the opened temporary file
+        binary: Open the temporary file in binary mode
+    """
+    tmp_path = f"{filepath}.tmp"
+    if binary:
+        handle = open(tmp_path, 'wb')
+    else:
+        handle = open(tmp_path, 'w', encoding='utf-8')
+    with handle as file:
+        write(file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, filepath)
+    fsync_path(os.path.dirname(filepath) or ".")
+
+def _json_encode(data: Any) -> bytes:
+    """Encode data as compact JSON, with orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            # Например, целые больше 64 бит - их кодирует стандартный json
+            pass
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# Цифры заменяются нулями: 19 нулей подряд - целое, которое может
+# не поместиться в 64 бита (поиск подстроки быстрее регулярного выражения)
+_DIGITS_TO_ZEROS = bytes.maketrans(b"123456789", b"000000000")
+_WIDE_INT = b"0" * 19
+
+def json_loads(data: Any) -> Any:
+    """
+    Decode JSON document, with orjson when it is installed.
+
+    orjson reads integers wider than 64 bits as floats, so documents that
+    may hold them (a run of 19 or more digits anywhere, even in a string)
+    are decoded by the standard json module.
+
+    Args:
+        data: JSON document as str or bytes
+
+    Returns:
+        Decoded value
+
+    Raises:
+        ValueError: If data is not valid JSON
+    """
+    if orjson is None:
+        return json.loads(data)
+    raw = data.encode("utf-8") if isinstance(data, str) else data
+    if _WIDE_INT in raw.translate(_DIGITS_TO_ZEROS):
+        return json.loads(raw)
+    return orjson.loads(raw)
+
+# Кодеки файлов данных: имя -> (кодирование в bytes, декодирование из bytes)
+_codecs: Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "json": (_json_encode, json_loads),
+}
+if msgpack is not None:
+    _codecs["msgpack"] = (
+        partial(msgpack.packb, use_bin_type=True),
+        partial(msgpack.unpackb, raw=False, strict_map_key=False),
+    )
+
+def register_codec(
+    name: str,
+    encode: Callable[[Any], bytes],
+    decode: Callable[[bytes], Any]
+) -> None:
+    """
+    Register codec for table data and metadata files.
+
+    Args:
+        name: Codec name recorded in file headers (no newline)
+        encode: Function turning lists/dicts of JSON types into bytes
+        decode: Inverse of encode
+    """
+    _codecs[name] = (encode, decode)
+
+def available_codecs() -> List[str]:
+    """
+    Get names of codecs usable in this environment.
+
+    Returns:
+        Sorted codec names
+    """
+    return sorted(_codecs)
+
+def set_default_codec(name: str) -> None:
+    """
+    Set codec for metadata and new row tables.
+
+    Args:
+        name: Registered codec name
+
+    Raises:
+        ValueError: If codec is not available
+    """
+    global _default_codec
+    check_codec(name)
+    _default_codec = name
+
+def check_codec(name: str) -> None:
+    """
+    Check that codec is available.
+
+    Args:
+        name: Codec name
+
+    Raises:
+        ValueError: If codec is unknown or its library is not installed
+    """
+    if name not in _codecs:
+        supported = ", ".join(available_codecs())
+        raise ValueError(f"Кодек {name} недоступен. Доступные кодеки: {supported}")
+
+def encode_data(data: Any, codec: str) -> bytes:
+    """
+    Encode data file contents with codec header.
+
+    JSON files get no header and stay plain JSON documents; other codecs
+    are prefixed with CODEC_MAGIC, codec name and a newline. Data the
+    codec cannot represent is written as JSON, which the file records.
+
+    Args:
+        data: Lists/dicts of JSON types
+        codec: Codec name
+
+    Returns:
+        File contents
+    """
+    check_codec(codec)
+    if codec != "json":
+        try:
+            payload = _codecs[codec][0](data)
+        except (TypeError, ValueError, OverflowError):
+            # Например, msgpack не кодирует целые больше 64 бит
+            return _json_encode(data)
+        return CODEC_MAGIC + codec.encode("ascii") + b"\n" + payload
+    return _json_encode(data)
+
+def decode_data(raw: bytes) -> Tuple[Any, str]:
+    """
+    Decode data file contents written by encode_data.
+
+    Args:
+        raw: File contents
+
+    Returns:
+        Decoded data and name of the codec recorded in the file
+
+    Raises:
+        ValueError: If the recorded codec is not available
+    """
+    if not raw.startswith(CODEC_MAGIC):
+        return json_loads(raw), "json"
+    header_end = raw.index(b"\n")
+    codec = raw[len(CODEC_MAGIC):header_end].decode("ascii")
+    check_codec(codec)
+    return _codecs[codec][1](raw[header_end + 1:]), codec
+
+def write_data_file(filepath: str, data: Any, codec: Optional[str] = None) -> None:
+    """
+    Atomically write data file with given codec.
+
+    Args:
+        filepath: Target file path
+        data: Lists/dicts of JSON types
+        codec: Codec name (default codec if not given)
+    """
+    contents = encode_data(data, codec or _default_codec)
+    atomic_write(filepath, lambda file: file.write(contents), binary=True)
+
+def read_data_file(filepath: str) -> Tuple[Any, str]:
+    """
+    Read data file of any codec.
+
+    Args:
+        filepath: Path to file
+
+    Returns:
+        Decoded data and name of its codec
+    """
+    with open(filepath, 'rb') as file:
+        return decode_data(file.read())
+
+def sync_wal() -> None:
+    """Fsync all log files written so far and wait until they are on disk."""
+    with _sync_lock:
+        written = _sync_state["written"]
+    _wait_synced(written)
+
+def _wait_synced(ticket: int) -> None:
+    """Wait until appends up to ticket are on disk, fsyncing them if needed."""
+    with _sync_lock:
+        while _sync_state["synced"] < ticket:
+            if not _sync_state["syncing"]:
+                break
+            # fsync другого писателя уже идет - ждем его и, если он не
+            # покрыл нашу запись, выполняем следующий сами
+            _sync_lock.wait()
+        else:
+            return
+        _sync_state["syncing"] = True
+
+    if WAL_GROUP_COMMIT_DELAY > 0:
+        time.sleep(WAL_GROUP_COMMIT_DELAY)
+    with _sync_lock:
+        paths = list(_unsynced_paths)
+        _unsynced_paths.clear()
+        covered = _sync_state["written"]
+    try:
+        for path in paths:
+            fsync_path(path)
+    except BaseException:
+        with _sync_lock:
+            _unsynced_paths.update(paths)
+        raise
+    else:
+        with _sync_lock:
+            _sync_state["synced"] = max(_sync_state["synced"], covered)
+    finally:
+        with _sync_lock:
+            _sync_state["syncing"] = False
+            _sync_lock.notify_all()
+
+def _drop_torn_tail(file: BinaryIO) -> None:
+    """Cut off the last line of a log if a crashed append left it unfinished."""
+    end = file.seek(0, os.SEEK_END)
+    if end == 0:
+        return
+    file.seek(end - 1)
+    if file.read(1) == b"\n":
+        return
+
+    # Ищем конец последней полной строки, читая файл с конца блоками
+    position = end
+    while position > 0:
+        start = max(0, position - 4096)
+        file.seek(start)
+        newline = file.read(position - start).rfind(b"\n")
+        if newline >= 0:
+            file.truncate(start + newline + 1)
+            return
+        position = start
+    file.truncate(0)
+
+def append_lines(filepath: str, lines: List[str]) -> None:
+    """
+    Append lines to a log file and wait until they are on disk.
+
+    An unfinished last line left by a crash is cut off first: otherwise
+    the new lines would be glued to it and skipped by readers together
+    with it. Appends of concurrent writers that arrive while an fsync is
+    running share the next one (group commit).
+
+    Args:
+        filepath: Path to log file
+        lines: Lines without trailing newline
+    """
+    with open(filepath, 'a+b') as file:
+        _drop_torn_tail(file)
+        file.write("".join(line + "\n" for line in lines).encode("utf-8"))
+
+    with _sync_lock:
+        _unsynced_paths.add(filepath)
+        _sync_state["written"] += 1
+        ticket = _sync_state["written"]
+    _wait_synced(ticket)
 
 @handle_db_errors
 def load_metadata(filepath: str = META_FILE) -> Dict[str, Any]:
     """
     Load metadata from JSON file.
 
+    Parsed metadata is kept in memory until the file changes on disk.
+    The stamp of the loaded version is remembered for save_metadata.
+
     Args:
         filepath: Path to metadata file
 
     Returns:
         Dictionary with metadata or empty dict if file not found
     """
-    try:
-        with open(filepath, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except FileNotFoundError:
-        return {}
+    with metadata_lock(filepath=filepath):
+        stamp = get_file_stamp(filepath)
+        if stamp is None:
+            # Файла еще нет - его создание другим процессом тоже конфликт
+            _metadata_cache[filepath] = {"data": {}, "stamp": None}
+            return {}
+
+        cached = _metadata_cache.get(filepath)
+        if cached is None or cached["stamp"] != stamp:
+            cached = {"data": read_data_file(filepath)[0], "stamp": stamp}
+            _metadata_cache[filepath] = cached
+
+    # Вызывающий код изменяет метаданные - отдаем копию
+    return copy.deepcopy(cached["data"])
 
 @handle_db_errors
 def save_metadata(data: Dict[str, Any], filepath: str = META_FILE) -> bool:
     """
-    Save metadata to JSON file.
+    Save metadata file with the default codec (compact JSON unless set).
+
+    Writers are serialized by the metadata lock. If the file changed
+    since this process loaded it, another process saved its own changes
+    in between, and overwriting them would lose an update.
 
     Args:
         data: Dictionary with metadata to save
@@ -34,9 +451,23 @@ def save_metadata(data: Dict[str, Any], filepath: str = META_FILE) -> bool:
 
     Returns:
         True if successful
+
+    Raises:
+        ValueError: If metadata was changed by another process
     """
-    with open(filepath, 'w', encoding='utf-8') as file:
-        json.dump(data, file, ensure_ascii=False, indent=2)
+    with metadata_lock(exclusive=True, filepath=filepath):
+        cached = _metadata_cache.get(filepath)
+        # Без загруженной версии (поврежденный файл) перезаписываем как раньше
+        if cached is not None and cached["stamp"] != get_file_stamp(filepath):
+            _metadata_cache.pop(filepath)
+            raise ValueError(ERROR_CONCURRENT_WRITE.format("Метаданные"))
+
+        write_data_file(filepath, data)
+
+        _metadata_cache[filepath] = {
+            "data": copy.deepcopy(data),
+            "stamp": get_file_stamp(filepath),
+        }
     return True
 
 def ensure_data_dir():
@@ -55,10 +486,624 @@ def get_table_data_path(table_name: str) -> str:
     """
     return f"{DATA_DIR}/{table_name}.json"
 
+def get_table_columnar_path(table_name: str) -> str:
+    """
+    Get path for columnar table snapshot file.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        Path to columnar snapshot file
+    """
+    return f"{DATA_DIR}/{table_name}{COLUMNAR_SUFFIX}"
+
+def get_table_segments_path(table_name: str) -> str:
+    """
+    Get path for segment directory of a row table.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        Path to segment directory file
+    """
+    return f"{DATA_DIR}/{table_name}{SEGMENTS_SUFFIX}"
+
+def get_segment_path(table_name: str, number: int) -> str:
+    """
+    Get path for one segment file of a row table.
+
+    Args:
+        table_name: Name of the table
+        number: Segment file number
+
+    Returns:
+        Path to segment file
+    """
+    return f"{DATA_DIR}/{table_name}.{number}{SEGMENT_SUFFIX}"
+
+def get_table_log_path(table_name: str) -> str:
+    """
+    Get path for table append-only log file.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        Path to table log file
+    """
+    return f"{DATA_DIR}/{table_name}{LOG_SUFFIX}"
+
+def new_redo_path() -> str:
+    """
+    Get path for the commit record of a new transaction commit.
+
+    Returns:
+        Unique path in the data directory
+    """
+    return f"{DATA_DIR}/{uuid.uuid4().hex}{REDO_SUFFIX}"
+
+def get_redo_paths() -> List[str]:
+    """
+    Get paths of commit records left by unfinished commits.
+
+    Returns:
+        Sorted list of commit record paths
+    """
+    return sorted(glob.glob(f"{DATA_DIR}/*{REDO_SUFFIX}"))
+
+def is_columnar_table(table_name: str) -> bool:
+    """
+    Check whether the table is stored in columnar format.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        True if columnar snapshot exists
+    """
+    return os.path.exists(get_table_columnar_path(table_name))
+
+def read_binary_file(filepath: str) -> Any:
+    """
+    Open binary file for zero-copy reads.
+
+    The file is memory-mapped when USE_MMAP is enabled, so pages are read
+    lazily by the OS. Snapshots are replaced by atomic rename, which keeps
+    an existing mapping of the old file valid.
+
+    Args:
+        filepath: Path to binary file
+
+    Returns:
+        mmap object or file contents as bytes
+    """
+    with open(filepath, 'rb') as file:
+        if USE_MMAP:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return file.read()
+
+def apply_log_entries(
+    rows: Dict[Any, Dict[str, Any]],
+    entries: List[Dict[str, Any]]
+) -> None:
+    """
+    Apply table log entries to records keyed by ID.
+
+    Dictionaries keep insertion order, so records stay in table order.
+
+    Args:
+        rows: Records keyed by ID, modified in place
+        entries: Log entries to apply
+    """
+    for entry in entries:
+        op = entry.get("op")
+        if op == "insert":
+            rows[entry["row"]["ID"]] = entry["row"]
+        elif op == "update":
+            if entry["row"]["ID"] in rows:
+                rows[entry["row"]["ID"]] = entry["row"]
+        elif op == "delete":
+            rows.pop(entry["id"], None)
+
+def apply_table_entries(
+    table: Dict[str, Any],
+    entries: List[Dict[str, Any]]
+) -> None:
+    """
+    Apply table log entries to loaded table of any storage format.
+
+    Args:
+        table: Loaded table structure, modified in place
+        entries: Log entries to apply
+    """
+    entries = expand_log_entries(entries)
+    if table["format"] == "columnar":
+        apply_columnar_entries(table, entries)
+    elif table.get("segments") is not None:
+        apply_segment_entries(table, entries, SEGMENT_ROWS,
+                              partial(load_segment, table))
+    else:
+        apply_log_entries(table["rows"], entries)
+
+def expand_log_entries(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Replace batch entries with the entries they hold.
+
+    A committed transaction is logged as one {"op": "batch", "entries":
+    [...]} line, so a torn write after a crash drops the whole batch
+    instead of a part of it.
+
+    Args:
+        entries: Log entries, possibly with batches
+
+    Returns:
+        Flat list of insert, update and delete entries
+    """
+    if not any(entry.get("op") == "batch" for entry in entries):
+        return entries
+    flat: List[Dict[str, Any]] = []
+    for entry in entries:
+        if entry.get("op") == "batch":
+            flat.extend(entry["entries"])
+        else:
+            flat.append(entry)
+    return flat
+
+def copy_table(table: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy loaded table so that log entries can be applied to the copy.
+
+    Records and column data are shared with the original; only the
+    structures changed by apply_table_entries are copied.
+
+    Args:
+        table: Loaded table structure
+
+    Returns:
+        Independent table structure with the same records
+    """
+    if table["format"] == "columnar":
+        return dict(table, overlay=dict(table["overlay"]),
+                    deleted=set(table["deleted"]))
+    # Сегменты копии не нужны: она не записывается на диск
+    return {"format": "row",
+            "rows": {record["ID"]: record for record in iter_records(table)}}
+
+def set_table_views(views: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Make read_table return given table copies instead of stored tables.
+
+    Used by transactions: their reads see their own uncommitted changes.
+
+    Args:
+        views: Mapping of table name to table copy, kept by reference
+    """
+    global _table_views
+    _table_views = views
+
+def has_table_view(table_name: str) -> bool:
+    """
+    Check whether the table is read from a transaction copy.
+
+    Indexes, statistics and cached query results do not reflect such a
+    copy and must not be used for it.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        True if the table has uncommitted changes
+    """
+    return table_name in _table_views
+
+def replay_table_log(table_name: str, table: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply table log entries on top of snapshot records.
+
+    Args:
+        table_name: Name of the table
+        table: Table structure loaded from the snapshot
+
+    Returns:
+        Table with all logged inserts, updates and deletes applied
+    """
+    filepath = get_table_log_path(table_name)
+    if not os.path.exists(filepath):
+        return table
+
+    entries = []
+    with open(filepath, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json_loads(line))
+            except json.JSONDecodeError:
+                # Недописанная строка после сбоя - пропускаем
+                continue
+
+    apply_table_entries(table, entries)
+    return table
+
+def get_table_stamp(table_name: str) -> Tuple[Any, ...]:
+    """
+    Get combined stamp of table snapshot and log files.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        Tuple of file stamps (None for a missing file)
+    """
+    return (get_file_stamp(get_table_data_path(table_name)),
+            get_file_stamp(get_table_columnar_path(table_name)),
+            get_file_stamp(get_table_segments_path(table_name)),
+            get_file_stamp(get_table_log_path(table_name)))
+
+def set_table_cache_limit(max_bytes: int) -> None:
+    """
+    Set memory budget of the table buffer pool.
+
+    Args:
+        max_bytes: Budget in bytes of on-disk table size; 0 disables caching
+    """
+    global _table_cache_limit
+    _table_cache_limit = max_bytes
+    _evict_tables()
+
+def invalidate_table_cache(table_name: Optional[str] = None) -> None:
+    """
+    Drop table from the buffer pool (all tables if name is not given).
+
+    Args:
+        table_name: Name of the table
+    """
+    if table_name is None:
+        _table_cache.clear()
+    else:
+        _table_cache.pop(table_name, None)
+
+def _evict_tables(keep: Optional[str] = None) -> None:
+    """Evict least recently used tables until the pool fits its budget."""
+    total = sum(entry["size"] for entry in _table_cache.values())
+    for name in list(_table_cache):
+        if total <= _table_cache_limit:
+            break
+        if name == keep and _table_cache_limit > 0:
+            continue
+        total -= _table_cache.pop(name)["size"]
+
+def _cache_table(
+    table_name: str,
+    table: Dict[str, Any],
+    stamp: Tuple[Any, ...]
+) -> None:
+    """Put loaded table into the buffer pool as most recently used."""
+    size = sum(part[1] for part in stamp if part is not None)
+    size += sum(segment["bytes"] for segment in table.get("segments") or ())
+    _table_cache[table_name] = {"table": table, "stamp": stamp, "size": size}
+    _table_cache.move_to_end(table_name)
+    _evict_tables(keep=table_name)
+
+@handle_db_errors
+def create_table_storage(
+    table_name: str,
+    column_types: Dict[str, str],
+    storage: str = "row"
+) -> bool:
+    """
+    Prepare data files for a new table.
+
+    Row tables get an empty segment directory, columnar tables an empty
+    columnar snapshot; the file present records the storage format.
+
+    Args:
+        table_name: Name of the table
+        column_types: Mapping of column names to types (including ID)
+        storage: Storage format, "row" or "columnar"
+
+    Returns:
+        True if successful
+    """
+    ensure_data_dir()
+    with table_lock(table_name, exclusive=True):
+        if storage == "columnar":
+            snapshot = encode_columnar(column_types, [])
+            atomic_write(get_table_columnar_path(table_name),
+                         lambda file: file.write(snapshot), binary=True)
+        else:
+            write_segments(table_name,
+                           {"rows": {}, "segments": [], "next_number": 1})
+    invalidate_table_cache(table_name)
+    return True
+
+@handle_db_errors
+def append_table_log(table_name: str, entries: List[Dict[str, Any]]) -> bool:
+    """
+    Append entries to table log without rewriting the snapshot.
+
+    Runs under the exclusive table lock, so appends and compactions of
+    concurrent processes do not interleave.
+
+    Args:
+        table_name: Name of the table
+        entries: Log entries ({"op": "insert"|"update", "row": {...}}
+            or {"op": "delete", "id": ...})
+
+    Returns:
+        True if successful
+    """
+    ensure_data_dir()
+    filepath = get_table_log_path(table_name)
+    with table_lock(table_name, exclusive=True):
+        cached = _table_cache.get(table_name)
+        is_fresh = (cached is not None
+                    and cached["stamp"] == get_table_stamp(table_name))
+
+        append_lines(
+            filepath, [json.dumps(entry, ensure_ascii=False) for entry in entries]
+        )
+
+        # Применяем изменения к таблице в буферном пуле вместо перечитывания
+        if is_fresh:
+            apply_table_entries(cached["table"], entries)
+            _cache_table(table_name, cached["table"], get_table_stamp(table_name))
+
+        # Записи уже в журнале: неудачная компакция не отменяет их
+        # и будет повторена при следующей записи, но о сбое сообщаем
+        if should_compact_table(table_name):
+            try:
+                _compact_table(table_name)
+            except Exception as e:
+                print(f'Предупреждение: не удалось свернуть журнал таблицы '
+                      f'"{table_name}": {e}')
+    return True
+
+def should_compact_table(table_name: str) -> bool:
+    """
+    Check whether the table log has grown enough to be folded into snapshot.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        True if log is larger than both the threshold and the snapshot
+    """
+    log_path = get_table_log_path(table_name)
+    if not os.path.exists(log_path):
+        return False
+
+    log_size = os.path.getsize(log_path)
+    snapshot_size = 0
+    for snapshot_path in (get_table_data_path(table_name),
+                          get_table_columnar_path(table_name)):
+        if os.path.exists(snapshot_path):
+            snapshot_size = os.path.getsize(snapshot_path)
+    cached = _table_cache.get(table_name)
+    if cached is not None and cached["table"].get("segments") is not None:
+        snapshot_size = sum(segment["bytes"]
+                            for segment in cached["table"]["segments"])
+
+    # Компакция, пропорциональная размеру снимка, дает O(1) амортизированно
+    return log_size > max(LOG_COMPACT_MIN_BYTES, snapshot_size)
+
+@handle_db_errors
+def compact_table(table_name: str) -> bool:
+    """
+    Fold table log into the snapshot file and truncate the log.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        True if successful
+    """
+    return _compact_table(table_name)
+
+def _compact_table(table_name: str) -> bool:
+    """Fold table log into the snapshot, raising on failure."""
+    with table_lock(table_name, exclusive=True):
+        # Читаем без подавления ошибок: поврежденный снимок не перезаписываем
+        table = read_table(table_name)
+        if table.get("segments") is not None:
+            # Переписываются только сегменты, измененные журналом
+            return save_table_segments(table_name, table)
+        return save_table_data(table_name, list(iter_records(table)))
+
+def read_table(table_name: str) -> Dict[str, Any]:
+    """
+    Load table structure through the buffer pool.
+
+    The table is read from disk only when its snapshot or log changed
+    since it was cached. Row tables are {"format": "row", "rows": {...}}
+    with records keyed by ID (plus "segments" and "next_number" once
+    they are stored in segments); columnar tables are described in
+    columnar.new_columnar_table. Records are shared with the pool and
+    must not be modified. Files are read under the shared table lock,
+    so a concurrent compaction is never seen half-done. Inside a
+    transaction its copy of the table is returned (see set_table_views).
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        Loaded table structure
+
+    Raises:
+        ValueError: If the snapshot file is corrupted
+    """
+    view = _table_views.get(table_name)
+    if view is not None:
+        return view
+
+    ensure_data_dir()
+    with table_lock(table_name):
+        stamp = get_table_stamp(table_name)
+
+        cached = _table_cache.get(table_name)
+        if cached is not None and cached["stamp"] == stamp:
+            _table_cache.move_to_end(table_name)
+            return cached["table"]
+
+        if is_columnar_table(table_name):
+            snapshot = read_binary_file(get_table_columnar_path(table_name))
+            table = decode_columnar(snapshot)
+        elif os.path.exists(get_table_segments_path(table_name)):
+            table = read_segmented_table(table_name)
+        else:
+            # Таблица без сегментов: снимок data/<table>.json прежних версий
+            try:
+                with open(get_table_data_path(table_name), 'r',
+                          encoding='utf-8') as file:
+                    data = json.load(file)
+            except FileNotFoundError:
+                data = []
+            table = {"format": "row",
+                     "rows": {record["ID"]: record for record in data}}
+
+        table = replay_table_log(table_name, table)
+    _cache_table(table_name, table, stamp)
+    return table
+
+def iter_records(
+    table: Dict[str, Any],
+    columns: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield records of a loaded table in table order.
+
+    Args:
+        table: Loaded table structure
+        columns: Columns to decode for columnar tables (all by default)
+
+    Yields:
+        Record dictionaries
+    """
+    if table["format"] == "columnar":
+        return iter_columnar_records(table, columns)
+    if table.get("segments") is not None:
+        return iter_segment_records(table, None, partial(load_segment, table))
+    return iter(table["rows"].values())
+
+def iter_zone_records(
+    table: Dict[str, Any],
+    tree: Dict[str, Any]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield records of segments whose zone maps allow a match.
+
+    Segments ruled out by their zone maps are not read from disk.
+
+    Args:
+        table: Segmented row table
+        tree: Coerced condition tree
+
+    Returns:
+        Iterator over candidate records in table order
+    """
+    return iter_segment_records(table, tree, partial(load_segment, table))
+
+def iter_table_records(
+    table_name: str,
+    columns: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield table records in table order.
+
+    Args:
+        table_name: Name of the table
+        columns: Columns to decode for columnar tables (all by default)
+
+    Yields:
+        Record dictionaries
+    """
+    return iter_records(read_table(table_name), columns)
+
+def get_table_record(
+    table_name: str,
+    record_id: Any,
+    columns: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Get one table record by ID.
+
+    Args:
+        table_name: Name of the table
+        record_id: Record ID
+        columns: Columns to decode for columnar tables (all by default)
+
+    Returns:
+        Record dictionary or None if not found
+    """
+    table = read_table(table_name)
+    if table["format"] == "columnar":
+        return get_columnar_record(table, record_id, columns)
+    if table.get("segments") is not None:
+        # Читается только сегмент, диапазон ID которого содержит запись
+        find_segment(table["segments"], record_id, partial(load_segment, table))
+    return table["rows"].get(record_id)
+
+def get_table_records(
+    table_name: str,
+    record_ids: Iterable[Any],
+    columns: Optional[List[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield table records with given IDs in the order of the IDs.
+
+    The table is read (and locked) once for all IDs, so fetching many
+    records costs a dictionary lookup each rather than a table read.
+
+    Args:
+        table_name: Name of the table
+        record_ids: Record IDs
+        columns: Columns to decode for columnar tables (all by default)
+
+    Yields:
+        Found records
+    """
+    table = read_table(table_name)
+    if table["format"] == "columnar":
+        for record_id in record_ids:
+            record = get_columnar_record(table, record_id, columns)
+            if record is not None:
+                yield record
+        return
+
+    rows = table["rows"]
+    segments = table.get("segments")
+    load = partial(load_segment, table)
+    for record_id in record_ids:
+        if segments is not None and record_id not in rows:
+            find_segment(segments, record_id, load)
+        record = rows.get(record_id)
+        if record is not None:
+            yield record
+
+def count_table_records(table_name: str) -> int:
+    """
+    Count table records.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        Number of records
+    """
+    table = read_table(table_name)
+    if table["format"] == "columnar":
+        return count_columnar_records(table)
+    if table.get("segments") is not None:
+        return sum(segment["count"] for segment in table["segments"])
+    return len(table["rows"])
+
 @handle_db_errors
 def load_table_data(table_name: str) -> List[Dict[str, Any]]:
     """
-    Load table data from JSON file.
+    Load table data from snapshot and replay the table log.
 
     Args:
         table_name: Name of the table
@@ -66,29 +1111,335 @@ def load_table_data(table_name: str) -> List[Dict[str, Any]]:
     Returns:
         List of table records or empty list if file not found
     """
+    return list(iter_table_records(table_name))
+
+def save_table_data(table_name: str, data: List[Dict[str, Any]]) -> bool:
+    """
+    Save table data to snapshot atomically and drop the folded log.
+
+    The snapshot keeps the table storage format (JSON or columnar).
+
+    Args:
+        table_name: Name of the table
+        data: List of records to save
+
+    Returns:
+        True if successful
+    """
     ensure_data_dir()
-    filepath = get_table_data_path(table_name)
-    
+    if is_columnar_table(table_name):
+        types = read_table(table_name)["types"]
+        snapshot = encode_columnar(types, data)
+        atomic_write(get_table_columnar_path(table_name),
+                     lambda file: file.write(snapshot), binary=True)
+        table = decode_columnar(read_binary_file(get_table_columnar_path(table_name)))
+    else:
+        directory = read_segment_directory(table_name)
+        table = {
+            "format": "row",
+            "name": table_name,
+            "rows": {record["ID"]: record for record in data},
+            "segments": [new_segment(data[start:start + SEGMENT_ROWS])
+                         for start in range(0, len(data), SEGMENT_ROWS)],
+            "next_number": directory["next_number"],
+            "codec": directory["codec"],
+        }
+        old_numbers = [segment["number"] for segment in directory["segments"]]
+        write_segments(table_name, table, old_numbers)
+        if os.path.exists(get_table_data_path(table_name)):
+            os.remove(get_table_data_path(table_name))
+
+    _finish_compaction(table_name, table)
+    return True
+
+def save_table_segments(table_name: str, table: Dict[str, Any]) -> bool:
+    """
+    Write changed segments of a row table and drop the folded log.
+
+    Args:
+        table_name: Name of the table
+        table: Segmented row table loaded with read_table
+
+    Returns:
+        True if successful
+    """
+    write_segments(table_name, table)
+    _finish_compaction(table_name, table)
+    return True
+
+def _finish_compaction(table_name: str, table: Dict[str, Any]) -> None:
+    """Remove table log folded into the snapshot and cache the new table."""
+    # Снимок содержит все изменения - журнал больше не нужен.
+    # Повторное применение журнала после сбоя безопасно: все операции по ID
+    # идемпотентны
+    log_path = get_table_log_path(table_name)
+    if os.path.exists(log_path):
+        os.remove(log_path)
+
+    _cache_table(table_name, table, get_table_stamp(table_name))
+
+def read_segment_directory(table_name: str) -> Dict[str, Any]:
+    """
+    Read segment directory of a row table.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        Directory with "next_number", "segments" (entries in table order)
+        and "codec" of the table files; empty directory with the default
+        codec if the table has no segments
+    """
     try:
-        with open(filepath, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        directory, codec = read_data_file(get_table_segments_path(table_name))
     except FileNotFoundError:
-        return []
+        return {"next_number": 1, "segments": [], "codec": _default_codec}
+    directory["codec"] = codec
+    return directory
+
+def get_table_codec(table_name: str) -> str:
+    """
+    Get codec of row table files.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        Codec name ("json" for snapshots of older versions)
+    """
+    if not os.path.exists(get_table_segments_path(table_name)):
+        return "json"
+    return read_segment_directory(table_name)["codec"]
+
+def read_segmented_table(table_name: str) -> Dict[str, Any]:
+    """
+    Load row table stored in segments.
+
+    Only the segment directory is read: segment files are read by
+    load_segment when their records are first needed, so a scan
+    pruned by zone maps or a lookup by ID reads only its segments.
+
+    Args:
+        table_name: Name of the table
+
+    Returns:
+        Row table with its name, loaded records, segments, next segment
+        number and codec
+    """
+    directory = read_segment_directory(table_name)
+    segments = [dict(entry, ids=None, dirty=False)
+                for entry in directory["segments"]]
+    return {"format": "row", "name": table_name, "rows": {},
+            "segments": segments, "next_number": directory["next_number"],
+            "codec": directory["codec"]}
+
+def load_segment(table: Dict[str, Any], segment: Dict[str, Any]) -> None:
+    """
+    Read records of a segment into the table unless already loaded.
+
+    Segment files are never rewritten in place, so the file of a cached
+    directory can only be missing after another process compacted the
+    table.
+
+    Args:
+        table: Segmented row table from read_segmented_table
+        segment: Segment entry of the table, modified in place
+
+    Raises:
+        ValueError: If the segment file was removed by a compaction
+    """
+    if segment["ids"] is not None:
+        return
+    table_name = table["name"]
+    try:
+        with table_lock(table_name):
+            records = read_data_file(get_segment_path(table_name,
+                                                      segment["number"]))[0]
+    except FileNotFoundError:
+        invalidate_table_cache(table_name)
+        raise ValueError(f'Таблица "{table_name}" изменена другим процессом. '
+                         "Повторите запрос.")
+    rows = table["rows"]
+    ids = {}
+    for record in records:
+        rows[record["ID"]] = record
+        ids[record["ID"]] = None
+    segment["ids"] = ids
+
+def write_segments(
+    table_name: str,
+    table: Dict[str, Any],
+    obsolete: Optional[List[int]] = None
+) -> None:
+    """
+    Write dirty segments to new files and switch the directory to them.
+
+    New segment files never overwrite live ones: the directory is
+    replaced atomically after they are written, and only then files of
+    rewritten segments are removed, so a crash leaves either the old or
+    the new set of segments. Dirty segments above SEGMENT_ROWS records
+    are split, empty ones are dropped. Files are written with the table
+    codec ("codec" of the table, the default codec if missing).
+
+    Args:
+        table_name: Name of the table
+        table: Segmented row table, its segments are replaced in place
+        obsolete: Segment numbers to remove in addition to rewritten ones
+    """
+    ensure_data_dir()
+    rows = table["rows"]
+    codec = table.setdefault("codec", _default_codec)
+    obsolete = list(obsolete or [])
+    segments = []
+    for segment in table["segments"]:
+        if not segment["dirty"]:
+            segments.append(segment)
+            continue
+        if segment["number"] is not None:
+            obsolete.append(segment["number"])
+
+        load_segment(table, segment)
+        ids = list(segment["ids"])
+        for start in range(0, len(ids), SEGMENT_ROWS):
+            records = [rows[record_id] for record_id in ids[start:start + SEGMENT_ROWS]]
+            part = new_segment(records, table["next_number"])
+            table["next_number"] += 1
+            filepath = get_segment_path(table_name, part["number"])
+            write_data_file(filepath, records, codec)
+            part["bytes"] = os.path.getsize(filepath)
+            segments.append(part)
+
+    directory = {"next_number": table["next_number"],
+                 "segments": [segment_entry(segment) for segment in segments]}
+    write_data_file(get_table_segments_path(table_name), directory, codec)
+    table["segments"] = segments
+
+    live = {segment["number"] for segment in segments}
+    for number in obsolete:
+        filepath = get_segment_path(table_name, number)
+        if number not in live and os.path.exists(filepath):
+            os.remove(filepath)
 
 @handle_db_errors
-def save_table_data(table_name: str, data: List[Dict[str, Any]]) -> bool:
+def convert_table_codec(table_name: str, codec: str) -> bool:
     """
-    Save table data to JSON file.
+    Rewrite all files of a row table with another codec.
+
+    The table log is folded in as by compaction.
 
     Args:
         table_name: Name of the table
-        data: List of records to save
+        codec: Target codec name
 
     Returns:
         True if successful
+
+    Raises:
+        ValueError: If codec is not available or table is columnar
     """
-    ensure_data_dir()
-    filepath = get_table_data_path(table_name)
-    with open(filepath, 'w', encoding='utf-8') as file:
-        json.dump(data, file, ensure_ascii=False, indent=2)
-    return True
\ No newline at end of file
+    check_codec(codec)
+    with table_lock(table_name, exclusive=True):
+        if is_columnar_table(table_name):
+            raise ValueError("Колоночные таблицы хранятся в собственном "
+                             "двоичном формате и не конвертируются")
+        if read_table(table_name).get("segments") is None:
+            # Снимок прежних версий сначала переводится в сегменты
+            if not compact_table(table_name):
+                return False
+
+        table = read_table(table_name)
+        table["codec"] = codec
+        for segment in table["segments"]:
+            segment["dirty"] = True
+        return save_table_segments(table_name, table)
+
+def drop_table_segments(table_name: str) -> None:
+    """
+    Remove segment files and segment directory of a table.
+
+    Args:
+        table_name: Name of the table
+    """
+    for segment in read_segment_directory(table_name)["segments"]:
+        filepath = get_segment_path(table_name, segment["number"])
+        if os.path.exists(filepath):
+            os.remove(filepath)
+    if os.path.exists(get_table_segments_path(table_name)):
+        os.remove(get_table_segments_path(table_name))
+
+def read_rows_file(
+    filepath: str,
+    columns: List[str]
+) -> Iterator[Tuple[int, List[Any]]]:
+    """
+    Read rows for bulk loading from CSV or JSON Lines file.
+
+    CSV files may start with a header naming the columns; JSON Lines
+    may hold objects keyed by column name or plain lists of values.
+    An object must have exactly the table columns as keys.
+
+    Args:
+        filepath: Path to .csv or .jsonl file
+        columns: Table columns in insert order (excluding ID)
+
+    Yields:
+        Pairs of (line number in the file, raw values in column order)
+
+    Raises:
+        ValueError: If file format is not supported or a row is malformed
+            (the message names the line)
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+
+    if extension == ".csv":
+        with open(filepath, 'r', encoding='utf-8', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return
+            names = [name.strip() for name in header]
+            if set(names) >= set(columns):
+                # Первая строка - заголовок: берем значения по именам
+                positions = [names.index(column) for column in columns]
+            else:
+                positions = None
+                yield reader.line_num, header
+            for row in reader:
+                if not row:
+                    continue
+                if positions is None:
+                    yield reader.line_num, row
+                elif len(row) < len(names):
+                    raise ValueError(f"Строка {reader.line_num}: ожидалось "
+                                     f"значений {len(names)}, получено {len(row)}")
+                else:
+                    yield reader.line_num, [row[i] for i in positions]
+
+    elif extension in (".jsonl", ".ndjson"):
+        with open(filepath, 'r', encoding='utf-8') as file:
+            for number, line in enumerate(file, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    item = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"Строка {number}: некорректный JSON ({e})")
+                if isinstance(item, dict):
+                    # Пропущенный или лишний ключ - почти всегда опечатка в имени
+                    missing = [column for column in columns if column not in item]
+                    extra = [key for key in item if key not in columns]
+                    if missing or extra:
+                        problems = []
+                        if missing:
+                            problems.append(f"нет столбцов {', '.join(missing)}")
+                        if extra:
+                            problems.append(
+                                f"неизвестные столбцы {', '.join(extra)}")
+                        raise ValueError(f"Строка {number}: {'; '.join(problems)}")
+                    yield number, [item[column] for column in columns]
+                else:
+                    yield number, item
+
+    else:
+        raise ValueError(f"Неподдерживаемый формат файла: {filepath}")
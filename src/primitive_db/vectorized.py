@@ -0,0 +1,281 @@
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.primitive_db.columnar import decode_record
+from src.primitive_db.constants import USE_NUMPY
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Векторизованный путь включен, если NumPy установлен и не отключен вручную
+_enabled = USE_NUMPY and np is not None
+
+# Типы столбцов, которые загружаются в массивы
+_VECTOR_TYPES = {"int", "bool"}
+
+
+def set_vectorized_enabled(enabled: bool) -> None:
+    """
+    Enable or disable the NumPy execution path.
+
+    Args:
+        enabled: Whether to use NumPy when it is installed
+    """
+    global _enabled
+    _enabled = enabled and np is not None
+
+def can_vectorize(table: Dict[str, Any], column_types: Dict[str, str],
+                  tree: Optional[Dict[str, Any]], columns: List[str] = ()) -> bool:
+    """
+    Check that a query can run on column arrays.
+
+    Only columnar tables without pending inserts/updates in the log
+    overlay qualify, and every referenced column must be int or bool.
+
+    Args:
+        table: Loaded table structure
+        column_types: Mapping of column names to types
+        tree: Coerced condition tree or None
+        columns: Other columns the query reads as arrays
+
+    Returns:
+        True if the NumPy path gives the same result as the Python one
+    """
+    if not _enabled or table["format"] != "columnar" or table["overlay"]:
+        return False
+    if not all(column_types.get(column) in _VECTOR_TYPES for column in columns):
+        return False
+    return tree is None or _tree_vectorizable(column_types, tree)
+
+def _tree_vectorizable(column_types: Dict[str, str], tree: Dict[str, Any]) -> bool:
+    """Check that all compared columns of condition tree are int or bool."""
+    if tree["op"] in ("and", "or", "not"):
+        return all(_tree_vectorizable(column_types, arg) for arg in tree["args"])
+    return column_types.get(tree["column"]) in _VECTOR_TYPES
+
+def column_array(table: Dict[str, Any], column: str) -> Any:
+    """
+    Get column of a columnar table as NumPy array.
+
+    int columns are zero-copy views over the snapshot buffer, bool
+    bitmaps are unpacked into boolean arrays.
+
+    Args:
+        table: Columnar table structure
+        column: int or bool column name
+
+    Returns:
+        Array with one value per stored record
+    """
+    data = table["columns"][column]
+    if table["types"][column] == "int":
+        return np.frombuffer(data, dtype=np.int64, count=table["count"])
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little")
+    return bits[:table["count"]].astype(bool)
+
+def _tree_mask(table: Dict[str, Any], column_types: Dict[str, str],
+               tree: Dict[str, Any], arrays: Dict[str, Any]) -> Any:
+    """Evaluate condition tree into a boolean mask over stored records."""
+    op = tree["op"]
+    if op == "and":
+        mask = _tree_mask(table, column_types, tree["args"][0], arrays)
+        for arg in tree["args"][1:]:
+            mask = mask & _tree_mask(table, column_types, arg, arrays)
+        return mask
+    if op == "or":
+        mask = _tree_mask(table, column_types, tree["args"][0], arrays)
+        for arg in tree["args"][1:]:
+            mask = mask | _tree_mask(table, column_types, arg, arrays)
+        return mask
+    if op == "not":
+        return ~_tree_mask(table, column_types, tree["args"][0], arrays)
+
+    column = tree["column"]
+    if column not in arrays:
+        arrays[column] = column_array(table, column)
+    values = arrays[column]
+
+    if op == "in":
+        return np.isin(values, list(tree["values"]))
+    value = tree["value"]
+    operator = tree["operator"]
+    if operator == "=":
+        return values == value
+    if operator == "!=":
+        return values != value
+    if operator == ">":
+        return values > value
+    if operator == "<":
+        return values < value
+    if operator == ">=":
+        return values >= value
+    return values <= value
+
+def select_mask(table: Dict[str, Any], column_types: Dict[str, str],
+                tree: Optional[Dict[str, Any]],
+                arrays: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Compute mask of stored records that are live and match the condition.
+
+    Args:
+        table: Columnar table structure without overlay
+        column_types: Mapping of column names to types
+        tree: Coerced condition tree or None
+        arrays: Cache of loaded column arrays, filled in place
+
+    Returns:
+        Boolean mask over stored records
+    """
+    arrays = {} if arrays is None else arrays
+    if tree is None:
+        mask = np.ones(table["count"], dtype=bool)
+    else:
+        mask = _tree_mask(table, column_types, tree, arrays)
+
+    if table["deleted"]:
+        if "ID" not in arrays:
+            arrays["ID"] = column_array(table, "ID")
+        mask &= ~np.isin(arrays["ID"], list(table["deleted"]))
+    return mask
+
+def iter_vectorized_records(table: Dict[str, Any], column_types: Dict[str, str],
+                            tree: Optional[Dict[str, Any]],
+                            columns: Optional[List[str]] = None
+                            ) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield records matching the condition, filtered with NumPy.
+
+    Args:
+        table: Columnar table structure accepted by can_vectorize
+        column_types: Mapping of column names to types
+        tree: Coerced condition tree or None
+        columns: Columns to decode (all by default)
+
+    Yields:
+        Matching records in table order
+    """
+    for position in np.flatnonzero(select_mask(table, column_types, tree)):
+        yield decode_record(table, int(position), columns)
+
+def _to_python(value: Any, col_type: str) -> Any:
+    """Convert NumPy scalar to the Python type of the column."""
+    return bool(value) if col_type == "bool" else int(value)
+
+def _sum_fits(values: Any) -> bool:
+    """Check that int64 summation cannot overflow."""
+    if not len(values):
+        return True
+    largest = max(abs(int(values.min())), abs(int(values.max())))
+    return largest * len(values) < 2 ** 63
+
+def vectorized_aggregate(table: Dict[str, Any], column_types: Dict[str, str],
+                         tree: Optional[Dict[str, Any]], items: List[Any],
+                         group_by: Optional[List[str]]
+                         ) -> Optional[List[Dict[str, Any]]]:
+    """
+    Compute aggregates with array reductions.
+
+    Groups are formed with np.unique and reduced with bincount and
+    ufunc.reduceat; they are returned in order of first appearance, so
+    the result equals aggregate.aggregate_records.
+
+    Args:
+        table: Columnar table structure accepted by can_vectorize
+        column_types: Mapping of column names to types
+        tree: Coerced condition tree or None
+        items: Select list with grouped columns and aggregates
+        group_by: At most one int/bool grouping column, or None
+
+    Returns:
+        Result rows or None if the query needs the Python path
+    """
+    if group_by and len(group_by) > 1:
+        return None
+
+    arrays: Dict[str, Any] = {}
+    mask = select_mask(table, column_types, tree, arrays)
+
+    def values_of(column: str) -> Any:
+        if column not in arrays:
+            arrays[column] = column_array(table, column)
+        return arrays[column][mask]
+
+    selected = {}
+    for item in items:
+        if isinstance(item, dict) and item["column"] != "*":
+            values = values_of(item["column"])
+            if item["func"] in ("sum", "avg") and not _sum_fits(values):
+                return None
+            selected[item["column"]] = values
+
+    if not group_by:
+        count = int(mask.sum())
+        row = {}
+        for item in items:
+            label = f"{item['func']}({item['column']})"
+            if item["func"] == "count":
+                row[label] = count
+                continue
+            values = selected[item["column"]]
+            if not len(values):
+                row[label] = None
+            elif item["func"] == "sum":
+                row[label] = int(values.sum())
+            elif item["func"] == "avg":
+                row[label] = int(values.sum()) / len(values)
+            else:
+                extreme = values.min() if item["func"] == "min" else values.max()
+                row[label] = _to_python(extreme, column_types[item["column"]])
+        return [row]
+
+    keys = values_of(group_by[0])
+    if not len(keys):
+        return []
+    unique, first_index, inverse = np.unique(keys, return_index=True,
+                                             return_inverse=True)
+    # Порядок групп - по первому появлению, как при хэш-агрегации
+    order = np.argsort(first_index, kind="stable")
+    counts = np.bincount(inverse, minlength=len(unique))
+
+    # Для min/max сортируем записи по группам и сворачиваем отрезки
+    by_group = np.argsort(inverse, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    results: Dict[str, Any] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        label = f"{item['func']}({item['column']})"
+        if item["func"] == "count":
+            results[label] = counts
+            continue
+        values = selected[item["column"]]
+        if item["func"] in ("sum", "avg"):
+            sums = np.zeros(len(unique), dtype=np.int64)
+            np.add.at(sums, inverse, values.astype(np.int64))
+            results[label] = sums
+        elif item["func"] == "min":
+            results[label] = np.minimum.reduceat(values[by_group], starts)
+        else:
+            results[label] = np.maximum.reduceat(values[by_group], starts)
+
+    rows = []
+    for group in order:
+        row = {}
+        for item in items:
+            if not isinstance(item, dict):
+                row[item] = _to_python(unique[group], column_types[item])
+                continue
+            label = f"{item['func']}({item['column']})"
+            value = results[label][group]
+            if item["func"] == "count":
+                row[label] = int(value)
+            elif item["func"] == "sum":
+                row[label] = int(value)
+            elif item["func"] == "avg":
+                row[label] = int(value) / int(counts[group])
+            else:
+                row[label] = _to_python(value, column_types[item["column"]])
+        rows.append(row)
+    return rows
@@ -0,0 +1,38 @@
+import pytest
+
+from src.primitive_db import core, index, stats, utils
+from src.primitive_db.decorators import set_batch_mode
+
+
+def _reset_caches() -> None:
+    """Сбрасывает кэши в памяти: их ключи - относительные пути data/..."""
+    core.set_transaction(None)
+    utils._metadata_cache.clear()
+    utils.invalidate_table_cache()
+    index._index_cache.clear()
+    stats._stats_cache.clear()
+    stats._unsaved.clear()
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Пустая база в отдельном каталоге; команды не спрашивают подтверждения."""
+    monkeypatch.chdir(tmp_path)
+    set_batch_mode(True)
+    _reset_caches()
+    yield {}
+    _reset_caches()
+    set_batch_mode(False)
+
+
+@pytest.fixture
+def users(db):
+    """Таблица users с тремя записями и индексом по city."""
+    core.create_table(db, "users", ["name:str", "age:int", "city:str"])
+    core.insert_many(db, "users", [
+        ["Ann", 30, "Moscow"],
+        ["Bob", 17, "Kazan"],
+        ["Eve", 45, "Moscow"],
+    ])
+    core.create_index(db, "users", "city")
+    return db
@@ -0,0 +1,40 @@
+import pytest
+
+from src.primitive_db.engine import run_batch
+
+SETUP = [
+    "create_table u name:str age:int",
+    'insert into u values ("Ann", 30)',
+]
+
+
+def test_successful_script(db, capsys):
+    assert run_batch(SETUP + [
+        "-- комментарий",
+        "",
+        "select from u where age > 18;",
+        'update u set age = 31 where name = "Ann"',
+    ])
+    captured = capsys.readouterr()
+    assert "Ann" in captured.out
+    assert "с ошибками: 0" in captured.err
+
+
+@pytest.mark.parametrize("command", [
+    "nosuch",
+    'insert into u values ("Bob", "old")',
+    "select from u where town = 1",
+    "select from u where town = 1 limit 5",
+    'update u set age = "old" where ID = 1',
+    "delete from u where town = 1",
+    "compact nosuch",
+    "commit",
+])
+def test_reported_error_fails_script(db, capsys, command):
+    assert not run_batch(SETUP + [command, "select from u"])
+    assert "с ошибками: 1" in capsys.readouterr().err
+
+
+def test_exit_stops_script(db, capsys):
+    assert run_batch(SETUP + ["exit", "nosuch"])
+    assert "Выполнено команд: 2" in capsys.readouterr().err
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from src.primitive_db.core import create_table, insert, insert_many, select
+from src.primitive_db.index import _index_cache, lookup_index
+from src.primitive_db.utils import (
+    available_codecs,
+    check_codec,
+    compact_table,
+    convert_table_codec,
+    decode_data,
+    encode_data,
+    get_table_codec,
+    invalidate_table_cache,
+    json_loads,
+    read_data_file,
+    set_default_codec,
+    write_data_file,
+)
+
+DATA = {
+    "rows": [
+        {"ID": 1, "name": "Анна", "score": 4.5, "active": True, "note": None},
+        {"ID": 2, "name": "", "score": -0.25, "active": False, "note": "x"},
+    ],
+    "next_id": 3,
+}
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_encode_decode_round_trip(codec):
+    assert decode_data(encode_data(DATA, codec)) == (DATA, codec)
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_data_file_round_trip(db, codec):
+    write_data_file("data.bin", DATA, codec)
+    assert read_data_file("data.bin") == (DATA, codec)
+
+
+def test_json_files_have_no_header():
+    assert encode_data([1, 2], "json") == b"[1,2]"
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        check_codec("xml")
+    with pytest.raises(ValueError):
+        encode_data(DATA, "xml")
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_table_codec_conversion(db, codec):
+    create_table(db, "users", ["name:str", "age:int"])
+    insert_many(db, "users", [["Ann", 30], ["Bob", 17]])
+    expected = select(db, "users")
+
+    assert convert_table_codec("users", codec)
+    assert get_table_codec("users") == codec
+    invalidate_table_cache()
+    assert select(db, "users") == expected
+
+
+@pytest.mark.skipif("msgpack" not in available_codecs(), reason="msgpack не установлен")
+def test_unrepresentable_data_falls_back_to_json():
+    data = [2 ** 70]
+    assert decode_data(encode_data(data, "msgpack")) == (data, "json")
+
+
+@pytest.mark.parametrize("text", [
+    "[99999999999999999999]",
+    '{"v": -9223372036854775809}',
+])
+def test_json_loads_keeps_wide_integers(text):
+    value = json_loads(text)
+    assert value == json.loads(text)
+    assert json_loads(text.encode("utf-8")) == value
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_wide_integer_survives_compaction(db, codec):
+    # 2 ** 70 + 1 не представимо float: потеря точности будет заметна
+    wide = 2 ** 70 + 1
+    set_default_codec(codec)
+    try:
+        create_table(db, "r", ["v:int"])
+        insert(db, "r", [wide])
+        insert(db, "r", [-wide])
+        assert compact_table("r")
+    finally:
+        set_default_codec("json")
+
+    invalidate_table_cache()
+    _index_cache.clear()
+    values = [r["v"] for r in select(db, "r")]
+    assert values == [wide, -wide]
+    assert all(type(value) is int for value in values)
+    assert select(db, "r", {"v": wide})[0]["ID"] == 1
+    assert lookup_index("r", "ID", 2) == {2}
+
+
+def test_wide_integer_is_rejected_by_columnar_table(db):
+    create_table(db, "c", ["v:int"], storage="columnar")
+    assert insert(db, "c", [2 ** 70]) is False
+    insert(db, "c", [2 ** 63 - 1])
+    assert compact_table("c")
+
+    invalidate_table_cache()
+    assert [r["v"] for r in select(db, "c")] == [2 ** 63 - 1]
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+from src.primitive_db import index
+from src.primitive_db.core import delete, insert, update
+from src.primitive_db.index import (
+    encode_index_key,
+    get_index_path,
+    load_index,
+    lookup_index,
+)
+from src.primitive_db.utils import get_table_log_path
+
+
+def _reload(table_name, column):
+    """Читает индекс с диска, минуя кэш в памяти."""
+    index._index_cache.clear()
+    return load_index(table_name, column)
+
+
+def test_update_moves_record_between_keys(users):
+    update(users, "users", {"city": "Omsk"}, {"name": "Ann"})
+
+    for _ in range(2):
+        assert lookup_index("users", "city", "Moscow") == {3}
+        assert lookup_index("users", "city", "Omsk") == {1}
+        _reload("users", "city")
+
+
+def test_delete_removes_ids_and_empty_keys(users):
+    delete(users, "users", {"city": "Kazan"})
+    delete(users, "users", {"ID": 1})
+
+    for _ in range(2):
+        assert lookup_index("users", "city", "Kazan") == set()
+        assert lookup_index("users", "city", "Moscow") == {3}
+        assert lookup_index("users", "ID", 1) == set()
+        _reload("users", "city")
+        _reload("users", "ID")
+    assert set(_reload("users", "city")["keys"]) == {'"Moscow"'}
+
+
+def test_insert_after_delete_is_indexed(users):
+    delete(users, "users", {"name": "Eve"})
+    new_id = insert(users, "users", ["Kim", 22, "Moscow"])
+
+    assert lookup_index("users", "city", "Moscow") == {1, new_id}
+    assert lookup_index("users", "ID", new_id) == {new_id}
+
+
+def test_rejected_update_leaves_index_unchanged(users):
+    assert update(users, "users", {"age": "old"}, {"name": "Ann"}) is False
+    assert update(users, "users", {"town": "Omsk"}, {"name": "Ann"}) is False
+
+    assert _reload("users", "city")["keys"] == {
+        '"Moscow"': {1, 3},
+        '"Kazan"': {2},
+    }
+
+
+def test_failed_index_computation_writes_nothing(users, monkeypatch):
+    def encode(value):
+        if value == "Omsk":
+            raise TypeError("ключ не кодируется")
+        return encode_index_key(value)
+
+    paths = [get_table_log_path("users"), get_index_path("users", "city")]
+    before = [Path(path).read_bytes() for path in paths]
+    monkeypatch.setattr(index, "encode_index_key", encode)
+
+    assert insert(users, "users", ["Joe", 50, "Omsk"]) is False
+    assert update(users, "users", {"city": "Omsk"}, {"name": "Ann"}) is False
+    assert [Path(path).read_bytes() for path in paths] == before
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from src.primitive_db import engine
+from src.primitive_db.core import create_table, insert_many, select
+from src.primitive_db.utils import read_rows_file
+
+
+@pytest.fixture
+def table(db, monkeypatch):
+    # Маленький пакет: ошибка приходится на середину второго пакета
+    monkeypatch.setattr(engine, "LOAD_BATCH_SIZE", 2)
+    create_table(db, "u", ["name:str", "age:int"])
+    return db
+
+
+def _write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+
+
+def test_batch_insert_assigns_consecutive_ids(table):
+    assert insert_many(table, "u", [["a", 1], ["b", "2"]]) == [1, 2]
+    assert select(table, "u", {"ID": 2})[0]["age"] == 2
+
+
+def test_invalid_row_rejects_whole_batch(table):
+    assert insert_many(table, "u", [["a", 1], ["b", "x"]]) is False
+    assert select(table, "u") == []
+
+
+def test_load_stops_at_bad_row(table, tmp_path, capsys):
+    rows = [{"name": n, "age": i} for i, n in enumerate("abc")]
+    rows.append({"name": "d", "age": "old"})
+    rows.append({"name": "e", "age": 5})
+    _write_jsonl(tmp_path / "rows.jsonl", rows)
+
+    engine.handle_load(["u", "from", "rows.jsonl"])
+
+    output = capsys.readouterr().out
+    assert "Загружено записей: 3" in output
+    assert "Загрузка остановлена. Строка 4:" in output
+    assert [r["name"] for r in select(table, "u")] == ["a", "b", "c"]
+
+
+def test_load_reports_malformed_line(table, tmp_path, capsys):
+    (tmp_path / "rows.jsonl").write_text(
+        '{"name": "a", "age": 1}\n\n{"name": "b", "agee": 2}\n', encoding="utf-8")
+
+    engine.handle_load(["u", "from", "rows.jsonl"])
+
+    output = capsys.readouterr().out
+    assert "Загружено записей: 1" in output
+    assert "Строка 3: нет столбцов age; неизвестные столбцы agee" in output
+
+
+def test_csv_rows_carry_line_numbers(tmp_path):
+    (tmp_path / "rows.csv").write_text("age,name\n1,a\n\n2,b\n", encoding="utf-8")
+    assert list(read_rows_file(str(tmp_path / "rows.csv"), ["name", "age"])) == [
+        (2, ["a", "1"]),
+        (4, ["b", "2"]),
+    ]
@@ -0,0 +1,94 @@
+import os
+
+from src.primitive_db import index, utils
+from src.primitive_db.core import delete, insert, select, update
+from src.primitive_db.index import get_index_path, lookup_index
+from src.primitive_db.utils import (
+    compact_table,
+    get_table_log_path,
+    invalidate_table_cache,
+    load_table_data,
+)
+
+
+def _rows(metadata):
+    return [(r["ID"], r["name"], r["age"]) for r in select(metadata, "users")]
+
+
+def test_changes_are_replayed_from_log(users):
+    update(users, "users", {"age": 31}, {"name": "Ann"})
+    delete(users, "users", {"name": "Bob"})
+    insert(users, "users", ["Joe", 50, "Omsk"])
+    expected = [(1, "Ann", 31), (3, "Eve", 45), (4, "Joe", 50)]
+    assert _rows(users) == expected
+
+    # Без буферного пула таблица собирается из снимка и журнала
+    invalidate_table_cache()
+    assert os.path.getsize(get_table_log_path("users")) > 0
+    assert _rows(users) == expected
+
+
+def test_torn_log_line_is_skipped(users):
+    with open(get_table_log_path("users"), "a", encoding="utf-8") as file:
+        file.write('{"op": "insert", "row": {"ID": 9')
+    invalidate_table_cache()
+    assert [r["ID"] for r in load_table_data("users")] == [1, 2, 3]
+
+
+def test_compaction_folds_log_into_snapshot(users):
+    update(users, "users", {"city": "Omsk"}, {"age": {"operator": ">", "value": 40}})
+    delete(users, "users", {"ID": 2})
+    before = _rows(users)
+
+    assert compact_table("users")
+    assert not os.path.exists(get_table_log_path("users"))
+
+    invalidate_table_cache()
+    assert _rows(users) == before
+    assert select(users, "users", {"city": "Omsk"})[0]["name"] == "Eve"
+
+
+def test_log_is_compacted_past_threshold(users, monkeypatch):
+    monkeypatch.setattr(utils, "LOG_COMPACT_MIN_BYTES", 0)
+    for age in range(20):
+        update(users, "users", {"age": age}, {"name": "Ann"})
+
+    # Журнал сворачивается, как только становится больше снимка
+    log_path = get_table_log_path("users")
+    if os.path.exists(log_path):
+        with open(log_path, encoding="utf-8") as file:
+            assert len(file.readlines()) < 20
+    invalidate_table_cache()
+    assert _rows(users)[0] == (1, "Ann", 19)
+
+
+def test_write_after_torn_tail_is_kept(users):
+    with open(get_table_log_path("users"), "a", encoding="utf-8") as file:
+        file.write('{"op": "insert", "row": {"ID": 9')
+    with open(get_index_path("users", "city"), "a", encoding="utf-8") as file:
+        file.write('{"op": "add", "key": "\\"Om')
+    new_id = insert(users, "users", ["Joe", 50, "Omsk"])
+    update(users, "users", {"city": "Kazan"}, {"name": "Ann"})
+
+    invalidate_table_cache()
+    index._index_cache.clear()
+    assert [r["ID"] for r in load_table_data("users")] == [1, 2, 3, new_id]
+    assert lookup_index("users", "city", "Omsk") == {new_id}
+    assert lookup_index("users", "city", "Kazan") == {1, 2}
+
+
+def test_failed_auto_compaction_is_reported(users, monkeypatch, capsys):
+    def write_segments(*args, **kwargs):
+        raise OSError("нет места на диске")
+
+    monkeypatch.setattr(utils, "LOG_COMPACT_MIN_BYTES", 0)
+    monkeypatch.setattr(utils, "write_segments", write_segments)
+    for age in range(20):
+        update(users, "users", {"age": age}, {"name": "Ann"})
+    new_id = insert(users, "users", ["Joe", 50, "Omsk"])
+
+    assert 'не удалось свернуть журнал таблицы "users"' in capsys.readouterr().out
+    invalidate_table_cache()
+    index._index_cache.clear()
+    assert _rows(users)[0] == (1, "Ann", 19)
+    assert lookup_index("users", "city", "Omsk") == {new_id}
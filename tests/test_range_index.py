@@ -0,0 +1,45 @@
+import pytest
+
+from src.primitive_db import index
+from src.primitive_db.core import create_index, delete, insert, update
+from src.primitive_db.index import iter_index_ids, load_index, range_lookup_index
+
+
+def _reload(table_name, column):
+    """Читает индекс с диска, минуя кэш в памяти."""
+    index._index_cache.clear()
+    return load_index(table_name, column)
+
+
+@pytest.mark.parametrize("operator, value, expected", [
+    (">", 30, [3]),
+    (">=", 30, [1, 3]),
+    ("<", 30, [2]),
+    ("<=", 17, [2]),
+    (">", 45, []),
+])
+def test_range_lookup(users, operator, value, expected):
+    create_index(users, "users", "age")
+    assert range_lookup_index("users", "age", operator, value) == expected
+
+
+def test_sorted_keys_follow_changes(users):
+    update(users, "users", {"city": "Omsk"}, {"name": "Ann"})
+    delete(users, "users", {"city": "Kazan"})
+    new_id = insert(users, "users", ["Kim", 22, "Abakan"])
+
+    for _ in range(2):
+        assert load_index("users", "city")["sorted"] == ["Abakan", "Moscow", "Omsk"]
+        assert range_lookup_index("users", "ID", ">=", 1) == [1, 3, new_id]
+        _reload("users", "city")
+        _reload("users", "ID")
+
+
+def test_index_order_iteration(users):
+    assert list(iter_index_ids("users", "city")) == [2, 1, 3]
+    assert list(iter_index_ids("users", "city", descending=True)) == [1, 3, 2]
+
+
+def test_unsupported_operator_is_rejected(users):
+    with pytest.raises(ValueError):
+        range_lookup_index("users", "ID", "!=", 1)
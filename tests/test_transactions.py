@@ -0,0 +1,62 @@
+import pytest
+
+from src.primitive_db.core import (
+    begin_transaction,
+    commit_transaction,
+    delete,
+    get_transaction,
+    insert,
+    rollback_transaction,
+    select,
+    update,
+)
+from src.primitive_db.index import lookup_index
+from src.primitive_db.utils import invalidate_table_cache
+
+
+def _names(metadata):
+    return [record["name"] for record in select(metadata, "users")]
+
+
+def test_rollback_discards_changes(users):
+    begin_transaction()
+    insert(users, "users", ["Kim", 22, "Omsk"])
+    update(users, "users", {"city": "Omsk"}, {"name": "Ann"})
+    delete(users, "users", {"name": "Bob"})
+    # Транзакция видит свои изменения
+    assert _names(users) == ["Ann", "Eve", "Kim"]
+
+    assert rollback_transaction() == 3
+    assert get_transaction() is None
+    assert _names(users) == ["Ann", "Bob", "Eve"]
+    assert lookup_index("users", "city", "Omsk") == set()
+
+    invalidate_table_cache()
+    assert _names(users) == ["Ann", "Bob", "Eve"]
+
+
+def test_commit_writes_changes(users):
+    begin_transaction()
+    update(users, "users", {"city": "Omsk"}, {"name": "Ann"})
+    delete(users, "users", {"name": "Bob"})
+    # До фиксации индекс не содержит изменений транзакции
+    assert lookup_index("users", "city", "Omsk") == set()
+
+    assert commit_transaction() == 2
+    assert get_transaction() is None
+    assert lookup_index("users", "city", "Omsk") == {1}
+
+    invalidate_table_cache()
+    assert _names(users) == ["Ann", "Eve"]
+
+
+def test_rollback_without_transaction_fails(db):
+    with pytest.raises(ValueError):
+        rollback_transaction()
+
+
+def test_nested_begin_fails(users):
+    begin_transaction()
+    with pytest.raises(ValueError):
+        begin_transaction()
+    rollback_transaction()
@@ -0,0 +1,87 @@
+import pytest
+
+from src.primitive_db.core import (
+    coerce_where,
+    compile_where,
+    delete,
+    normalize_where,
+    select,
+)
+from src.primitive_db.parser import parse_where_condition
+
+COLUMN_TYPES = {"ID": "int", "name": "str", "age": "int", "city": "str"}
+RECORDS = [
+    {"ID": 1, "name": "Ann", "age": 30, "city": "Moscow"},
+    {"ID": 2, "name": "Bob", "age": 17, "city": "Kazan"},
+    {"ID": 3, "name": "Eve", "age": 45, "city": "Moscow"},
+]
+
+
+def _filter_ids(tree):
+    predicate = compile_where(COLUMN_TYPES, coerce_where(COLUMN_TYPES, tree))
+    return [record["ID"] for record in RECORDS if predicate(record)]
+
+
+@pytest.mark.parametrize("where_clause, expected", [
+    ({"city": "Moscow"}, [1, 3]),
+    ({"age": {"operator": ">", "value": 18}}, [1, 3]),
+    ({"age": {"operator": "<=", "value": 30}, "city": "Moscow"}, [1]),
+    ({"name": {"operator": "!=", "value": "Bob"}}, [1, 3]),
+])
+def test_compiled_condition(where_clause, expected):
+    assert _filter_ids(normalize_where(where_clause)) == expected
+
+
+def test_values_are_coerced_to_column_types():
+    assert _filter_ids(normalize_where({"age": "30", "ID": "1"})) == [1]
+
+
+def test_empty_condition_matches_everything():
+    assert all(compile_where(COLUMN_TYPES, None)(record) for record in RECORDS)
+
+
+def test_values_are_not_evaluated_as_code():
+    tree = normalize_where({"name": "Ann' or True or '"})
+    assert _filter_ids(tree) == []
+
+
+@pytest.mark.parametrize("condition, expected", [
+    ("age > 18", [1, 3]),
+    ("not age > 18", [2]),
+    ("city in ('Kazan', 'Omsk')", [2]),
+    ("city not in ('Kazan', 'Omsk')", [1, 3]),
+    ("not (city = 'Moscow' and age < 40)", [2, 3]),
+    ("age >= 30 and not name in ('Eve') or ID = 2", [1, 2]),
+])
+def test_parsed_condition(condition, expected):
+    assert _filter_ids(normalize_where(parse_where_condition(condition))) == expected
+
+
+@pytest.mark.parametrize("condition", [
+    "town = 'Omsk'",
+    "not town = 'Omsk'",
+    "town in ('Omsk')",
+    "age > 18 or town = 'Omsk'",
+])
+def test_unknown_column_is_rejected(condition):
+    tree = normalize_where(parse_where_condition(condition))
+    with pytest.raises(ValueError, match='Column "town" does not exist'):
+        coerce_where(COLUMN_TYPES, tree)
+    with pytest.raises(ValueError, match='Column "town" does not exist'):
+        compile_where(COLUMN_TYPES, tree)
+
+
+def test_unknown_column_does_not_delete(users):
+    tree = parse_where_condition("not town = 'Omsk'")
+    assert delete(users, "users", tree) is False
+    assert len(select(users, "users")) == 3
+
+
+def test_planner_result_matches_scan(users):
+    # city проиндексирован, age - нет: OR требует полного перебора
+    for condition in ("city = 'Moscow' and age > 40",
+                      "city = 'Kazan' or age > 40",
+                      "ID >= 2 and not city in ('Kazan')"):
+        records = select(users, "users", parse_where_condition(condition))
+        assert [r["ID"] for r in records] == _filter_ids(
+            normalize_where(parse_where_condition(condition)))